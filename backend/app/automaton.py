@@ -0,0 +1,76 @@
+"""
+Aho-Corasick Keyword Automaton
+Multi-pattern substring matcher: finds every keyword occurring in a text
+with a single left-to-right pass, independent of the number of keywords.
+"""
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Sequence, Set, Tuple
+
+
+class KeywordAutomaton:
+    """
+    Trie with failure links over a fixed keyword set, compiled to a DFA
+    Matching is case-sensitive; callers lowercase text and keywords.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(k for k in keywords if k))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[FrozenSet[int]] = [frozenset()]
+
+        for index, keyword in enumerate(self.keywords):
+            self._insert(keyword, index)
+        self._delta = self._link()
+
+    def _insert(self, keyword: str, index: int) -> None:
+        node = 0
+        for char in keyword:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(frozenset())
+            node = next_node
+        self._output[node] = self._output[node] | {index}
+
+    def _link(self) -> List[Dict[str, int]]:
+        """
+        Breadth-first construction of failure links and merged outputs
+        Returns the full transition table so matching never follows failure
+        links at scan time: one dict lookup per character.
+        """
+        delta: List[Dict[str, int]] = [dict(self._goto[0])]
+        delta.extend({} for _ in range(len(self._goto) - 1))
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            # Failure targets are shallower, so their rows are already complete
+            delta[node] = {**delta[self._fail[node]], **self._goto[node]}
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                self._fail[child] = delta[self._fail[node]].get(char, 0)
+                self._output[child] = self._output[child] | self._output[self._fail[child]]
+        return delta
+
+    def find(self, text: str) -> Set[int]:
+        """Indices of all keywords occurring anywhere in text"""
+        return self.find_in_fields((text,))[0]
+
+    def find_in_fields(self, texts: Sequence[str]) -> List[Set[int]]:
+        """
+        Match several texts in one pass, reporting hits per text
+        The automaton is reset at each boundary so no match spans two texts.
+        """
+        found: List[Set[int]] = [set() for _ in texts]
+        delta, output = self._delta, self._output
+        for position, text in enumerate(texts):
+            hits = found[position]
+            node = 0
+            for char in text:
+                node = delta[node].get(char, 0)
+                if output[node]:
+                    hits |= output[node]
+        return found
@@ -0,0 +1,40 @@
+"""
+Custom Column Types
+JSON document columns encoded and decoded with orjson instead of per-row
+json.loads calls in the endpoints.
+"""
+from typing import Any, Optional
+
+import orjson
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.types import Text, TypeDecorator
+
+
+class JSONDict(TypeDecorator):
+    """
+    JSON object column: bind a dict, read back a dict
+    Native JSONB on PostgreSQL; elsewhere compact JSON text written and parsed
+    by orjson. Stored values that are not JSON objects read back as {}.
+    """
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(Text())
+
+    def process_bind_param(self, value: Optional[dict], dialect) -> Any:
+        if value is None or dialect.name == "postgresql":
+            return value
+        return orjson.dumps(value).decode()
+
+    def process_result_value(self, value: Any, dialect) -> Optional[dict]:
+        if value is None:
+            return None
+        if isinstance(value, str):
+            try:
+                value = orjson.loads(value)
+            except orjson.JSONDecodeError:
+                return {}
+        return value if isinstance(value, dict) else {}
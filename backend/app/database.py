@@ -0,0 +1,112 @@
+"""
+Database Engine Configuration
+Builds the SQLAlchemy engine from environment settings. SQLite databases get
+a production profile on every new connection: WAL journaling, relaxed but
+crash-safe syncing, a sized page cache, memory-mapped reads, a busy timeout
+and in-memory temp storage.
+"""
+import logging
+import os
+from typing import NamedTuple, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATABASE_URL = "sqlite:///./personifid.db"
+
+
+class DatabaseSettings(NamedTuple):
+    url: str = DEFAULT_DATABASE_URL
+    pool_size: int = 10
+    max_overflow: int = 20
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_cache_size_kib: int = 64 * 1024
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_temp_store: str = "MEMORY"
+
+
+def settings_from_env(environ=os.environ) -> DatabaseSettings:
+    """Read DATABASE_URL, DB_* pool settings and SQLITE_* pragmas from the environment"""
+    defaults = DatabaseSettings()
+    return DatabaseSettings(
+        url=environ.get("DATABASE_URL", defaults.url),
+        pool_size=int(environ.get("DB_POOL_SIZE", defaults.pool_size)),
+        max_overflow=int(environ.get("DB_MAX_OVERFLOW", defaults.max_overflow)),
+        pool_timeout=float(environ.get("DB_POOL_TIMEOUT", defaults.pool_timeout)),
+        pool_recycle=int(environ.get("DB_POOL_RECYCLE", defaults.pool_recycle)),
+        sqlite_journal_mode=environ.get("SQLITE_JOURNAL_MODE", defaults.sqlite_journal_mode),
+        sqlite_synchronous=environ.get("SQLITE_SYNCHRONOUS", defaults.sqlite_synchronous),
+        sqlite_cache_size_kib=int(environ.get("SQLITE_CACHE_SIZE_KIB", defaults.sqlite_cache_size_kib)),
+        sqlite_mmap_size=int(environ.get("SQLITE_MMAP_SIZE", defaults.sqlite_mmap_size)),
+        sqlite_busy_timeout_ms=int(environ.get("SQLITE_BUSY_TIMEOUT_MS", defaults.sqlite_busy_timeout_ms)),
+        sqlite_temp_store=environ.get("SQLITE_TEMP_STORE", defaults.sqlite_temp_store),
+    )
+
+
+def sqlite_pragmas(settings: DatabaseSettings, in_memory: bool = False) -> list:
+    """PRAGMA statements applied to each new SQLite connection"""
+    pragmas = [
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        # Negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size=-{settings.sqlite_cache_size_kib}",
+        f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}",
+        f"PRAGMA temp_store={settings.sqlite_temp_store}",
+    ]
+    if not in_memory:
+        # journal_mode is stored in the file; WAL lets readers run alongside the writer
+        pragmas.insert(0, f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        pragmas.append(f"PRAGMA mmap_size={settings.sqlite_mmap_size}")
+    return pragmas
+
+
+def create_database_engine(settings: Optional[DatabaseSettings] = None, **overrides) -> Engine:
+    """
+    Engine for settings.url with pool sizing and, on SQLite, the connection profile
+    Keyword overrides replace individual settings (e.g. pool_size=1 for a writer).
+    """
+    settings = (settings or settings_from_env())._replace(**overrides)
+    url = make_url(settings.url)
+
+    if url.get_backend_name() != "sqlite":
+        return create_engine(
+            url,
+            pool_size=settings.pool_size,
+            max_overflow=settings.max_overflow,
+            pool_timeout=settings.pool_timeout,
+            pool_recycle=settings.pool_recycle,
+            pool_pre_ping=True,
+        )
+
+    in_memory = url.database in (None, "", ":memory:")
+    pool_options = {} if in_memory else {
+        "pool_size": settings.pool_size,
+        "max_overflow": settings.max_overflow,
+        "pool_timeout": settings.pool_timeout,
+    }
+    engine = create_engine(url, connect_args={"check_same_thread": False}, **pool_options)
+    pragmas = sqlite_pragmas(settings, in_memory)
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    return engine
+
+
+settings = settings_from_env()
+engine = create_database_engine(settings)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base = declarative_base()
@@ -0,0 +1,155 @@
+"""
+Index Audit
+Exercises the hot read endpoints against a scratch SQLite database, captures
+every SELECT they issue and runs EXPLAIN QUERY PLAN on each one, flagging
+full table scans and temporary sort b-trees. Membership lists must instead
+start from identity_context, so their cost follows the member count; sorting
+that bounded set is expected.
+
+Usage: python -m app.index_audit   (exits non-zero when problems are found)
+"""
+import os
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+# Endpoints on the request hot path; {identity_id}/{context_id} are filled from seed data
+HOT_ENDPOINTS = [
+    ("GET", "/users/me"),
+    ("GET", "/identities"),
+    ("GET", "/identities/{identity_id}"),
+    ("GET", "/identities/{identity_id}/contexts"),
+    ("GET", "/contexts"),
+    ("GET", "/contexts/{context_id}/identities"),
+    ("GET", "/contexts/{context_id}/unassigned-identities"),
+    ("GET", "/contexts/{context_id}/resolve"),
+    ("GET", "/contexts/{context_id}/resolve?mode=bound&k=1"),
+    ("POST", "/resolve/batch"),
+    ("GET", "/dashboard/stats"),
+]
+
+# Endpoints whose association query must be driven by this table's keys
+MEMBERSHIP_ENDPOINTS = {
+    "GET /identities/{identity_id}/contexts": "identity_context",
+    "GET /contexts/{context_id}/identities": "identity_context",
+}
+
+
+def classify_plan(plan_rows, driving_table: Optional[str] = None) -> List[str]:
+    """Problems in an EXPLAIN QUERY PLAN result (detail is the last column)"""
+    problems = []
+    if driving_table and plan_rows and not plan_rows[0][-1].startswith(f"SEARCH {driving_table} "):
+        problems.append(f"not driven by {driving_table}: {plan_rows[0][-1]}")
+    for row in plan_rows:
+        detail = row[-1]
+        if detail.startswith("SCAN ") and "INDEX" not in detail:
+            problems.append(f"full scan: {detail}")
+        elif "USE TEMP B-TREE" in detail and not driving_table:
+            problems.append(f"temp sort: {detail}")
+    return problems
+
+
+def driving_table_for(statement: str, endpoints: List[str]) -> Optional[str]:
+    """The table a statement must start from, when it is a membership endpoint's association query"""
+    for endpoint in endpoints:
+        table = MEMBERSHIP_ENDPOINTS.get(endpoint)
+        if table and table in statement:
+            return table
+    return None
+
+
+def _seed(client) -> Dict[str, Any]:
+    user = {"username": "audit", "email": "audit@example.com", "password": "audit-password"}
+    client.post("/auth/register", json=user)
+    token = client.post("/auth/token", data={"username": user["username"], "password": user["password"]}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    identity_ids = [
+        client.post("/identities", json={"display_name": f"Audit {i}", "bio": "engineer"}, headers=headers).json()["id"]
+        for i in range(3)
+    ]
+    context_ids = [
+        client.post("/contexts", json={"name": name}, headers=headers).json()["id"]
+        for name in ("Work", "Family")
+    ]
+    client.post(f"/contexts/{context_ids[0]}/identities/{identity_ids[0]}", headers=headers)
+    return {"headers": headers, "identity_id": identity_ids[0], "context_id": context_ids[0]}
+
+
+def run_audit() -> List[Dict[str, Any]]:
+    """Return one report entry per distinct SELECT issued by the hot endpoints"""
+    from fastapi.testclient import TestClient
+    from app.main import app, get_db, Base
+    from app.writer import close_writer
+
+    with tempfile.TemporaryDirectory() as scratch:
+        audit_engine = create_engine(
+            f"sqlite:///{os.path.join(scratch, 'audit.db')}",
+            connect_args={"check_same_thread": False}
+        )
+        Base.metadata.create_all(bind=audit_engine)
+        AuditSession = sessionmaker(autocommit=False, autoflush=False, bind=audit_engine)
+
+        def override_get_db():
+            db = AuditSession()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        captured: Dict[str, Dict[str, Any]] = {}
+        current = {"endpoint": None}
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if current["endpoint"] and statement.lstrip().upper().startswith("SELECT"):
+                entry = captured.setdefault(statement, {"endpoints": [], "parameters": parameters})
+                if current["endpoint"] not in entry["endpoints"]:
+                    entry["endpoints"].append(current["endpoint"])
+
+        previous_override = app.dependency_overrides.get(get_db)
+        app.dependency_overrides[get_db] = override_get_db
+        event.listen(audit_engine, "before_cursor_execute", capture)
+        try:
+            client = TestClient(app)
+            seed = _seed(client)
+            for method, template in HOT_ENDPOINTS:
+                endpoint = template.format(**seed)
+                current["endpoint"] = f"{method} {template}"
+                client.request(method, endpoint, headers=seed["headers"], json={} if method == "POST" else None)
+            current["endpoint"] = None
+        finally:
+            event.remove(audit_engine, "before_cursor_execute", capture)
+            close_writer(audit_engine)
+            if previous_override is None:
+                app.dependency_overrides.pop(get_db, None)
+            else:
+                app.dependency_overrides[get_db] = previous_override
+
+        report = []
+        with audit_engine.connect() as conn:
+            for statement, entry in captured.items():
+                plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", entry["parameters"]).fetchall()
+                report.append({
+                    "statement": " ".join(statement.split()),
+                    "endpoints": entry["endpoints"],
+                    "plan": [row[-1] for row in plan],
+                    "problems": classify_plan(plan, driving_table_for(statement, entry["endpoints"])),
+                })
+        audit_engine.dispose()
+    return report
+
+
+if __name__ == "__main__":
+    results = run_audit()
+    flagged = [result for result in results if result["problems"]]
+    for result in results:
+        marker = "FLAG" if result["problems"] else "ok  "
+        print(f"[{marker}] {', '.join(result['endpoints'])}")
+        print(f"       {result['statement'][:160]}")
+        for line in result["plan"]:
+            print(f"         - {line}")
+    print(f"\n{len(results)} queries audited, {len(flagged)} flagged.")
+    sys.exit(1 if flagged else 0)
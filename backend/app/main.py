@@ -1,44 +1,75 @@
 import os
+import json
 import time
-import hashlib
+import base64
+import orjson
+import anyio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
 import logging
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 
-from fastapi import FastAPI, HTTPException, Request, status, Depends, Header
+from fastapi import FastAPI, HTTPException, Request, Response, status, Depends, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.security import OAuth2PasswordRequestForm
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from datetime import datetime
-from pydantic import BaseModel, EmailStr
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Text, Table, inspect, text
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import Session, sessionmaker, relationship
+from pydantic import BaseModel, EmailStr, Field, ValidationError
+from sqlalchemy import BigInteger, bindparam, Column, Integer, String, Boolean, DateTime, ForeignKey, Index, JSON, Text, Table, delete, exists, insert, inspect, select, text, tuple_
+from sqlalchemy.orm import Session, relationship, defer
 from sqlalchemy.sql import func
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import ndjson
+from app.database import Base, SessionLocal, engine, settings as database_settings
+from app.cache import DataVersions, TTLCache
+from app.columns import JSONDict
+from app.passwords import PasswordPoolBusy, password_pool
+from app.tokens import (
+    ACCESS_TOKEN_EXPIRE_SECONDS, AuthenticatedUser, InvalidToken, create_access_token, decode_access_token, denylist
+)
+from app.sql_metrics import SQLMetricsMiddleware
+from app.writer import GroupCommitWriter, close_all_writers, writer_for
+from app.resolver import (
+    FEATURE_SOURCE_FIELDS, apply_identity_features, content_matcher, features_stale, parse_social_links,
+    resolve_batch, resolve_identities, resolve_top_k
+)
 
 PORT =  int(os.environ.get("PORT", 8000))
+MAX_BATCH_TOP_K = 50
+MAX_RESOLVE_K = 100
+MAX_BULK_PAIRS = 1000
+# Same request-size cap as bulk association pairs
+MAX_BATCH_CONTEXTS = MAX_BULK_PAIRS
+EXPORT_YIELD_PER = 500
+IMPORT_BATCH_SIZE = 200
+MAX_IMPORT_BATCH_SIZE = 1000
+MAX_IMPORT_LINE_BYTES = 64 * 1024
+MAX_IMPORT_ERRORS = 100
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+# Largest value an integer key binds as (SQLite INTEGER / BIGINT)
+SQL_INTEGER_MAX = 2**63 - 1
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # ==================== DATABASE SETUP ====================
-DATABASE_URL = "sqlite:///./personifid.db"
-
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
+# Engine, pool and SQLite pragmas are configured from the environment in app.database
+DATABASE_URL = database_settings.url
 
 # ==================== ASSOCIATION TABLE ====================
 identity_context_association = Table(
     'identity_context',
     Base.metadata,
-    Column('identity_id', Integer, ForeignKey('identities.id')),
-    Column('context_id', Integer, ForeignKey('contexts.id'))
+    # Composite PK: no duplicate assignments, and it serves identity -> contexts lookups
+    Column('identity_id', Integer, ForeignKey('identities.id'), primary_key=True),
+    Column('context_id', Integer, ForeignKey('contexts.id'), primary_key=True),
+    # Reverse direction: context -> identities lookups and per-context counts
+    Index('ix_identity_context_context_identity', 'context_id', 'identity_id')
 )
 
 # ==================== MODELS ====================
@@ -74,12 +105,26 @@ class Identity(Base):
     is_default = Column(Boolean, default=False)
     is_public = Column(Boolean, default=True)
     privacy_level = Column(String, default="standard")
-    social_links = Column(Text, default="{}")
+    social_links = Column(JSONDict, default=dict)
     usage_count = Column(Integer, default=0) # Analytics integration
     use_case = Column(Text)
     last_used = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, onupdate=datetime.utcnow)
+    # Resolver feature store: packed keyword/platform bitsets maintained on write
+    feature_version = Column(Integer)
+    bio_keyword_bits = Column(BigInteger, default=0)
+    title_keyword_bits = Column(BigInteger, default=0)
+    name_keyword_bits = Column(BigInteger, default=0)
+    social_link_bits = Column(Integer, default=0)
+    social_link_count = Column(Integer, default=0)
+
+    __table_args__ = (
+        # Per-user listings in creation order (lists, dashboard, pagination)
+        Index("ix_identities_user_created", "user_id", "created_at"),
+        # Covers the resolver's upper-bound scan without touching table rows
+        Index("ix_identities_resolver_bounds", "user_id", "privacy_level", "is_public", "is_default", "usage_count", "created_at"),
+    )
 
 class Context(Base):
     __tablename__ = "contexts"
@@ -93,6 +138,10 @@ class Context(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_contexts_user_created", "user_id", "created_at"),
+    )
+
 # Add relationships
 User.identities = relationship("Identity", back_populates="user", cascade="all, delete-orphan")
 User.contexts = relationship("Context", back_populates="user", cascade="all, delete-orphan")
@@ -107,11 +156,55 @@ Context.identities = relationship("Identity", secondary=identity_context_associa
 Base.metadata.create_all(bind=engine)
 
 # Migration logic
-def migrate_database():
+# SQLite PRAGMA user_version records one-off data migrations already applied
+SOCIAL_LINKS_JSON_VERSION = 1
+
+def migrate_social_links(conn, column_type) -> None:
+    """
+    Make every stored social_links value a JSON object for the JSONDict column
+    NULL, malformed and non-object values become {}; on PostgreSQL the TEXT
+    column is then converted to JSONB. Runs once: SQLite records it in
+    user_version, PostgreSQL by the column type. Other dialects are left as is.
+    """
+    if conn.dialect.name == "sqlite":
+        if conn.exec_driver_sql("PRAGMA user_version").scalar() >= SOCIAL_LINKS_JSON_VERSION:
+            return
+        # json_type() raises on malformed text, so CASE only reaches it for valid JSON
+        fixed = conn.execute(text(
+            "UPDATE identities SET social_links = '{}' WHERE social_links IS NULL OR "
+            "CASE WHEN json_valid(social_links) THEN json_type(social_links) != 'object' ELSE 1 END"
+        )).rowcount
+        conn.exec_driver_sql(f"PRAGMA user_version = {SOCIAL_LINKS_JSON_VERSION}")
+    elif conn.dialect.name != "postgresql" or isinstance(column_type, JSON):
+        # Other backends keep the TEXT column, which JSONDict reads leniently
+        return
+    else:
+        def is_json_object(raw) -> bool:
+            try:
+                return isinstance(orjson.loads(raw), dict)
+            except (TypeError, orjson.JSONDecodeError):
+                return False
+        
+        rows = conn.execute(text("SELECT id, social_links FROM identities")).all()
+        invalid = [row.id for row in rows if not is_json_object(row.social_links)]
+        fixed = len(invalid)
+        for start in range(0, fixed, 1000):
+            conn.execute(
+                text("UPDATE identities SET social_links = '{}' WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)),
+                {"ids": invalid[start:start + 1000]}
+            )
+        conn.execute(text("ALTER TABLE identities ALTER COLUMN social_links TYPE JSONB USING social_links::jsonb"))
+        logger.info(" Converted identities.social_links to JSONB")
+    conn.commit()
+    if fixed:
+        logger.info(f" Reset {fixed} malformed social_links values to {{}}")
+
+def migrate_database(bind=None):
     """Add any missing columns to existing tables"""
-    inspector = inspect(engine)
+    bind = bind or engine
+    inspector = inspect(bind)
     
-    with engine.connect() as conn:
+    with bind.connect() as conn:
         if 'users' in inspector.get_table_names():
             columns = [col['name'] for col in inspector.get_columns('users')]
             
@@ -127,6 +220,58 @@ def migrate_database():
                 conn.execute(text('ALTER TABLE identities ADD COLUMN use_case TEXT'))
                 conn.commit()
                 logger.info(" Added use_case column to identities table")
+            
+            feature_columns = {
+                'feature_version': 'INTEGER',
+                'bio_keyword_bits': 'BIGINT DEFAULT 0',
+                'title_keyword_bits': 'BIGINT DEFAULT 0',
+                'name_keyword_bits': 'BIGINT DEFAULT 0',
+                'social_link_bits': 'INTEGER DEFAULT 0',
+                'social_link_count': 'INTEGER DEFAULT 0',
+            }
+            for name, ddl in feature_columns.items():
+                if name not in columns:
+                    conn.execute(text(f'ALTER TABLE identities ADD COLUMN {name} {ddl}'))
+                    conn.commit()
+                    logger.info(f" Added {name} column to identities table (run backfill_features.py)")
+            
+            social_links_type = next(col['type'] for col in inspector.get_columns('identities') if col['name'] == 'social_links')
+            migrate_social_links(conn, social_links_type)
+    
+    # Rebuild legacy identity_context (no primary key) with the composite key, dropping duplicates
+    if 'identity_context' in inspector.get_table_names():
+        primary_key = inspector.get_pk_constraint('identity_context').get('constrained_columns') or []
+        if not primary_key:
+            with bind.connect() as conn:
+                # pysqlite autocommits DDL unless a transaction is opened explicitly
+                conn.exec_driver_sql('BEGIN')
+                try:
+                    conn.execute(text('ALTER TABLE identity_context RENAME TO identity_context_legacy'))
+                    identity_context_association.create(bind=conn)
+                    conn.execute(text(
+                        'INSERT OR IGNORE INTO identity_context (identity_id, context_id) '
+                        'SELECT identity_id, context_id FROM identity_context_legacy '
+                        'WHERE identity_id IS NOT NULL AND context_id IS NOT NULL'
+                    ))
+                    conn.execute(text('DROP TABLE identity_context_legacy'))
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+            logger.info(" Rebuilt identity_context with composite primary key")
+    
+    # create_all only builds indexes for new tables; redefined indexes are rebuilt
+    inspector = inspect(bind)
+    for table in Base.metadata.sorted_tables:
+        existing = {
+            index["name"]: index["column_names"] for index in inspector.get_indexes(table.name)
+        }
+        for index in table.indexes:
+            declared = [column.name for column in index.columns]
+            if index.name in existing and existing[index.name] != declared:
+                index.drop(bind=bind)
+                logger.info(f" Rebuilding index {index.name}")
+            index.create(bind=bind, checkfirst=True)
 
 # Run migrations
 try:
@@ -137,10 +282,24 @@ except Exception as e:
 logger.info(" SQLite database and tables ready!")
 
 # ==================== FASTAPI APP ====================
+# Sync endpoints and dependencies run on anyio's worker threads. Bounding them by the
+# connection pool means bursts queue for a thread rather than time out waiting for a connection.
+DB_THREADPOOL_SIZE = int(os.environ.get(
+    "DB_THREADPOOL_SIZE", database_settings.pool_size + database_settings.max_overflow
+))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    anyio.to_thread.current_default_thread_limiter().total_tokens = DB_THREADPOOL_SIZE
+    yield
+    # Drain queued writes before the process exits
+    close_all_writers()
+
 app = FastAPI(
     title="Personif-ID API",
     description="Context-aware identity management - SQLite version",
     version="1.1.0",
+    lifespan=lifespan,
 )
 
 # Dependency to get DB session
@@ -151,6 +310,10 @@ def get_db():
     finally:
         db.close()
 
+# Writes go through one group-commit writer per database instead of per-request commits
+def get_writer(db: Session = Depends(get_db)) -> GroupCommitWriter:
+    return writer_for(db.get_bind())
+
 # ==================== SCHEMAS ====================
 class UserRegister(BaseModel):
     username: str
@@ -245,59 +408,255 @@ class ContextResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class ResolvedIdentitySummary(BaseModel):
+    id: int
+    display_name: str
+    email: Optional[str]
+    title: Optional[str]
+    avatar_url: Optional[str]
+    is_default: bool
+    is_public: bool
+    privacy_level: str
+
+    class Config:
+        from_attributes = True
+
+class ScoreBreakdown(BaseModel):
+    privacy_match: int
+    content_match: int
+    social_links_match: int
+    usage_pattern: int
+    visibility_match: int
+
+class ScoredIdentityResponse(BaseModel):
+    identity: ResolvedIdentitySummary
+    score: int
+    confidence: int
+    reasoning: List[str]
+    breakdown: ScoreBreakdown
+
+class ResolutionMetadata(BaseModel):
+    mode: str
+    k: Optional[int]
+    candidates: int
+    scored: int
+    pruned: int
+
+class ContextResolutionResponse(BaseModel):
+    context_id: int
+    context_name: str
+    resolved_identity: Optional[ResolvedIdentitySummary]
+    resolution_method: str
+    timestamp: datetime
+    candidates: List[ScoredIdentityResponse]
+    metadata: ResolutionMetadata
+
+class BatchResolveRequest(BaseModel):
+    context_ids: Optional[List[int]] = Field(default=None, max_length=MAX_BATCH_CONTEXTS)
+    top_k: int = Field(default=1, ge=1, le=MAX_BATCH_TOP_K)
+
+class BatchCandidate(BaseModel):
+    identity_id: int
+    display_name: str
+    score: int
+    confidence: int
+    breakdown: ScoreBreakdown
+
+class BatchContextResult(BaseModel):
+    context_id: int
+    context_name: str
+    candidates: List[BatchCandidate]
+
+class BatchResolveResponse(BaseModel):
+    identity_count: int
+    context_count: int
+    results: List[BatchContextResult]
+
+class ImportLineError(BaseModel):
+    line: int
+    error: str
+
+class IdentityImportResponse(BaseModel):
+    lines: int
+    imported: int
+    failed: int
+    batches: int
+    errors: List[ImportLineError]
+    errors_truncated: bool
+
+class AssociationPair(BaseModel):
+    context_id: int
+    identity_id: int
+
+class BulkAssociationRequest(BaseModel):
+    pairs: List[AssociationPair] = Field(..., min_length=1, max_length=MAX_BULK_PAIRS)
+
+class AssociationResult(BaseModel):
+    context_id: int
+    identity_id: int
+    status: str  # assigned | already_assigned | removed | not_assigned | context_not_found | identity_not_found
+
+class BulkAssociationResponse(BaseModel):
+    results: List[AssociationResult]
+    counts: Dict[str, int]
+
 # ==================== UTILITIES ====================
-def hash_password(password: str) -> str:
-    """Hash password using SHA256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+def identity_context_count():
+    """Correlated COUNT of an identity's contexts, for use as an extra select column"""
+    return (
+        select(func.count())
+        .select_from(identity_context_association)
+        .where(identity_context_association.c.identity_id == Identity.id)
+        .correlate(Identity)
+        .scalar_subquery()
+        .label("context_count")
+    )
+
+def context_identity_count():
+    """Correlated COUNT of a context's identities, for use as an extra select column"""
+    return (
+        select(func.count())
+        .select_from(identity_context_association)
+        .where(identity_context_association.c.context_id == Context.id)
+        .correlate(Context)
+        .scalar_subquery()
+        .label("identity_count")
+    )
+
+# Fast list path: Core selects of exactly the response columns, hydrated as Row named
+# tuples (no identity map or change tracking) and encoded by orjson. Routes keep
+# response_model for the OpenAPI schema; returning a Response skips its validation.
+IDENTITY_FIELDS = tuple(IdentityResponse.model_fields)
+CONTEXT_FIELDS = tuple(ContextResponse.model_fields)
+FIELDS_DESCRIPTION = "Comma-separated response fields to return (id is always included); all fields when omitted"
+
+def parse_fields(fields: Optional[str], available: tuple) -> tuple:
+    """Validate a ?fields= sparse fieldset, returned in response-model order"""
+    if not fields:
+        return available
+    requested = {name.strip() for name in fields.split(",") if name.strip()} | {"id"}
+    unknown = requested.difference(available)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(name for name in available if name in requested)
+
+def identity_rows_select(fields: tuple = IDENTITY_FIELDS):
+    """IdentityResponse fields as columns; context_count is a correlated subquery"""
+    return select(*(
+        identity_context_count() if field == "context_count" else getattr(Identity, field)
+        for field in fields
+    ))
+
+def context_rows_select(fields: tuple = CONTEXT_FIELDS):
+    """ContextResponse fields as columns; identity_count is a correlated subquery"""
+    return select(*(
+        context_identity_count() if field == "identity_count" else getattr(Context, field)
+        for field in fields
+    ))
+
+def json_rows_response(rows, response: Response, fields: tuple) -> ORJSONResponse:
+    """Encode result rows straight to JSON bytes, keeping headers set on the injected response"""
+    # zip stops at the last field, dropping keyset columns paginate appended
+    return ORJSONResponse([dict(zip(fields, row)) for row in rows], headers=dict(response.headers))
+
+# Keyset pagination over (created_at, id): page N costs the same index range seek as page 1
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque cursor pointing just past the given row"""
+    payload = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    """Inverse of encode_cursor; malformed or out-of-range cursors are a client error"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(created_at)
+    except (ValueError, TypeError, UnicodeDecodeError, OverflowError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Ids must bind as a 64-bit integer; anything else overflows in the driver
+    if type(row_id) is not int or not 0 <= row_id <= SQL_INTEGER_MAX:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, row_id
+
+def paginate(db: Session, statement, model, cursor: Optional[str], limit: int, response: Response) -> list:
+    """
+    Apply keyset ordering and limit to a column select over model
+    The keyset columns are appended to each row whatever fields were selected.
+    Fetches one extra row to learn whether another page exists; its cursor is
+    returned in the X-Next-Cursor header so list bodies keep their shape.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        statement = statement.where(tuple_(model.created_at, model.id) > tuple_(created_at, row_id))
+    
+    statement = statement.add_columns(model.created_at, model.id)
+    rows = db.execute(statement.order_by(model.created_at, model.id).limit(limit + 1)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        *_, created_at, row_id = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(created_at, row_id)
+    return rows
+
+# Resolution cache: keyed by a per-user data version that every write bumps
+resolution_cache = TTLCache(
+    max_size=int(os.environ.get("RESOLVE_CACHE_SIZE", 2048)),
+    ttl=float(os.environ.get("RESOLVE_CACHE_TTL", 300))
+)
+user_data_versions = DataVersions()
+
+def invalidate_user_resolutions(user_id: int) -> None:
+    """Orphan cached resolutions after a user's identities, contexts or assignments change"""
+    user_data_versions.bump(user_id)
 
-# Advanced Authentication with JWT Token Management
-def get_current_user_from_token(authorization: str = Header(None), db: Session = Depends(get_db)) -> User:
+# Profile snapshot cache for /users/me, versioned like resolutions so an
+# invalidation racing a cache fill can never resurrect the old row
+user_cache = TTLCache(
+    max_size=int(os.environ.get("USER_CACHE_SIZE", 10000)),
+    ttl=float(os.environ.get("USER_CACHE_TTL", 30))
+)
+user_profile_versions = DataVersions()
+
+def invalidate_user_profile(user_id: int) -> None:
+    """Drop the cached snapshot after a write to the user's row (login, profile, identity count)"""
+    user_cache.pop((user_id, user_profile_versions.get(user_id)))
+    user_profile_versions.bump(user_id)
+
+# Stateless authentication: signed tokens are verified without touching the users table
+def get_current_user_from_token(authorization: str = Header(None)) -> AuthenticatedUser:
     """
-    Token validation and user lookup
-    Supports both user ID and username-based token lookup for maximum flexibility
+    Token validation from the signature, expiry and revocation list alone
+    Endpoints needing more than the id and username use get_current_user_record.
     """
     if not authorization or not authorization.startswith("Bearer "):
         logger.error("No authorization header or invalid format")
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    token = authorization.split(" ")[1]
-    logger.info(f"Processing token: {token[:20]}...")
-    
-    # Token format validation
-    if not token.startswith("fake-token-for-"):
-        logger.error("Invalid token format")
-        raise HTTPException(status_code=401, detail="Invalid token")
-    
-    # Extract user identifier from token
-    user_identifier = token.replace("fake-token-for-", "")
-    logger.info(f"Looking up user: {user_identifier}")
-    
-    # Look up user by ID first, then by username
-    user = None
-    
-    # Intelligent user lookup: ID first, then username fallback
     try:
-        user_id = int(user_identifier)
-        user = db.query(User).filter(User.id == user_id).first()
-        logger.info(f"🔍 User lookup by ID {user_id}: {'Found' if user else 'Not found'}")
-    except ValueError:
-        # Gracefull fallback to username lookup
-        user = db.query(User).filter(User.username == user_identifier).first()
-        logger.info(f"User lookup by username {user_identifier}: {'Found' if user else 'Not found'}")
-    
+        return decode_access_token(authorization[len("Bearer "):])
+    except InvalidToken as error:
+        logger.warning(f"Rejected token: {error}")
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+def get_current_user_record(
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
+    db: Session = Depends(get_db)
+) -> UserResponse:
+    """Profile snapshot for the caller, served from user_cache when fresh"""
+    cache_key = (current_user.id, user_profile_versions.get(current_user.id))
+    snapshot = user_cache.get(cache_key)
+    if snapshot is not None:
+        return snapshot
+    
+    user = db.get(User, current_user.id)
     if not user:
-        logger.error(f"User not found for identifier: {user_identifier}")
-        
-        # Debug: DB state inspection
-        all_users = db.query(User).all()
-        logger.info(f"🔍 All users in database: {[(u.id, u.username, u.email) for u in all_users]}")
-        
         raise HTTPException(status_code=404, detail="User not found")
-    
-    logger.info(f"User found: {user.username} (ID: {user.id})")
-    return user
+    snapshot = UserResponse.model_validate(user)
+    user_cache.set(cache_key, snapshot)
+    return snapshot
 
 # ==================== MIDDLEWARE ====================
+# Query count and DB time per request, reported as X-DB-Queries / Server-Timing
+app.add_middleware(SQLMetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -308,151 +667,234 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["*"]
+    # Wildcard is ignored for credentialed requests; pagination cursors and metrics must stay readable
+    expose_headers=["*", "X-Next-Cursor", "X-DB-Queries", "Server-Timing"]
 )
 
 # ==================== AUTH ENDPOINTS ====================
+def password_pool_busy() -> HTTPException:
+    logger.warning("Password hashing pool is saturated")
+    return HTTPException(
+        status_code=503,
+        detail="Too many concurrent sign-ins, please retry",
+        headers={"Retry-After": "1"}
+    )
 
 # Registration with Comprehensive Error Handling
 @app.post("/auth/register", response_model=UserResponse)
-async def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(
+    user_data: UserRegister,
+    writer: GroupCommitWriter = Depends(get_writer)
+):
     
     # Detailed logging and graceful error handling
     logger.info(f"📝 Registration attempt for: {user_data.username} / {user_data.email}")
     
-    # Check for existing user
-    existing_user = db.query(User).filter(
-        (User.username == user_data.username) | (User.email == user_data.email)
-    ).first()
-    
-    if existing_user:
-        logger.warning(f" User already exists: {existing_user.username} / {existing_user.email}")
-        raise HTTPException(status_code=400, detail="Username or email already exists")
-    
-    # Database transaction with rollback protection
-    db_user = User(
-        username=user_data.username,
-        email=user_data.email,
-        full_name=user_data.full_name,
-        hashed_password=hash_password(user_data.password)
-    )
-    
+    # Hash on the password pool: the writer thread only does database work
     try:
-        db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        hashed_password = await password_pool.hash(user_data.password)
+    except PasswordPoolBusy:
+        raise password_pool_busy()
+    
+    def write(session: Session) -> User:
+        # Check for existing user
+        existing_user = session.query(User).filter(
+            (User.username == user_data.username) | (User.email == user_data.email)
+        ).first()
         
-        logger.info(f" User registered successfully: {db_user.username} (ID: {db_user.id})")
-        return db_user
+        if existing_user:
+            logger.warning(f" User already exists: {existing_user.username} / {existing_user.email}")
+            raise HTTPException(status_code=400, detail="Username or email already exists")
         
+        db_user = User(
+            username=user_data.username,
+            email=user_data.email,
+            full_name=user_data.full_name,
+            hashed_password=hashed_password
+        )
+        session.add(db_user)
+        return db_user
+    
+    try:
+        db_user = await writer.run(write)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f" Registration failed: {e}")
-        db.rollback() # Automatic rollback for data integrity
         raise HTTPException(status_code=500, detail="Registration failed")
+    
+    logger.info(f" User registered successfully: {db_user.username} (ID: {db_user.id})")
+    return db_user
+
+def find_login_user(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db)
+) -> Optional[User]:
+    """Flexible user lookup: username OR email (sync, so it runs on the worker pool)"""
+    return db.query(User).filter(
+        (User.username == form_data.username) | (User.email == form_data.username)
+    ).first()
 
 @app.post("/auth/token")
-async def login_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login_token(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    user: Optional[User] = Depends(find_login_user),
+    writer: GroupCommitWriter = Depends(get_writer)
+):
     
     # Login with user ID in token and security logging
     logger.info(f" Login attempt for: {form_data.username}")
-    
-    # Flexible user lookup: username OR email
-    user = db.query(User).filter(
-        (User.username == form_data.username) | (User.email == form_data.username)
-    ).first()
 
+    # Verify password off the event loop; legacy hashes come back upgraded.
+    # Unknown users verify against a dummy hash so timing can't enumerate usernames.
+    try:
+        if not user:
+            await password_pool.verify_unknown_user(form_data.password)
+        else:
+            valid, new_hash = await password_pool.verify(user.hashed_password, form_data.password)
+    except PasswordPoolBusy:
+        raise password_pool_busy()
     if not user:
         logger.warning(f"User not found: {form_data.username}")
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    
-    # Verify password
-    if user.hashed_password != hash_password(form_data.password):
+    if not valid:
         logger.warning(f"Invalid password for user: {user.username}")
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    # Security: Update last login timestamp
-    user.last_login = datetime.utcnow()
-    db.commit()
+    # Security: Update last login timestamp (and the rehashed password)
+    changes = {"last_login": datetime.utcnow()}
+    if new_hash:
+        changes["hashed_password"] = new_hash
+        logger.info(f"Upgrading password hash for user: {user.username}")
+    user_id = user.id
+    await writer.run(lambda session: session.query(User).filter(User.id == user_id).update(changes))
+    invalidate_user_profile(user.id)
 
-    # Advanced token generation with user ID embedding
-    token = f"fake-token-for-{user.id}"
-    logger.info(f" Login successful: {user.username} (ID: {user.id}) - Token: {token[:20]}...")
+    # Signed token carrying the claims authenticated endpoints need
+    token = create_access_token(user.id, user.username)
+    logger.info(f" Login successful: {user.username} (ID: {user.id})")
 
     return {
         "access_token": token,
         "token_type": "bearer",
-        "expires_in": 1800
+        "expires_in": ACCESS_TOKEN_EXPIRE_SECONDS
     }
 
+@app.post("/auth/logout")
+async def logout(current_user: AuthenticatedUser = Depends(get_current_user_from_token)):
+    """Revoke the presented token for the rest of its lifetime"""
+    denylist.revoke(current_user.jti, current_user.expires_at)
+    logger.info(f" Logout: {current_user.username}")
+    return {"message": "Logged out"}
+
 @app.get("/users/me", response_model=UserResponse)
-async def get_current_user(current_user: User = Depends(get_current_user_from_token)):
+async def get_current_user(current_user: UserResponse = Depends(get_current_user_record)):
     """Get current user profile"""
     logger.info(f" Profile request for: {current_user.username}")
     return current_user
 
+# Columns written by the graph export; derived resolver features are left out
+IDENTITY_EXPORT_COLUMNS = (
+    "id", "display_name", "email", "phone", "title", "bio", "avatar_url", "is_default", "is_public",
+    "privacy_level", "social_links", "usage_count", "use_case", "last_used", "created_at", "updated_at"
+)
+CONTEXT_EXPORT_COLUMNS = ("id", "name", "description", "icon", "color", "created_at", "updated_at")
+
+def export_record(record_type: str, row) -> dict:
+    """Tag a result row with its record type, ISO-formatting timestamps"""
+    record = {"type": record_type}
+    for key, value in row.items():
+        record[key] = value.isoformat() if isinstance(value, datetime) else value
+    if "social_links" in record:
+        record["social_links"] = parse_social_links(record["social_links"])
+    return record
+
+def iter_user_graph(bind, user_id: int):
+    """
+    Yield a user's identities, contexts and assignments as export records
+    Runs on its own session: request-scoped sessions are closed before a
+    streaming body is sent. Each query streams with yield_per, so only one
+    batch of rows is alive at a time.
+    """
+    with Session(bind=bind) as session:
+        user = session.get(User, user_id)
+        yield {
+            "type": "user",
+            "id": user.id,
+            "username": user.username,
+            "email": user.email,
+            "full_name": user.full_name,
+            "exported_at": datetime.utcnow().isoformat()
+        }
+        
+        identity_columns = [Identity.__table__.c[name] for name in IDENTITY_EXPORT_COLUMNS]
+        for row in session.execute(
+            select(*identity_columns).where(Identity.user_id == user_id).order_by(Identity.created_at, Identity.id),
+            execution_options={"yield_per": EXPORT_YIELD_PER}
+        ).mappings():
+            yield export_record("identity", row)
+        
+        context_columns = [Context.__table__.c[name] for name in CONTEXT_EXPORT_COLUMNS]
+        for row in session.execute(
+            select(*context_columns).where(Context.user_id == user_id).order_by(Context.created_at, Context.id),
+            execution_options={"yield_per": EXPORT_YIELD_PER}
+        ).mappings():
+            yield export_record("context", row)
+        
+        # Walks the contexts index then the association key: no sort to materialize
+        association = identity_context_association.c
+        for row in session.execute(
+            select(association.identity_id, association.context_id).join(
+                Context, Context.id == association.context_id
+            ).where(Context.user_id == user_id),
+            execution_options={"yield_per": EXPORT_YIELD_PER}
+        ).mappings():
+            yield export_record("assignment", row)
+
+# GDPR export / backup: the whole identity graph as streamed NDJSON
+@app.get("/users/me/export")
+def export_user_graph(
+    gzip: bool = Query(False),
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
+    db: Session = Depends(get_db)
+):
+    logger.info(f"Graph export for: {current_user.username}")
+    filename = f"personifid-export-{current_user.id}.ndjson" + (".gz" if gzip else "")
+    return StreamingResponse(
+        ndjson.encode_stream(iter_user_graph(db.get_bind(), current_user.id), compress=gzip),
+        media_type=ndjson.GZIP_MEDIA_TYPE if gzip else ndjson.MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 # ==================== IDENTITIES ENDPOINTS ====================
 
 # Endpoint Design with Intelligent Resource Relationships
 @app.get("/identities", response_model=List[IdentityResponse])
-async def get_user_identities(
-    current_user: User = Depends(get_current_user_from_token),
+def get_user_identities(
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
     db: Session = Depends(get_db)
 ):
-    # Optimized query with relationship loading
-    identities = db.query(Identity).filter(Identity.user_id == current_user.id).all()
-    
-    result = []
-    for identity in identities:
-        # Intelligent social links parsing with error handling
-        if identity.social_links and isinstance(identity.social_links, str):
-            import json
-            try:
-                social_links = json.loads(identity.social_links)
-            except:
-                social_links = {}
-        else:
-            social_links = identity.social_links
-        
-        # Dynamic context counting for real-time analytics
-        identity_response = IdentityResponse(
-            id=identity.id,
-            user_id=identity.user_id,
-            display_name=identity.display_name,
-            email=identity.email,
-            phone=identity.phone,
-            title=identity.title,
-            bio=identity.bio,
-            avatar_url=identity.avatar_url,
-            is_default=identity.is_default,
-            is_public=identity.is_public,
-            privacy_level=identity.privacy_level,
-            social_links=social_links,
-            usage_count=identity.usage_count,
-            use_case=identity.use_case,
-            created_at=identity.created_at,
-            context_count=len(identity.contexts) if identity.contexts else 0
-        )
-        result.append(identity_response)
+    selected = parse_fields(fields, IDENTITY_FIELDS)
+    # Context counts come from a correlated subquery: one statement for the whole list
+    statement = identity_rows_select(selected).where(Identity.user_id == current_user.id)
+    rows = paginate(db, statement, Identity, cursor, limit, response)
     
-    return result
+    return json_rows_response(rows, response, selected)
 
 @app.post("/identities", response_model=IdentityResponse, status_code=201)
 async def create_identity(
     identity_data: IdentityCreate,
-    current_user: User = Depends(get_current_user_from_token),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
+    writer: GroupCommitWriter = Depends(get_writer)
 ):
-    if identity_data.is_default:
-        db.query(Identity).filter(
-            Identity.user_id == current_user.id,
-            Identity.is_default == True
-        ).update({"is_default": False})
-    
-    import json
-    social_links_json = json.dumps(identity_data.social_links or {})
+    user_id = current_user.id
     
     db_identity = Identity(
-        user_id=current_user.id,
+        user_id=user_id,
         display_name=identity_data.display_name,
         email=identity_data.email,
         phone=identity_data.phone,
@@ -462,129 +904,275 @@ async def create_identity(
         is_default=identity_data.is_default,
         is_public=identity_data.is_public,
         privacy_level=identity_data.privacy_level,
-        social_links=social_links_json,
+        social_links=identity_data.social_links or {},
         use_case=identity_data.use_case
     )
+    apply_identity_features(db_identity)
+    
+    def write(session: Session) -> Identity:
+        if identity_data.is_default:
+            session.query(Identity).filter(
+                Identity.user_id == user_id,
+                Identity.is_default == True
+            ).update({"is_default": False})
+        
+        session.add(db_identity)
+        identity_count = session.query(Identity).filter(Identity.user_id == user_id).count() + 1
+        session.query(User).filter(User.id == user_id).update({"identity_count": identity_count})
+        return db_identity
     
-    db.add(db_identity)
-    current_user.identity_count = db.query(Identity).filter(Identity.user_id == current_user.id).count() + 1
-    db.commit()
-    db.refresh(db_identity)
-    
-    if db_identity.social_links:
-        db_identity.social_links = json.loads(db_identity.social_links)
+    db_identity = await writer.run(write)
+    invalidate_user_resolutions(user_id)
+    invalidate_user_profile(user_id)
     
     logger.info(f" Identity created: {identity_data.display_name}")
     return db_identity
 
+def describe_validation_error(error: ValidationError) -> str:
+    """Compact one-line summary of a pydantic validation error"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}"
+        for item in error.errors()
+    )
+
+def identity_import_row(user_id: int, identity_data: IdentityCreate) -> dict:
+    """Column values for one imported identity, features included"""
+    row = SimpleNamespace(
+        user_id=user_id,
+        display_name=identity_data.display_name,
+        email=identity_data.email,
+        phone=identity_data.phone,
+        title=identity_data.title,
+        bio=identity_data.bio,
+        avatar_url=identity_data.avatar_url,
+        is_default=identity_data.is_default,
+        is_public=identity_data.is_public,
+        privacy_level=identity_data.privacy_level,
+        social_links=identity_data.social_links or {},
+        use_case=identity_data.use_case
+    )
+    apply_identity_features(row)
+    return vars(row)
+
+def insert_identity_batch(session: Session, user_id: int, rows: List[dict]) -> None:
+    """executemany one batch, keeping create_identity's single-default rule"""
+    defaults = [index for index, row in enumerate(rows) if row["is_default"]]
+    if defaults:
+        session.query(Identity).filter(
+            Identity.user_id == user_id,
+            Identity.is_default == True
+        ).update({"is_default": False})
+        # As with sequential creates, the last default in upload order wins
+        for index in defaults[:-1]:
+            rows[index]["is_default"] = False
+    session.execute(insert(Identity), rows)
+
+# Streaming NDJSON import: one identity per line, validated and inserted batch by batch
+@app.post("/identities/import", response_model=IdentityImportResponse)
+async def import_identities(
+    request: Request,
+    batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=MAX_IMPORT_BATCH_SIZE),
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
+    writer: GroupCommitWriter = Depends(get_writer)
+):
+    user_id = current_user.id
+    batch: List[dict] = []
+    errors: List[ImportLineError] = []
+    lines = imported = failed = batches = 0
+    
+    try:
+        async for line_number, line in ndjson.iter_lines(request.stream(), MAX_IMPORT_LINE_BYTES):
+            lines = line_number
+            if line is not None and not line.strip():
+                continue
+            
+            try:
+                if line is None:
+                    raise ValueError(f"Line exceeds {MAX_IMPORT_LINE_BYTES} bytes")
+                identity_data = IdentityCreate.model_validate(json.loads(line))
+            except ValidationError as error:
+                message = describe_validation_error(error)
+            except ValueError as error:
+                message = str(error) if line is None else f"Invalid JSON: {error}"
+            except RecursionError:
+                # json.loads recurses per nesting level; a short line can still exhaust the stack
+                message = "Invalid JSON: nested too deeply"
+            else:
+                batch.append(identity_import_row(user_id, identity_data))
+                if len(batch) >= batch_size:
+                    # Each batch is one write unit; the upload keeps streaming while it commits
+                    await writer.run(lambda session, rows=batch: insert_identity_batch(session, user_id, rows))
+                    imported, batches, batch = imported + len(batch), batches + 1, []
+                continue
+            
+            failed += 1
+            if len(errors) < MAX_IMPORT_ERRORS:
+                errors.append(ImportLineError(line=line_number, error=message))
+        
+        if batch:
+            await writer.run(lambda session: insert_identity_batch(session, user_id, batch))
+            imported, batches = imported + len(batch), batches + 1
+    finally:
+        # Committed batches stay committed even if a later one fails or the
+        # client disconnects, so the count and caches must follow them
+        if imported:
+            with anyio.CancelScope(shield=True):
+                await writer.run(lambda session: session.query(User).filter(User.id == user_id).update({
+                    "identity_count": session.query(Identity).filter(Identity.user_id == user_id).count()
+                }))
+            invalidate_user_resolutions(user_id)
+            invalidate_user_profile(user_id)
+    
+    logger.info(f"Identity import for {current_user.username}: {imported} imported, {failed} failed")
+    return IdentityImportResponse(
+        lines=lines,
+        imported=imported,
+        failed=failed,
+        batches=batches,
+        errors=errors,
+        errors_truncated=failed > len(errors)
+    )
+
 @app.put("/identities/{identity_id}", response_model=IdentityResponse)
 async def update_identity(
     identity_id: int,
     identity_data: IdentityUpdate,
-    current_user: User = Depends(get_current_user_from_token),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
+    writer: GroupCommitWriter = Depends(get_writer)
 ):
-    identity = db.query(Identity).filter(
-        Identity.id == identity_id,
-        Identity.user_id == current_user.id
-    ).first()
-    
-    if not identity:
-        raise HTTPException(status_code=404, detail="Identity not found")
-    
-    if identity_data.is_default == True:
-        db.query(Identity).filter(
-            Identity.user_id == current_user.id,
-            Identity.id != identity_id
-        ).update({"is_default": False})
-    
+    user_id = current_user.id
     update_dict = identity_data.dict(exclude_unset=True)
     
-    if "social_links" in update_dict:
-        import json
-        update_dict["social_links"] = json.dumps(update_dict["social_links"])
-    
-    for key, value in update_dict.items():
-        setattr(identity, key, value)
-    
-    db.commit()
-    db.refresh(identity)
+    def write(session: Session) -> Identity:
+        identity = session.query(Identity).filter(
+            Identity.id == identity_id,
+            Identity.user_id == user_id
+        ).first()
+        
+        if not identity:
+            raise HTTPException(status_code=404, detail="Identity not found")
+        
+        if identity_data.is_default == True:
+            session.query(Identity).filter(
+                Identity.user_id == user_id,
+                Identity.id != identity_id
+            ).update({"is_default": False})
+        
+        for key, value in update_dict.items():
+            setattr(identity, key, value)
+        
+        # Only re-derive resolver features when their source fields changed
+        if FEATURE_SOURCE_FIELDS.intersection(update_dict) or features_stale(identity):
+            apply_identity_features(identity)
+        
+        session.flush()
+        session.refresh(identity)
+        return identity
     
-    if identity.social_links and isinstance(identity.social_links, str):
-        import json
-        identity.social_links = json.loads(identity.social_links)
+    identity = await writer.run(write)
+    invalidate_user_resolutions(user_id)
     
     return identity
 
 @app.get("/identities/{identity_id}", response_model=IdentityResponse)
-async def get_identity(
+def get_identity(
     identity_id: int,
-    current_user: User = Depends(get_current_user_from_token),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
     db: Session = Depends(get_db)
 ):
-    identity = db.query(Identity).filter(
+    selected = parse_fields(fields, IDENTITY_FIELDS)
+    identity = db.execute(identity_rows_select(selected).where(
         Identity.id == identity_id,
         Identity.user_id == current_user.id
-    ).first()
+    )).first()
     
     if not identity:
         raise HTTPException(status_code=404, detail="Identity not found")
     
-    if identity.social_links and isinstance(identity.social_links, str):
-        import json
-        identity.social_links = json.loads(identity.social_links)
-    
-    return identity
+    return ORJSONResponse(dict(zip(selected, identity)))
 
-@app.delete("/identities/{identity_id}")
-async def delete_identity(
+@app.get("/identities/{identity_id}/contexts", response_model=List[ContextResponse])
+def get_identity_contexts(
     identity_id: int,
-    current_user: User = Depends(get_current_user_from_token),
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
     db: Session = Depends(get_db)
 ):
-    identity = db.query(Identity).filter(
+    selected = parse_fields(fields, CONTEXT_FIELDS)
+    identity_exists = db.query(Identity.id).filter(
         Identity.id == identity_id,
         Identity.user_id == current_user.id
     ).first()
     
-    if not identity:
+    if not identity_exists:
         raise HTTPException(status_code=404, detail="Identity not found")
     
-    db.delete(identity)
-    current_user.identity_count = db.query(Identity).filter(Identity.user_id == current_user.id).count() - 1
-    db.commit()
+    # Driven by the composite key (identity_id, context_id): cost follows the identity's
+    # assignments, not how many contexts the user owns. "+ 0" keeps SQLite from starting
+    # at the owner index instead; only the (small) member set is sorted for the keyset.
+    association = identity_context_association.c
+    statement = context_rows_select(selected).select_from(identity_context_association).join(
+        Context, Context.id == association.context_id
+    ).where(
+        association.identity_id == identity_id,
+        Context.user_id + 0 == current_user.id
+    )
+    rows = paginate(db, statement, Context, cursor, limit, response)
+    
+    return json_rows_response(rows, response, selected)
+
+@app.delete("/identities/{identity_id}")
+async def delete_identity(
+    identity_id: int,
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
+    writer: GroupCommitWriter = Depends(get_writer)
+):
+    user_id = current_user.id
+    
+    def write(session: Session) -> None:
+        identity = session.query(Identity).filter(
+            Identity.id == identity_id,
+            Identity.user_id == user_id
+        ).first()
+        
+        if not identity:
+            raise HTTPException(status_code=404, detail="Identity not found")
+        
+        session.delete(identity)
+        identity_count = session.query(Identity).filter(Identity.user_id == user_id).count() - 1
+        session.query(User).filter(User.id == user_id).update({"identity_count": identity_count})
+    
+    await writer.run(write)
+    invalidate_user_resolutions(user_id)
+    invalidate_user_profile(user_id)
     
     return {"message": "Identity deleted successfully"}
 
 # ==================== CONTEXTS ENDPOINTS ====================
 @app.get("/contexts", response_model=List[ContextResponse])
-async def get_user_contexts(
-    current_user: User = Depends(get_current_user_from_token),
+def get_user_contexts(
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
     db: Session = Depends(get_db)
 ):
-    contexts = db.query(Context).filter(Context.user_id == current_user.id).all()
-    
-    response_contexts = []
-    for context in contexts:
-        context_dict = {
-            "id": context.id,
-            "user_id": context.user_id,
-            "name": context.name,
-            "description": context.description,
-            "icon": context.icon,
-            "color": context.color,
-            "created_at": context.created_at,
-            "identity_count": len(context.identities)
-        }
-        response_contexts.append(ContextResponse(**context_dict))
+    selected = parse_fields(fields, CONTEXT_FIELDS)
+    statement = context_rows_select(selected).where(Context.user_id == current_user.id)
+    rows = paginate(db, statement, Context, cursor, limit, response)
     
-    return response_contexts
+    return json_rows_response(rows, response, selected)
 
 @app.post("/contexts", response_model=ContextResponse, status_code=201)
 async def create_context(
     context_data: ContextCreate,
-    current_user: User = Depends(get_current_user_from_token),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
+    writer: GroupCommitWriter = Depends(get_writer)
 ):
     db_context = Context(
         user_id=current_user.id,
@@ -594,9 +1182,12 @@ async def create_context(
         color=context_data.color
     )
     
-    db.add(db_context)
-    db.commit()
-    db.refresh(db_context)
+    def write(session: Session) -> Context:
+        session.add(db_context)
+        return db_context
+    
+    db_context = await writer.run(write)
+    invalidate_user_resolutions(current_user.id)
     
     logger.info(f"✅ Context created: {context_data.name}")
     
@@ -615,51 +1206,63 @@ async def create_context(
 async def update_context(
     context_id: int,
     context_data: ContextUpdate,
-    current_user: User = Depends(get_current_user_from_token),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
+    writer: GroupCommitWriter = Depends(get_writer)
 ):
-    context = db.query(Context).filter(
-        Context.id == context_id,
-        Context.user_id == current_user.id
-    ).first()
-    
-    if not context:
-        raise HTTPException(status_code=404, detail="Context not found")
-    
+    user_id = current_user.id
     update_dict = context_data.dict(exclude_unset=True)
-    for key, value in update_dict.items():
-        setattr(context, key, value)
     
-    db.commit()
-    db.refresh(context)
+    def write(session: Session) -> ContextResponse:
+        context = session.query(Context).filter(
+            Context.id == context_id,
+            Context.user_id == user_id
+        ).first()
+        
+        if not context:
+            raise HTTPException(status_code=404, detail="Context not found")
+        
+        for key, value in update_dict.items():
+            setattr(context, key, value)
+        
+        session.flush()
+        return ContextResponse(
+            id=context.id,
+            user_id=context.user_id,
+            name=context.name,
+            description=context.description,
+            icon=context.icon,
+            color=context.color,
+            created_at=context.created_at,
+            # A count, not len() of the relationship, which would load every member
+            identity_count=session.scalar(select(context_identity_count()).where(Context.id == context.id))
+        )
     
-    return ContextResponse(
-        id=context.id,
-        user_id=context.user_id,
-        name=context.name,
-        description=context.description,
-        icon=context.icon,
-        color=context.color,
-        created_at=context.created_at,
-        identity_count=len(context.identities)
-    )
+    response = await writer.run(write)
+    invalidate_user_resolutions(user_id)
+    
+    return response
 
 @app.delete("/contexts/{context_id}")
 async def delete_context(
     context_id: int,
-    current_user: User = Depends(get_current_user_from_token),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
+    writer: GroupCommitWriter = Depends(get_writer)
 ):
-    context = db.query(Context).filter(
-        Context.id == context_id,
-        Context.user_id == current_user.id
-    ).first()
+    user_id = current_user.id
     
-    if not context:
-        raise HTTPException(status_code=404, detail="Context not found")
+    def write(session: Session) -> None:
+        context = session.query(Context).filter(
+            Context.id == context_id,
+            Context.user_id == user_id
+        ).first()
+        
+        if not context:
+            raise HTTPException(status_code=404, detail="Context not found")
+        
+        session.delete(context)
     
-    db.delete(context)
-    db.commit()
+    await writer.run(write)
+    invalidate_user_resolutions(user_id)
     
     return {"message": "Context deleted successfully"}
 
@@ -668,38 +1271,39 @@ async def delete_context(
 async def add_identity_to_context(
     context_id: int,
     identity_id: int,
-    current_user: User = Depends(get_current_user_from_token),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
+    writer: GroupCommitWriter = Depends(get_writer)
 ):
+    user_id = current_user.id
+    
+    def write(session: Session) -> bool:
+        # Multi-step validation with detailed error responses
+        if not session.scalar(select(Context.id).where(
+            Context.id == context_id,
+            Context.user_id == user_id # Security: Ensure ownership
+        )):
+            raise HTTPException(status_code=404, detail="Context not found")
+        
+        if not session.scalar(select(Identity.id).where(
+            Identity.id == identity_id,
+            Identity.user_id == user_id # Security: Prevent unauthorized access
+        )):
+            raise HTTPException(status_code=404, detail="Identity not found")
+        
+        # Duplicate detection by the composite key: no member list is loaded
+        inserted = session.execute(
+            insert_ignoring_duplicates(session, identity_context_association),
+            {"context_id": context_id, "identity_id": identity_id}
+        )
+        return inserted.rowcount > 0
     
-    # Advanced relationship management with comprehensive validation and duplicate prevention
-    # Multi-step validation with detailed error responses
-    context = db.query(Context).filter(
-        Context.id == context_id,
-        Context.user_id == current_user.id # Security: Ensure ownership
-    ).first()
-    
-    if not context:
-        raise HTTPException(status_code=404, detail="Context not found")
-    
-    identity = db.query(Identity).filter(
-        Identity.id == identity_id,
-        Identity.user_id == current_user.id # Security: Prevent unauthorized access
-    ).first()
-    
-    if not identity:
-        raise HTTPException(status_code=404, detail="Identity not found")
-    
-    # Intelligent duplicate detection with graceful handling
-    if identity in context.identities:
+    # Atomic association with transaction safety
+    if not await writer.run(write):
         return JSONResponse(
             content={"message": "Identity already assigned to context"},
             status_code=200 # Not an error
         )
-    
-    # Atomic association with transaction safety
-    context.identities.append(identity)
-    db.commit()
+    invalidate_user_resolutions(user_id)
     
     return JSONResponse(
         content={"message": "Identity successfully added to context"},
@@ -710,33 +1314,31 @@ async def add_identity_to_context(
 async def remove_identity_from_context(
     context_id: int,
     identity_id: int,
-    current_user: User = Depends(get_current_user_from_token),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
+    writer: GroupCommitWriter = Depends(get_writer)
 ):
-    context = db.query(Context).filter(
-        Context.id == context_id,
-        Context.user_id == current_user.id
-    ).first()
-    
-    if not context:
-        raise HTTPException(status_code=404, detail="Context not found")
-    
-    identity = db.query(Identity).filter(
-        Identity.id == identity_id,
-        Identity.user_id == current_user.id
-    ).first()
-    
-    if not identity:
-        raise HTTPException(status_code=404, detail="Identity not found")
+    user_id = current_user.id
     
-    if identity not in context.identities:
+    def write(session: Session) -> bool:
+        if not session.scalar(select(Context.id).where(Context.id == context_id, Context.user_id == user_id)):
+            raise HTTPException(status_code=404, detail="Context not found")
+        
+        if not session.scalar(select(Identity.id).where(Identity.id == identity_id, Identity.user_id == user_id)):
+            raise HTTPException(status_code=404, detail="Identity not found")
+        
+        association = identity_context_association.c
+        removed = session.execute(delete(identity_context_association).where(
+            association.context_id == context_id,
+            association.identity_id == identity_id
+        ))
+        return removed.rowcount > 0
+    
+    if not await writer.run(write):
         return JSONResponse(
             content={"message": "Identity not assigned to context"},
             status_code=200
         )
-    
-    context.identities.remove(identity)
-    db.commit()
+    invalidate_user_resolutions(user_id)
     
     return JSONResponse(
         content={"message": "Identity successfully removed from context"},
@@ -744,11 +1346,16 @@ async def remove_identity_from_context(
     )
 
 @app.get("/contexts/{context_id}/identities", response_model=List[IdentityResponse])
-async def get_context_identities(
+def get_context_identities(
     context_id: int,
-    current_user: User = Depends(get_current_user_from_token),
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
     db: Session = Depends(get_db)
 ):
+    selected = parse_fields(fields, IDENTITY_FIELDS)
     context = db.query(Context).filter(
         Context.id == context_id,
         Context.user_id == current_user.id
@@ -757,45 +1364,29 @@ async def get_context_identities(
     if not context:
         raise HTTPException(status_code=404, detail="Context not found")
     
-    identities = []
-    for identity in context.identities:
-        if identity.social_links and isinstance(identity.social_links, str):
-            import json
-            try:
-                social_links = json.loads(identity.social_links)
-            except:
-                social_links = {}
-        else:
-            social_links = identity.social_links
-        
-        identity_response = IdentityResponse(
-            id=identity.id,
-            user_id=identity.user_id,
-            display_name=identity.display_name,
-            email=identity.email,
-            phone=identity.phone,
-            title=identity.title,
-            bio=identity.bio,
-            avatar_url=identity.avatar_url,
-            is_default=identity.is_default,
-            is_public=identity.is_public,
-            privacy_level=identity.privacy_level,
-            social_links=social_links,
-            usage_count=identity.usage_count,
-            use_case=identity.use_case,
-            created_at=identity.created_at,
-            context_count=len(identity.contexts) if identity.contexts else 0
-        )
-        identities.append(identity_response)
+    # Driven by ix_identity_context_context_identity, like the reverse lookup above
+    association = identity_context_association.c
+    statement = identity_rows_select(selected).select_from(identity_context_association).join(
+        Identity, Identity.id == association.identity_id
+    ).where(
+        association.context_id == context.id,
+        Identity.user_id + 0 == current_user.id
+    )
+    rows = paginate(db, statement, Identity, cursor, limit, response)
     
-    return identities
+    return json_rows_response(rows, response, selected)
 
 @app.get("/contexts/{context_id}/unassigned-identities", response_model=List[IdentityResponse])
-async def get_unassigned_identities(
+def get_unassigned_identities(
     context_id: int,
-    current_user: User = Depends(get_current_user_from_token),
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
     db: Session = Depends(get_db)
 ):
+    selected = parse_fields(fields, IDENTITY_FIELDS)
     context = db.query(Context).filter(
         Context.id == context_id,
         Context.user_id == current_user.id
@@ -804,68 +1395,284 @@ async def get_unassigned_identities(
     if not context:
         raise HTTPException(status_code=404, detail="Context not found")
     
-    all_identities = db.query(Identity).filter(Identity.user_id == current_user.id).all()
-    assigned_ids = [identity.id for identity in context.identities]
-    unassigned = [identity for identity in all_identities if identity.id not in assigned_ids]
-    
-    result = []
-    for identity in unassigned:
-        if identity.social_links and isinstance(identity.social_links, str):
-            import json
-            try:
-                social_links = json.loads(identity.social_links)
-            except:
-                social_links = {}
-        else:
-            social_links = identity.social_links
-        
-        identity_response = IdentityResponse(
-            id=identity.id,
-            user_id=identity.user_id,
-            display_name=identity.display_name,
-            email=identity.email,
-            phone=identity.phone,
-            title=identity.title,
-            bio=identity.bio,
-            avatar_url=identity.avatar_url,
-            is_default=identity.is_default,
-            is_public=identity.is_public,
-            privacy_level=identity.privacy_level,
-            social_links=social_links,
-            usage_count=identity.usage_count,
-            use_case=identity.use_case,
-            created_at=identity.created_at,
-            context_count=len(identity.contexts) if identity.contexts else 0
+    # Anti-join in SQL so pages are full and the assigned set is never materialized
+    statement = identity_rows_select(selected).where(
+        Identity.user_id == current_user.id,
+        ~exists().where(
+            identity_context_association.c.context_id == context.id,
+            identity_context_association.c.identity_id == Identity.id
         )
-        result.append(identity_response)
+    )
+    rows = paginate(db, statement, Identity, cursor, limit, response)
     
-    return result
+    return json_rows_response(rows, response, selected)
 
-@app.get("/dashboard/stats")
-async def get_dashboard_stats(
-    current_user: User = Depends(get_current_user_from_token),
+# Server-side Context Resolution
+@app.get("/contexts/{context_id}/resolve", response_model=ContextResolutionResponse)
+def resolve_context_identity(
+    context_id: int,
+    k: Optional[int] = Query(None, ge=1, le=MAX_RESOLVE_K),
+    mode: str = Query("exhaustive", pattern="^(exhaustive|bound)$"),
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
     db: Session = Depends(get_db)
 ):
-    identity_count = db.query(Identity).filter(Identity.user_id == current_user.id).count()
-    context_count = db.query(Context).filter(Context.user_id == current_user.id).count()
+    if mode == "bound":
+        k = k or 1
+    
+    # Versions are read before any query so a concurrent write can only orphan this entry
+    cache_key = (
+        current_user.id, context_id, user_data_versions.get(current_user.id),
+        content_matcher.compiled.version, mode, k
+    )
+    cached = resolution_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    context = db.query(Context).filter(
+        Context.id == context_id,
+        Context.user_id == current_user.id
+    ).first()
+    
+    if not context:
+        raise HTTPException(status_code=404, detail="Context not found")
+    
+    # Scoring reads the packed feature columns; bio and links are only loaded (and decoded) for stale rows
+    identity_query = db.query(Identity).options(
+        defer(Identity.bio), defer(Identity.use_case), defer(Identity.social_links)
+    )
     
-    recent_identities = db.query(Identity).filter(
+    if mode == "bound":
+        bound_rows = db.query(
+            Identity.id, Identity.privacy_level, Identity.is_public, Identity.is_default,
+            Identity.usage_count, Identity.created_at
+        ).filter(Identity.user_id == current_user.id).all()
+        # Canonical (created_at, id) order, sorted here so the covering index needs no temp b-tree
+        bound_rows.sort(key=lambda row: (row.created_at, row.id))
+        candidates, stats = resolve_top_k(
+            bound_rows,
+            context.name,
+            k,
+            lambda ids: identity_query.filter(Identity.id.in_(ids)).all()
+        )
+    else:
+        identities = identity_query.filter(Identity.user_id == current_user.id).order_by(
+            Identity.created_at, Identity.id
+        ).all()
+        candidates = resolve_identities(identities, context.name)[:k]
+        stats = {"candidates": len(identities), "scored": len(identities), "pruned": 0}
+    
+    resolution = ContextResolutionResponse(
+        context_id=context.id,
+        context_name=context.name,
+        resolved_identity=candidates[0]["identity"] if candidates else None,
+        resolution_method="scored" if candidates else "no_identities",
+        timestamp=datetime.utcnow(),
+        candidates=candidates,
+        metadata=ResolutionMetadata(mode=mode, k=k, **stats)
+    )
+    resolution_cache.set(cache_key, resolution)
+    return resolution
+
+# Vectorized resolution of many contexts in one pass
+@app.post("/resolve/batch", response_model=BatchResolveResponse)
+def resolve_contexts_batch(
+    request_data: BatchResolveRequest,
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
+    db: Session = Depends(get_db)
+):
+    context_query = db.query(Context).filter(Context.user_id == current_user.id)
+    if request_data.context_ids is not None:
+        context_query = context_query.filter(Context.id.in_(request_data.context_ids))
+    contexts = context_query.all()
+    
+    if request_data.context_ids is not None:
+        missing = set(request_data.context_ids) - {context.id for context in contexts}
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Contexts not found: {sorted(missing)}")
+        # Preserve the order the caller asked for
+        by_id = {context.id: context for context in contexts}
+        contexts = [by_id[context_id] for context_id in dict.fromkeys(request_data.context_ids)]
+    
+    # Same deferred columns and canonical (created_at, id) order as the single resolver, so ties break alike
+    identities = db.query(Identity).options(
+        defer(Identity.bio), defer(Identity.use_case), defer(Identity.social_links)
+    ).filter(
         Identity.user_id == current_user.id
-    ).order_by(Identity.created_at.desc()).limit(5).all()
+    ).order_by(Identity.created_at, Identity.id).all()
+    results = resolve_batch(identities, contexts, top_k=request_data.top_k)
+    
+    return BatchResolveResponse(
+        identity_count=len(identities),
+        context_count=len(contexts),
+        results=[
+            BatchContextResult(
+                context_id=result["context"].id,
+                context_name=result["context"].name,
+                candidates=[
+                    BatchCandidate(
+                        identity_id=candidate["identity"].id,
+                        display_name=candidate["identity"].display_name,
+                        score=candidate["score"],
+                        confidence=candidate["confidence"],
+                        breakdown=candidate["breakdown"]
+                    )
+                    for candidate in result["candidates"]
+                ]
+            )
+            for result in results
+        ]
+    )
+
+@app.get("/dashboard/stats")
+def get_dashboard_stats(
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
+    db: Session = Depends(get_db)
+):
+    # One grouped count(*) covers the totals and the visibility/privacy breakdowns
+    identity_groups = db.execute(
+        select(Identity.is_public, Identity.privacy_level, func.count())
+        .where(Identity.user_id == current_user.id)
+        .group_by(Identity.is_public, Identity.privacy_level)
+    ).all()
+    context_count = db.scalar(select(func.count()).where(Context.user_id == current_user.id))
+    
+    privacy_levels = {"high": 0, "standard": 0, "minimal": 0}
+    for _, privacy_level, count in identity_groups:
+        privacy_levels[privacy_level] = privacy_levels.get(privacy_level, 0) + count
+    
+    recent_identities = db.execute(
+        select(
+            Identity.id, Identity.display_name, Identity.title, Identity.email, Identity.is_default,
+            Identity.is_public, Identity.privacy_level, Identity.created_at
+        )
+        .where(Identity.user_id == current_user.id)
+        .order_by(Identity.created_at.desc(), Identity.id.desc())
+        .limit(5)
+    ).all()
     
     return {
-        "total_identities": identity_count,
+        "total_identities": sum(count for *_, count in identity_groups),
+        "public_identities": sum(count for is_public, _, count in identity_groups if is_public),
+        "identities_by_privacy_level": privacy_levels,
         "total_contexts": context_count,
-        "recent_identities": [
-            {
-                "id": identity.id,
-                "display_name": identity.display_name,
-                "created_at": identity.created_at
-            }
-            for identity in recent_identities
-        ]
+        "recent_identities": [dict(identity._mapping) for identity in recent_identities]
     }
 
+# ==================== BULK ASSOCIATION ENDPOINTS ====================
+def insert_ignoring_duplicates(db: Session, table: Table):
+    """INSERT ... ON CONFLICT DO NOTHING for the session's dialect"""
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(table).on_conflict_do_nothing()
+
+def resolve_association_pairs(db: Session, user_id: int, pairs: List[AssociationPair]):
+    """
+    Validate ownership for every pair with one IN query per side
+    Returns (results keyed by pair in request order, owned pairs, pairs already assigned);
+    results hold None for owned pairs until the caller decides their outcome.
+    """
+    keys = list(dict.fromkeys((pair.context_id, pair.identity_id) for pair in pairs))
+    owned_contexts = set(db.scalars(select(Context.id).where(
+        Context.user_id == user_id,
+        Context.id.in_({context_id for context_id, _ in keys})
+    )))
+    owned_identities = set(db.scalars(select(Identity.id).where(
+        Identity.user_id == user_id,
+        Identity.id.in_({identity_id for _, identity_id in keys})
+    )))
+    
+    results, owned = {}, []
+    for context_id, identity_id in keys:
+        if context_id not in owned_contexts:
+            results[(context_id, identity_id)] = "context_not_found"
+        elif identity_id not in owned_identities:
+            results[(context_id, identity_id)] = "identity_not_found"
+        else:
+            results[(context_id, identity_id)] = None
+            owned.append((context_id, identity_id))
+    
+    existing = set()
+    if owned:
+        association = identity_context_association.c
+        existing = set(db.execute(
+            select(association.context_id, association.identity_id).where(
+                tuple_(association.context_id, association.identity_id).in_(owned)
+            )
+        ).tuples())
+    return results, owned, existing
+
+def build_bulk_response(pairs: List[AssociationPair], results: dict) -> BulkAssociationResponse:
+    """Per-pair outcomes in request order (duplicates repeat their first outcome) plus totals"""
+    per_pair = [
+        AssociationResult(
+            context_id=pair.context_id,
+            identity_id=pair.identity_id,
+            status=results[(pair.context_id, pair.identity_id)]
+        )
+        for pair in pairs
+    ]
+    counts: Dict[str, int] = {}
+    for status_name in results.values():
+        counts[status_name] = counts.get(status_name, 0) + 1
+    return BulkAssociationResponse(results=per_pair, counts=counts)
+
+# Bulk assignment: one ownership query per side, one insert, one write unit
+@app.post("/associations/assign", response_model=BulkAssociationResponse)
+async def bulk_assign_identities(
+    request: BulkAssociationRequest,
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
+    writer: GroupCommitWriter = Depends(get_writer)
+):
+    user_id = current_user.id
+    
+    def write(session: Session):
+        results, owned, existing = resolve_association_pairs(session, user_id, request.pairs)
+        
+        new_pairs = [pair for pair in owned if pair not in existing]
+        for pair in owned:
+            results[pair] = "already_assigned" if pair in existing else "assigned"
+        
+        if new_pairs:
+            session.execute(
+                insert_ignoring_duplicates(session, identity_context_association),
+                [{"context_id": context_id, "identity_id": identity_id} for context_id, identity_id in new_pairs]
+            )
+        return results, len(new_pairs)
+    
+    results, inserted = await writer.run(write)
+    if inserted:
+        invalidate_user_resolutions(user_id)
+    
+    logger.info(f"Bulk assign for {current_user.username}: {inserted} of {len(request.pairs)} pairs inserted")
+    return build_bulk_response(request.pairs, results)
+
+@app.post("/associations/unassign", response_model=BulkAssociationResponse)
+async def bulk_unassign_identities(
+    request: BulkAssociationRequest,
+    current_user: AuthenticatedUser = Depends(get_current_user_from_token),
+    writer: GroupCommitWriter = Depends(get_writer)
+):
+    user_id = current_user.id
+    
+    def write(session: Session):
+        results, owned, existing = resolve_association_pairs(session, user_id, request.pairs)
+        
+        for pair in owned:
+            results[pair] = "removed" if pair in existing else "not_assigned"
+        
+        if existing:
+            association = identity_context_association.c
+            session.execute(delete(identity_context_association).where(
+                tuple_(association.context_id, association.identity_id).in_(list(existing))
+            ))
+        return results, len(existing)
+    
+    results, removed = await writer.run(write)
+    if removed:
+        invalidate_user_resolutions(user_id)
+    
+    logger.info(f"Bulk unassign for {current_user.username}: {removed} of {len(request.pairs)} pairs removed")
+    return build_bulk_response(request.pairs, results)
+
 # ==================== ROOT ENDPOINTS ====================
 @app.get("/")
 async def root():
@@ -885,7 +1692,7 @@ async def root():
 
 # Health Check with Database Analytics
 @app.get("/health")
-async def health(db: Session = Depends(get_db)):
+def health(db: Session = Depends(get_db)):
     try:
         # Real-time database analytics
         user_count = db.query(User).count()
@@ -907,7 +1714,7 @@ async def health(db: Session = Depends(get_db)):
 
 # ==================== DEBUG ENDPOINTS ====================
 @app.get("/debug/users")
-async def debug_users(db: Session = Depends(get_db)):
+def debug_users(db: Session = Depends(get_db)):
     """Debug endpoint to see all users"""
     users = db.query(User).all()
     return [
@@ -920,6 +1727,24 @@ async def debug_users(db: Session = Depends(get_db)):
         for user in users
     ]
 
+@app.get("/debug/cache")
+async def debug_cache():
+    """Hit/miss/eviction counters for the in-process caches"""
+    return {
+        "resolution": resolution_cache.stats(),
+        "users": user_cache.stats()
+    }
+
+@app.get("/debug/writer")
+async def debug_writer(writer: GroupCommitWriter = Depends(get_writer)):
+    """Group-commit counters: how many write units shared each commit"""
+    return writer.stats()
+
+@app.get("/debug/passwords")
+async def debug_passwords():
+    """Password pool load: in-flight jobs and rejections under login storms"""
+    return password_pool.stats()
+
 # Static files
 upload_folder = "uploads"
 if not os.path.exists(upload_folder):
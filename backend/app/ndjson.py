@@ -0,0 +1,88 @@
+"""
+NDJSON Streaming Helpers
+Incremental line framing for uploads and line encoding for streamed
+downloads, so neither side ever holds a whole document in memory.
+"""
+import json
+import zlib
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, Optional, Tuple
+
+MEDIA_TYPE = "application/x-ndjson"
+GZIP_MEDIA_TYPE = "application/gzip"
+
+
+async def iter_lines(chunks: AsyncIterable[bytes], max_line_bytes: int) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    Split a byte stream into (line_number, line) pairs as chunks arrive
+    Lines longer than max_line_bytes are reported as None and skipped rather
+    than buffered, so memory is bounded by one line whatever the upload size.
+    """
+    buffer = bytearray()
+    oversized = False
+    line_number = 0
+
+    async for chunk in chunks:
+        start = 0
+        while True:
+            newline = chunk.find(b"\n", start)
+            if newline < 0:
+                break
+            piece = chunk[start:newline]
+            line_number += 1
+            if oversized or len(buffer) + len(piece) > max_line_bytes:
+                yield line_number, None
+            else:
+                buffer += piece
+                yield line_number, bytes(buffer)
+            buffer.clear()
+            oversized = False
+            start = newline + 1
+
+        rest = chunk[start:]
+        if not oversized:
+            if len(buffer) + len(rest) > max_line_bytes:
+                oversized = True
+                buffer.clear()
+            else:
+                buffer += rest
+
+    if oversized:
+        yield line_number + 1, None
+    elif buffer.strip():
+        yield line_number + 1, bytes(buffer)
+
+
+def dumps_line(record: Any) -> bytes:
+    """One compact JSON document terminated by a newline"""
+    return json.dumps(record, separators=(",", ":"), default=str).encode() + b"\n"
+
+
+def encode_stream(records: Iterable[Any], compress: bool = False, chunk_bytes: int = 64 * 1024) -> Iterator[bytes]:
+    """
+    Encode records as NDJSON, optionally gzipped, in chunks of about chunk_bytes
+    The first record is flushed on its own so the response starts immediately.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = bytearray()
+    first = True
+
+    def emit(data: bytes, flush: bool) -> bytes:
+        if compressor is None:
+            return data
+        out = compressor.compress(data)
+        return out + compressor.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    for record in records:
+        buffer += dumps_line(record)
+        if first or len(buffer) >= chunk_bytes:
+            chunk = emit(bytes(buffer), flush=True)
+            buffer.clear()
+            first = False
+            if chunk:
+                yield chunk
+
+    tail = emit(bytes(buffer), flush=False) if buffer else b""
+    if compressor is not None:
+        tail += compressor.flush()
+    if tail:
+        yield tail
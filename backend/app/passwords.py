@@ -0,0 +1,140 @@
+"""
+Password Hashing
+Argon2id hashing and verification run on a dedicated, bounded worker pool so
+a slow KDF never runs on the event loop or in the database thread pool.
+Legacy unsalted SHA-256 hashes still verify and are replaced on the next
+successful login.
+"""
+import asyncio
+import functools
+import hashlib
+import hmac
+import logging
+import os
+import re
+import secrets
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+
+logger = logging.getLogger(__name__)
+
+LEGACY_SHA256 = re.compile(r"[0-9a-f]{64}")
+
+# Lanes per hash stay at 1 by default: the pool, not each hash, spreads work across cores
+hasher = PasswordHasher(
+    time_cost=int(os.environ.get("ARGON2_TIME_COST", 3)),
+    memory_cost=int(os.environ.get("ARGON2_MEMORY_COST_KIB", 64 * 1024)),
+    parallelism=int(os.environ.get("ARGON2_PARALLELISM", 1)),
+)
+
+
+class PasswordPoolBusy(Exception):
+    """More hashing jobs are queued than the pool accepts"""
+
+
+def is_legacy_hash(stored: str) -> bool:
+    return bool(LEGACY_SHA256.fullmatch(stored or ""))
+
+
+def hash_password(password: str) -> str:
+    return hasher.hash(password)
+
+
+def verify_password(stored: str, password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Check a password against its stored hash
+    Returns (valid, replacement): replacement is a fresh argon2 hash when the
+    stored one is legacy SHA-256 or uses outdated parameters, else None.
+    """
+    if is_legacy_hash(stored):
+        digest = hashlib.sha256(password.encode()).hexdigest()
+        if not hmac.compare_digest(digest, stored):
+            return False, None
+        return True, hasher.hash(password)
+
+    try:
+        hasher.verify(stored, password)
+    except (VerificationError, InvalidHashError):
+        return False, None
+    return True, hasher.hash(password) if hasher.check_needs_rehash(stored) else None
+
+
+@functools.lru_cache(maxsize=None)
+def dummy_hash() -> str:
+    """Argon2 hash of a random secret, made once with the current parameters"""
+    return hasher.hash(secrets.token_urlsafe(32))
+
+
+def verify_unknown_user(password: str) -> bool:
+    """
+    Spend a real verification on a login for a user that does not exist
+    Unknown usernames then cost the same KDF time as wrong passwords, so
+    response timing does not reveal which accounts exist. Always False.
+    """
+    verify_password(dummy_hash(), password)
+    return False
+
+
+class PasswordPool:
+    """
+    Bounded thread pool for KDF work
+    argon2 releases the GIL while hashing, so threads use every core. Jobs
+    beyond queue_limit (running plus waiting) are refused with PasswordPoolBusy
+    instead of piling up behind a login storm.
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        self._slots = threading.BoundedSemaphore(queue_limit)
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, fn: Callable, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise PasswordPoolBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: Future) -> None:
+        self.completed += 1
+        self._slots.release()
+
+    async def run(self, fn: Callable, *args) -> Any:
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password)
+
+    async def verify(self, stored: str, password: str) -> Tuple[bool, Optional[str]]:
+        return await self.run(verify_password, stored, password)
+
+    async def verify_unknown_user(self, password: str) -> bool:
+        return await self.run(verify_unknown_user, password)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "in_flight": self.queue_limit - self._slots._value,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+password_pool = PasswordPool(
+    workers=PASSWORD_HASH_WORKERS,
+    queue_limit=int(os.environ.get("PASSWORD_HASH_QUEUE_LIMIT", PASSWORD_HASH_WORKERS * 16)),
+)
@@ -0,0 +1,661 @@
+"""
+Context Resolution Engine
+Scores a user's identities against a context server-side, using the same
+privacy, content, social-link, usage and visibility weights as the
+frontend identity resolver.
+"""
+import heapq
+import json
+import math
+import zlib
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.automaton import KeywordAutomaton
+
+# ==================== SCORING WEIGHTS ====================
+PRIVACY_WEIGHT = 0.25
+CONTENT_WEIGHT = 0.30
+SOCIAL_LINKS_WEIGHT = 0.20
+USAGE_WEIGHT = 0.15
+VISIBILITY_WEIGHT = 0.10
+
+# ==================== SCORING RULES ====================
+# Privacy branch -> (scores per privacy level, fallback score, preferred level, reason)
+PRIVACY_RULES = {
+    "professional": ({"standard": 90, "high": 75}, 50, "standard",
+                     "Standard privacy level is ideal for professional contexts"),
+    "family": ({"high": 95, "standard": 70}, 40, "high",
+               "High privacy level protects family information"),
+    "social": ({"minimal": 85, "standard": 75}, 60, "minimal",
+               "Open privacy level encourages social engagement"),
+    "default": ({"standard": 80}, 60, None, None),
+}
+
+
+class ContentRule(NamedTuple):
+    """Keyword category matched against a subset of identity text fields"""
+    keywords: Tuple[str, ...]
+    fields: Tuple[str, ...]
+    base: int
+    step: int
+    cap: int
+    reason: str
+
+
+CONTENT_RULES = {
+    "professional": ContentRule(
+        keywords=("manager", "director", "engineer", "developer", "consultant", "analyst",
+                  "professor", "doctor", "phd", "mba", "ceo", "senior"),
+        fields=("bio", "title", "display_name"),
+        base=50, step=15, cap=95,
+        reason="Professional credentials found",
+    ),
+    "social": ContentRule(
+        keywords=("casual", "friendly", "enthusiast", "lover", "fan", "coffee", "travel",
+                  "photography", "music"),
+        fields=("bio",),
+        base=40, step=12, cap=90,
+        reason="Social interests mentioned",
+    ),
+    "creative": ContentRule(
+        keywords=("artist", "designer", "creative", "portfolio", "art", "design", "photography",
+                  "writer", "musician"),
+        fields=("bio", "title"),
+        base=45, step=15, cap=95,
+        reason="Creative background",
+    ),
+}
+DEFAULT_CONTENT_SCORE = 50
+
+# Social branch -> [(platforms, bonus, reason)]; a bonus applies when any platform link is set
+SOCIAL_LINK_RULES = {
+    "professional": [
+        (("linkedin",), 30, "LinkedIn profile available for professional networking"),
+        (("github",), 20, "GitHub profile shows technical expertise"),
+        (("company",), 25, "Company profile available for professional networking"),
+    ],
+    "gaming": [
+        (("twitch",), 35, "Twitch streaming profile available"),
+        (("steam", "discord"), 25, "Gaming platform profiles available"),
+    ],
+    "academic": [
+        (("researchgate",), 35, "ResearchGate profile shows academic credentials"),
+        (("linkedin",), 20, "LinkedIn shows professional academic networking"),
+    ],
+    "social": [
+        (("instagram", "twitter", "facebook"), 25, "Social media profiles available"),
+    ],
+    "creative": [
+        (("behance", "dribbble", "portfolio"), 35, "Creative portfolio links available"),
+    ],
+}
+SOCIAL_LINKS_BASE = 50
+SOCIAL_LINKS_PER_LINK = 5
+SOCIAL_LINKS_CAP = 95
+
+USAGE_BASE = 60
+USAGE_DEFAULT_BONUS = 20
+USAGE_PER_USE = 2
+USAGE_CAP_BONUS = 20
+
+# Visibility branch -> (score when public, score when private)
+VISIBILITY_RULES = {
+    "private": (40, 90),
+    "open": (85, 60),
+}
+
+
+class ContextProfile(NamedTuple):
+    """Which rule branch each scoring component uses for a context"""
+    privacy: str
+    content: Optional[str]
+    social: Optional[str]
+    visibility: str
+
+
+def _contains_any(text: str, *needles: str) -> bool:
+    return any(needle in text for needle in needles)
+
+
+def classify_context(name: str) -> ContextProfile:
+    """Map a context name onto the rule branches used by each scoring component"""
+    name = (name or "").lower()
+
+    if _contains_any(name, "professional", "work"):
+        privacy = "professional"
+    elif _contains_any(name, "family", "personal"):
+        privacy = "family"
+    elif _contains_any(name, "social", "creative"):
+        privacy = "social"
+    else:
+        privacy = "default"
+
+    if _contains_any(name, "professional", "work"):
+        content = "professional"
+    elif "social" in name:
+        content = "social"
+    elif "creative" in name:
+        content = "creative"
+    else:
+        content = None
+
+    if _contains_any(name, "professional", "work"):
+        social = "professional"
+    elif _contains_any(name, "gaming", "esports"):
+        social = "gaming"
+    elif _contains_any(name, "academic", "research"):
+        social = "academic"
+    elif "social" in name:
+        social = "social"
+    elif "creative" in name:
+        social = "creative"
+    else:
+        social = None
+
+    visibility = "private" if _contains_any(name, "private", "family") else "open"
+
+    return ContextProfile(privacy, content, social, visibility)
+
+
+# ==================== SCORING ====================
+def js_round(value: float) -> int:
+    """Round half up, matching JavaScript's Math.round used by the frontend"""
+    return int(math.floor(value + 0.5))
+
+
+def parse_social_links(raw: Any) -> Dict[str, Any]:
+    """Decode the social_links column, tolerating legacy or malformed values"""
+    if isinstance(raw, dict):
+        return raw
+    if not raw:
+        return {}
+    try:
+        links = json.loads(raw)
+    except (TypeError, ValueError):
+        return {}
+    return links if isinstance(links, dict) else {}
+
+
+TEXT_FIELDS = ("bio", "title", "display_name")
+# Every platform any social rule looks at, in a fixed bit order
+SOCIAL_PLATFORMS = tuple(dict.fromkeys(
+    platform
+    for rules in SOCIAL_LINK_RULES.values()
+    for platforms, _bonus, _reason in rules
+    for platform in platforms
+))
+PLATFORM_BITS = {platform: 1 << index for index, platform in enumerate(SOCIAL_PLATFORMS)}
+# Keyword bitsets are stored in signed 64-bit INTEGER columns
+MAX_PACKED_KEYWORDS = 63
+
+
+def _identity_text(identity) -> List[str]:
+    return [(getattr(identity, field) or "").lower() for field in TEXT_FIELDS]
+
+
+def platform_mask(platforms) -> int:
+    mask = 0
+    for platform in platforms:
+        mask |= PLATFORM_BITS[platform]
+    return mask
+
+
+class IdentityFeatures(NamedTuple):
+    """Precomputed, rule-dependent facts about one identity"""
+    field_bits: Tuple[int, ...]   # keyword bitset per TEXT_FIELDS entry
+    social_link_bits: int         # PLATFORM_BITS of platforms with a non-empty link
+    social_link_count: int
+
+
+class CompiledContentRules(NamedTuple):
+    """A content rule set together with its keyword automaton"""
+    rules: Dict[str, ContentRule]
+    automaton: KeywordAutomaton
+    version: int
+    # Identifies the keyword/platform bit layout; None when too many keywords to pack
+    signature: Optional[int]
+    keyword_bits: Dict[str, int]
+
+    def encode(self, identity) -> IdentityFeatures:
+        """Scan an identity's text once and summarise its social links as bitsets"""
+        field_bits = tuple(
+            sum(1 << index for index in hits)
+            for hits in self.automaton.find_in_fields(_identity_text(identity))
+        )
+        social_links = parse_social_links(identity.social_links)
+        link_bits = platform_mask(
+            platform for platform in SOCIAL_PLATFORMS if social_links.get(platform)
+        )
+        return IdentityFeatures(field_bits, link_bits, len(social_links))
+
+    def features(self, identity) -> IdentityFeatures:
+        """Stored features when they were built with this rule set, else a fresh scan"""
+        if self.signature is not None and getattr(identity, "feature_version", None) == self.signature:
+            return IdentityFeatures(
+                (identity.bio_keyword_bits, identity.title_keyword_bits, identity.name_keyword_bits),
+                identity.social_link_bits,
+                identity.social_link_count,
+            )
+        return self.encode(identity)
+
+    def match(self, identity, features: Optional[IdentityFeatures] = None) -> Dict[str, List[str]]:
+        """Matched keywords for every category"""
+        features = features or self.features(identity)
+        bits_by_field = dict(zip(TEXT_FIELDS, features.field_bits))
+        keyword_bit = self.keyword_bits
+        matches = {}
+        for category, rule in self.rules.items():
+            combined = 0
+            for field in rule.fields:
+                combined |= bits_by_field[field]
+            matches[category] = [
+                keyword for keyword in rule.keywords if combined & keyword_bit[keyword.lower()]
+            ]
+        return matches
+
+
+def _rules_signature(keywords: Tuple[str, ...]) -> Optional[int]:
+    if len(keywords) > MAX_PACKED_KEYWORDS:
+        return None
+    layout = repr((keywords, TEXT_FIELDS, SOCIAL_PLATFORMS))
+    return zlib.crc32(layout.encode())
+
+
+class ContentMatcher:
+    """
+    Holds the active content rules compiled into a single automaton
+    Call update() when the rule set changes; readers keep using the
+    snapshot they took, so a rebuild never tears an in-flight resolution.
+    """
+
+    def __init__(self, rules: Dict[str, ContentRule]):
+        self._compiled: Optional[CompiledContentRules] = None
+        self.update(rules)
+
+    def update(self, rules: Dict[str, ContentRule]) -> None:
+        rules = dict(rules)
+        automaton = KeywordAutomaton(
+            keyword.lower() for rule in rules.values() for keyword in rule.keywords
+        )
+        version = self._compiled.version + 1 if self._compiled else 1
+        self._compiled = CompiledContentRules(
+            rules, automaton, version,
+            signature=_rules_signature(automaton.keywords),
+            keyword_bits={keyword: 1 << index for index, keyword in enumerate(automaton.keywords)},
+        )
+
+    @property
+    def compiled(self) -> CompiledContentRules:
+        return self._compiled
+
+
+# Built once at startup from the default rules
+content_matcher = ContentMatcher(CONTENT_RULES)
+
+
+# ==================== FEATURE STORE ====================
+FEATURE_SOURCE_FIELDS = {"display_name", "title", "bio", "social_links"}
+
+
+def apply_identity_features(identity, compiled: Optional[CompiledContentRules] = None) -> None:
+    """Refresh the packed feature columns of an Identity row before it is written"""
+    compiled = compiled or content_matcher.compiled
+    features = compiled.encode(identity)
+    identity.bio_keyword_bits, identity.title_keyword_bits, identity.name_keyword_bits = (
+        features.field_bits if compiled.signature is not None else (0, 0, 0)
+    )
+    identity.social_link_bits = features.social_link_bits
+    identity.social_link_count = features.social_link_count
+    identity.feature_version = compiled.signature
+
+
+def features_stale(identity, compiled: Optional[CompiledContentRules] = None) -> bool:
+    compiled = compiled or content_matcher.compiled
+    return compiled.signature is not None and identity.feature_version != compiled.signature
+
+
+def _privacy_score(privacy_level: str, profile: ContextProfile) -> int:
+    level_scores, fallback, _preferred, _reason = PRIVACY_RULES[profile.privacy]
+    return level_scores.get(privacy_level, fallback)
+
+
+def _usage_score(is_default: bool, usage_count: int) -> int:
+    score = USAGE_BASE
+    if is_default:
+        score += USAGE_DEFAULT_BONUS
+    if usage_count > 0:
+        score += min(USAGE_CAP_BONUS, usage_count * USAGE_PER_USE)
+    return score
+
+
+def _visibility_score(is_public: bool, profile: ContextProfile) -> int:
+    public_score, private_score = VISIBILITY_RULES[profile.visibility]
+    return public_score if is_public else private_score
+
+
+def score_identity(identity, profile: ContextProfile,
+                   compiled: Optional[CompiledContentRules] = None) -> Dict[str, Any]:
+    """Score a single identity for a classified context"""
+    compiled = compiled or content_matcher.compiled
+    reasons: List[str] = []
+
+    # 1. Privacy level match
+    _level_scores, _fallback, preferred, reason = PRIVACY_RULES[profile.privacy]
+    privacy_score = _privacy_score(identity.privacy_level, profile)
+    if preferred and identity.privacy_level == preferred:
+        reasons.append(reason)
+
+    # 2. Content/bio match
+    content_score = DEFAULT_CONTENT_SCORE
+    features = compiled.features(identity)
+    rule = compiled.rules.get(profile.content)
+    if rule:
+        matches = compiled.match(identity, features)[profile.content]
+        content_score = min(rule.cap, rule.base + len(matches) * rule.step)
+        if matches:
+            reasons.append(f"{rule.reason}: {', '.join(matches)}")
+
+    # 3. Social links match
+    social_links_score = SOCIAL_LINKS_BASE
+    for platforms, bonus, reason in SOCIAL_LINK_RULES.get(profile.social, ()):
+        if features.social_link_bits & platform_mask(platforms):
+            social_links_score += bonus
+            reasons.append(reason)
+    social_links_score = min(
+        SOCIAL_LINKS_CAP, social_links_score + features.social_link_count * SOCIAL_LINKS_PER_LINK
+    )
+
+    # 4. Usage pattern
+    usage_count = identity.usage_count or 0
+    usage_score = _usage_score(identity.is_default, usage_count)
+    if identity.is_default:
+        reasons.append("This is your default identity")
+    if usage_count > 0:
+        reasons.append(f"Previously used {usage_count} times")
+
+    # 5. Visibility match
+    visibility_score = _visibility_score(identity.is_public, profile)
+    if profile.visibility == "private" and not identity.is_public:
+        reasons.append("Private visibility protects personal information")
+    elif profile.visibility == "open" and identity.is_public:
+        reasons.append("Public visibility enables discovery and networking")
+
+    total_score = (
+        privacy_score * PRIVACY_WEIGHT +
+        content_score * CONTENT_WEIGHT +
+        social_links_score * SOCIAL_LINKS_WEIGHT +
+        usage_score * USAGE_WEIGHT +
+        visibility_score * VISIBILITY_WEIGHT
+    )
+    confidence = min(95, max(45, total_score - 10))
+
+    if not reasons:
+        reasons.append("General match based on privacy and visibility settings")
+
+    return {
+        "identity": identity,
+        "score": js_round(total_score),
+        "confidence": js_round(confidence),
+        "reasoning": reasons,
+        "breakdown": {
+            "privacy_match": js_round(privacy_score),
+            "content_match": js_round(content_score),
+            "social_links_match": js_round(social_links_score),
+            "usage_pattern": js_round(usage_score),
+            "visibility_match": js_round(visibility_score),
+        },
+    }
+
+
+def resolve_identities(identities, context_name: str) -> List[Dict[str, Any]]:
+    """Score every identity for a context and rank them best first"""
+    profile = classify_context(context_name)
+    compiled = content_matcher.compiled
+    scored = [score_identity(identity, profile, compiled) for identity in identities]
+    # Stable sort keeps the original identity order among equal scores
+    scored.sort(key=lambda item: item["score"], reverse=True)
+    return scored
+
+
+# ==================== TOP-K PRUNING ====================
+def score_upper_bound(row, profile: ContextProfile, compiled: CompiledContentRules) -> int:
+    """
+    Best rounded score an identity could reach, from its cheap columns only
+    Privacy, usage and visibility are exact; content and social links are
+    assumed to hit their caps.
+    """
+    rule = compiled.rules.get(profile.content)
+    bound = (
+        _privacy_score(row.privacy_level, profile) * PRIVACY_WEIGHT +
+        (rule.cap if rule else DEFAULT_CONTENT_SCORE) * CONTENT_WEIGHT +
+        SOCIAL_LINKS_CAP * SOCIAL_LINKS_WEIGHT +
+        _usage_score(row.is_default, row.usage_count or 0) * USAGE_WEIGHT +
+        _visibility_score(row.is_public, profile) * VISIBILITY_WEIGHT
+    )
+    return js_round(bound)
+
+
+def resolve_top_k(bound_rows, context_name: str, k: int, load_identities,
+                  chunk_size: int = 64) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Branch-and-bound top-k resolution
+    bound_rows carry id, privacy_level, is_public, is_default and usage_count
+    in the canonical identity order; load_identities(ids) returns the full
+    rows to score. Candidates are visited by descending upper bound and the
+    search stops once no remaining bound can displace the current k-th best.
+    Results are identical to the first k of resolve_identities.
+    """
+    profile = classify_context(context_name)
+    compiled = content_matcher.compiled
+    ordered = sorted(
+        ((score_upper_bound(row, profile, compiled), order, row.id) for order, row in enumerate(bound_rows)),
+        key=lambda item: (-item[0], item[1]),
+    )
+
+    # Min-heap on (score, -order): the root is the current k-th best
+    heap: List[Tuple[int, int, Dict[str, Any]]] = []
+
+    def can_enter(bound: int, order: int) -> bool:
+        if len(heap) < k:
+            return True
+        kth_score, kth_neg_order, _ = heap[0]
+        return bound > kth_score or (bound == kth_score and order < -kth_neg_order)
+
+    scored = 0
+    position = 0
+    while position < len(ordered) and can_enter(*ordered[position][:2]):
+        chunk = ordered[position:position + max(chunk_size, k - len(heap))]
+        identities = {identity.id: identity for identity in load_identities([item[2] for item in chunk])}
+        for bound, order, identity_id in chunk:
+            if not can_enter(bound, order):
+                break
+            position += 1
+            result = score_identity(identities[identity_id], profile, compiled)
+            scored += 1
+            entry = (result["score"], -order, result)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+    ranked = [entry[2] for entry in sorted(heap, key=lambda entry: (-entry[0], -entry[1]))]
+    return ranked, {
+        "candidates": len(ordered),
+        "scored": scored,
+        "pruned": len(ordered) - scored,
+    }
+
+
+# ==================== BATCH SCORING ====================
+PRIVACY_LEVELS = ("minimal", "standard", "high")
+# Every (social branch, platform group) pair gets its own presence column
+SOCIAL_LINK_GROUPS = tuple(
+    (branch, platforms)
+    for branch, rules in SOCIAL_LINK_RULES.items()
+    for platforms, _bonus, _reason in rules
+)
+
+
+def build_identity_features(identities, compiled: CompiledContentRules) -> Dict[str, np.ndarray]:
+    """Encode identities as column arrays (one row per identity)"""
+    count = len(identities)
+    categories = tuple(compiled.rules)
+    privacy = np.zeros((count, len(PRIVACY_LEVELS) + 1))
+    is_public = np.zeros(count)
+    is_default = np.zeros(count)
+    usage = np.zeros(count)
+    hits = np.zeros((count, len(categories)))
+    link_groups = np.zeros((count, len(SOCIAL_LINK_GROUPS)))
+    link_count = np.zeros(count)
+
+    for row, identity in enumerate(identities):
+        level = identity.privacy_level
+        privacy[row, PRIVACY_LEVELS.index(level) if level in PRIVACY_LEVELS else -1] = 1
+        is_public[row] = bool(identity.is_public)
+        is_default[row] = bool(identity.is_default)
+        usage[row] = identity.usage_count or 0
+        features = compiled.features(identity)
+        matches = compiled.match(identity, features)
+        for col, category in enumerate(categories):
+            hits[row, col] = len(matches[category])
+        for col, (_branch, platforms) in enumerate(SOCIAL_LINK_GROUPS):
+            link_groups[row, col] = bool(features.social_link_bits & platform_mask(platforms))
+        link_count[row] = features.social_link_count
+
+    return {
+        "privacy": privacy,
+        "is_public": is_public,
+        "is_default": is_default,
+        "usage": usage,
+        "hits": hits,
+        "link_groups": link_groups,
+        "link_count": link_count,
+    }
+
+
+def build_context_weights(context_names: List[str],
+                          compiled: CompiledContentRules) -> Dict[str, np.ndarray]:
+    """Encode each context's rule branches as weight vectors (one column per context)"""
+    count = len(context_names)
+    categories = tuple(compiled.rules)
+    privacy = np.zeros((len(PRIVACY_LEVELS) + 1, count))
+    content_select = np.zeros((len(categories), count))
+    content_base = np.full(count, float(DEFAULT_CONTENT_SCORE))
+    content_step = np.zeros(count)
+    content_cap = np.full(count, float(DEFAULT_CONTENT_SCORE))
+    link_bonus = np.zeros((len(SOCIAL_LINK_GROUPS), count))
+    visibility_public = np.zeros(count)
+    visibility_private = np.zeros(count)
+
+    for col, name in enumerate(context_names):
+        profile = classify_context(name)
+
+        level_scores, fallback, _preferred, _reason = PRIVACY_RULES[profile.privacy]
+        for row, level in enumerate(PRIVACY_LEVELS):
+            privacy[row, col] = level_scores.get(level, fallback)
+        privacy[-1, col] = fallback
+
+        rule = compiled.rules.get(profile.content)
+        if rule:
+            content_select[categories.index(profile.content), col] = 1
+            content_base[col], content_step[col], content_cap[col] = rule.base, rule.step, rule.cap
+
+        for row, (branch, platforms) in enumerate(SOCIAL_LINK_GROUPS):
+            if branch == profile.social:
+                link_bonus[row, col] = next(
+                    bonus for group, bonus, _reason in SOCIAL_LINK_RULES[branch] if group == platforms
+                )
+
+        visibility_public[col], visibility_private[col] = VISIBILITY_RULES[profile.visibility]
+
+    return {
+        "privacy": privacy,
+        "content_select": content_select,
+        "content_base": content_base,
+        "content_step": content_step,
+        "content_cap": content_cap,
+        "link_bonus": link_bonus,
+        "visibility_public": visibility_public,
+        "visibility_private": visibility_private,
+    }
+
+
+def score_matrix(features: Dict[str, np.ndarray], weights: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Compute every identity x context component score in one vectorized pass"""
+    privacy = features["privacy"] @ weights["privacy"]
+
+    content_hits = features["hits"] @ weights["content_select"]
+    content = np.minimum(weights["content_cap"], weights["content_base"] + content_hits * weights["content_step"])
+
+    social_links = np.minimum(
+        SOCIAL_LINKS_CAP,
+        SOCIAL_LINKS_BASE
+        + features["link_groups"] @ weights["link_bonus"]
+        + (features["link_count"] * SOCIAL_LINKS_PER_LINK)[:, None],
+    )
+
+    usage = (
+        USAGE_BASE
+        + features["is_default"] * USAGE_DEFAULT_BONUS
+        + np.where(features["usage"] > 0, np.minimum(USAGE_CAP_BONUS, features["usage"] * USAGE_PER_USE), 0)
+    )
+    usage = np.broadcast_to(usage[:, None], privacy.shape)
+
+    public = features["is_public"][:, None]
+    visibility = public * weights["visibility_public"] + (1 - public) * weights["visibility_private"]
+
+    total = (
+        privacy * PRIVACY_WEIGHT +
+        content * CONTENT_WEIGHT +
+        social_links * SOCIAL_LINKS_WEIGHT +
+        usage * USAGE_WEIGHT +
+        visibility * VISIBILITY_WEIGHT
+    )
+
+    def rounded(values):
+        return np.floor(values + 0.5).astype(np.int64)
+
+    return {
+        "score": rounded(total),
+        "confidence": rounded(np.clip(total - 10, 45, 95)),
+        "privacy_match": rounded(privacy),
+        "content_match": rounded(content),
+        "social_links_match": rounded(social_links),
+        "usage_pattern": rounded(usage),
+        "visibility_match": rounded(visibility),
+    }
+
+
+def resolve_batch(identities, contexts, top_k: int = 1) -> List[Dict[str, Any]]:
+    """Rank identities for many contexts at once, keeping the top_k per context"""
+    if not contexts:
+        return []
+    if not identities:
+        return [{"context": context, "candidates": []} for context in contexts]
+
+    compiled = content_matcher.compiled
+    scores = score_matrix(
+        build_identity_features(identities, compiled),
+        build_context_weights([context.name for context in contexts], compiled),
+    )
+    # Stable sort keeps the original identity order among equal scores, like resolve_identities
+    ranking = np.argsort(-scores["score"], axis=0, kind="stable")[:top_k]
+
+    results = []
+    for col, context in enumerate(contexts):
+        candidates = []
+        for row in ranking[:, col]:
+            candidates.append({
+                "identity": identities[row],
+                "score": int(scores["score"][row, col]),
+                "confidence": int(scores["confidence"][row, col]),
+                "breakdown": {
+                    component: int(scores[component][row, col])
+                    for component in ("privacy_match", "content_match", "social_links_match",
+                                      "usage_pattern", "visibility_match")
+                },
+            })
+        results.append({"context": context, "candidates": candidates})
+    return results
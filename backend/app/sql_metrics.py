@@ -0,0 +1,146 @@
+"""
+Per-request SQL Instrumentation
+Engine event hooks count statements and time them against the QueryStats of
+the current request (a context variable, so it follows the request into
+worker and writer threads). SQLMetricsMiddleware reports the totals in
+X-DB-Queries and Server-Timing headers, logs the slowest statements of slow
+requests, and the repeat detector flags N+1 patterns: the same SELECT shape
+run more than SQL_REPEAT_THRESHOLD times in one request.
+"""
+import functools
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+REPEAT_THRESHOLD = int(os.environ.get("SQL_REPEAT_THRESHOLD", 10))
+# Tests set this so an N+1 fails the request instead of only logging
+RAISE_ON_REPEAT = os.environ.get("SQL_REPEAT_RAISE", "").lower() in ("1", "true", "yes")
+SLOW_REQUEST_MS = float(os.environ.get("SQL_SLOW_REQUEST_MS", 200))
+SLOWEST_KEPT = 3
+
+# Expanded IN lists vary in length; collapse them so one loop is one shape
+_IN_LIST = re.compile(r"\((?:\?|%\(\w+\)s|:\w+)(?:, (?:\?|%\(\w+\)s|:\w+))*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class RepeatedQueryError(RuntimeError):
+    """The same statement shape ran more times than allowed within one request"""
+
+
+# Compiled statements are cached by SQLAlchemy, so the same strings recur
+@functools.lru_cache(maxsize=1024)
+def statement_shape(statement: str) -> str:
+    return _IN_LIST.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryStats:
+    """Statement count, DB time, slowest statements and repeated shapes for one request"""
+
+    def __init__(self, repeat_threshold: int = REPEAT_THRESHOLD, raise_on_repeat: bool = RAISE_ON_REPEAT):
+        self.repeat_threshold = repeat_threshold
+        self.raise_on_repeat = raise_on_repeat
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest: List[Tuple[float, str]] = []
+        self.shapes: Counter = Counter()
+        self.repeated: List[str] = []
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        if len(self.slowest) < SLOWEST_KEPT or seconds > self.slowest[-1][0]:
+            self.slowest = sorted(self.slowest + [(seconds, statement)], reverse=True)[:SLOWEST_KEPT]
+
+        if statement.lstrip()[:6].upper() != "SELECT":
+            return
+        shape = statement_shape(statement)
+        self.shapes[shape] += 1
+        if self.shapes[shape] == self.repeat_threshold + 1:
+            self.repeated.append(shape)
+            message = f"Possible N+1: statement ran {self.repeat_threshold + 1}+ times in one request: {shape[:300]}"
+            if self.raise_on_repeat:
+                raise RepeatedQueryError(message)
+            logger.warning(message)
+
+    def server_timing(self) -> str:
+        timing = f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries"'
+        if self.slowest:
+            timing += f", db-slowest;dur={self.slowest[0][0] * 1000:.2f}"
+        return timing
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@contextmanager
+def track_queries(stats: Optional[QueryStats] = None) -> Iterator[QueryStats]:
+    """Collect statements executed in this context (and threads it is copied into)"""
+    stats = stats or QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info["sql_metrics_start"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = conn.info.pop("sql_metrics_start", None)
+    if stats is None or started is None:
+        return
+    stats.record(statement, time.perf_counter() - started)
+
+
+class SQLMetricsMiddleware:
+    """ASGI middleware tracking each HTTP request's queries and reporting them in headers"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+
+        async def send_with_metrics(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("X-DB-Queries", str(stats.count))
+                headers.append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        started = time.perf_counter()
+        with track_queries(stats):
+            await self.app(scope, receive, send_with_metrics)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms >= SLOW_REQUEST_MS and stats.count:
+            slowest = "; ".join(f"{seconds * 1000:.1f}ms {statement_shape(sql)[:200]}" for seconds, sql in stats.slowest)
+            logger.warning(
+                f"Slow request {scope['method']} {scope['path']}: {elapsed_ms:.0f}ms, "
+                f"{stats.count} queries in {stats.seconds * 1000:.1f}ms; slowest: {slowest}"
+            )
@@ -0,0 +1,99 @@
+"""
+Signed Access Tokens
+HS256 JWTs carrying the claims authenticated endpoints need, so a request is
+authenticated by signature and expiry checks alone, plus an in-memory
+denylist for tokens revoked before they expire.
+"""
+import logging
+import os
+import secrets
+import threading
+import time
+import uuid
+from typing import Dict, NamedTuple, Optional
+
+from jose import JWTError, jwt
+
+logger = logging.getLogger(__name__)
+
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_SECONDS = int(os.environ.get("ACCESS_TOKEN_EXPIRE_SECONDS", 1800))
+# Anything longer is not one of ours; reject before doing any decoding work
+MAX_TOKEN_LENGTH = 2048
+
+SECRET_KEY = os.environ.get("JWT_SECRET_KEY")
+if not SECRET_KEY:
+    SECRET_KEY = secrets.token_urlsafe(32)
+    logger.warning("JWT_SECRET_KEY is not set; using a per-process key, tokens will not survive restarts")
+
+
+class AuthenticatedUser(NamedTuple):
+    """Identity of the caller as asserted by a verified token"""
+    id: int
+    username: str
+    jti: str
+    expires_at: int
+
+
+class InvalidToken(Exception):
+    pass
+
+
+class TokenDenylist:
+    """
+    Revoked token ids, each kept only until the token would have expired anyway
+    Expired entries are purged on insert, so size is bounded by the number of
+    revocations within one token lifetime.
+    """
+
+    def __init__(self):
+        self._revoked: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, expires_at: int) -> None:
+        now = int(time.time())
+        with self._lock:
+            if len(self._revoked) >= 1024:
+                self._revoked = {key: exp for key, exp in self._revoked.items() if exp > now}
+            self._revoked[jti] = expires_at
+
+    def is_revoked(self, jti: str) -> bool:
+        return jti in self._revoked
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+denylist = TokenDenylist()
+
+
+def create_access_token(user_id: int, username: str, now: Optional[int] = None) -> str:
+    issued_at = int(time.time()) if now is None else now
+    claims = {
+        "sub": str(user_id),
+        "username": username,
+        "jti": uuid.uuid4().hex,
+        "iat": issued_at,
+        "exp": issued_at + ACCESS_TOKEN_EXPIRE_SECONDS,
+    }
+    return jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def decode_access_token(token: str) -> AuthenticatedUser:
+    """Verify signature, expiry and revocation; raises InvalidToken on any failure"""
+    if len(token) > MAX_TOKEN_LENGTH:
+        raise InvalidToken("Token too long")
+    try:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        user = AuthenticatedUser(
+            id=int(claims["sub"]),
+            username=claims["username"],
+            jti=claims["jti"],
+            expires_at=int(claims["exp"]),
+        )
+    except (JWTError, KeyError, TypeError, ValueError) as error:
+        raise InvalidToken(str(error)) from error
+
+    if denylist.is_revoked(user.jti):
+        raise InvalidToken("Token has been revoked")
+    return user
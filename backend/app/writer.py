@@ -0,0 +1,212 @@
+"""
+Single-writer Group Commit Pipeline
+Request handlers hand write units (callables taking a Session) to one writer
+thread per database. The writer drains the queue in small groups, runs each
+unit inside its own SAVEPOINT and commits the whole group once, so concurrent
+requests share one transaction and one fsync instead of fighting over the
+SQLite write lock.
+"""
+import asyncio
+import contextvars
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import create_database_engine
+
+logger = logging.getLogger(__name__)
+
+WriteFn = Callable[[Session], Any]
+
+_STOP = object()
+
+
+class WriteUnit(NamedTuple):
+    fn: WriteFn
+    future: Future
+    # Submitter's context, so per-request state (e.g. SQL metrics) follows the unit
+    context: contextvars.Context
+
+
+def _writer_engine(bind: Engine) -> Engine:
+    """
+    Dedicated single-connection engine for the writer thread
+    It shares the configured SQLite profile (WAL etc.). pysqlite's implicit
+    transaction handling breaks SAVEPOINT, so the driver is put in autocommit
+    mode and every transaction is opened with an explicit BEGIN IMMEDIATE,
+    which also takes the write lock up front.
+    """
+    if bind.dialect.name != "sqlite":
+        return bind
+
+    engine = create_database_engine(url=bind.url.render_as_string(hide_password=False), pool_size=1, max_overflow=0)
+
+    @event.listens_for(engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin_immediate(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return engine
+
+
+class GroupCommitWriter:
+    """
+    Queue of write units committed in groups by a single background thread
+    A unit's future resolves only after the group containing it is committed;
+    a unit that raises is rolled back to its savepoint and gets the exception,
+    without affecting the rest of its group.
+    """
+
+    def __init__(self, bind: Engine, max_group: int = 32, max_wait: float = 0.002):
+        self.max_group = max_group
+        self.max_wait = max_wait
+        self._engine = _writer_engine(bind)
+        self._owns_engine = self._engine is not bind
+        self._sessions = sessionmaker(bind=self._engine, autoflush=False, expire_on_commit=False)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.groups = 0
+        self.units = 0
+        self.failed_units = 0
+        self.failed_commits = 0
+        self.largest_group = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, fn: WriteFn) -> Future:
+        """Queue a write unit; the returned future carries its result or exception"""
+        self.start()
+        future: Future = Future()
+        self._queue.put(WriteUnit(fn, future, contextvars.copy_context()))
+        return future
+
+    async def run(self, fn: WriteFn) -> Any:
+        """Submit from async code and wait for the committed result"""
+        return await asyncio.wrap_future(self.submit(fn))
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Finish queued units, then stop the thread and release its engine"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+        if self._owns_engine:
+            self._engine.dispose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "groups": self.groups,
+            "units": self.units,
+            "failed_units": self.failed_units,
+            "failed_commits": self.failed_commits,
+            "largest_group": self.largest_group,
+            "average_group": round(self.units / self.groups, 2) if self.groups else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            group = [first]
+            deadline = time.monotonic() + self.max_wait
+            # Linger briefly so concurrent requests can share the commit
+            while len(group) < self.max_group:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                group.append(item)
+            self._commit_group(group)
+
+    @staticmethod
+    def _apply(fn: WriteFn, session: Session) -> Any:
+        result = fn(session)
+        # Flush inside the savepoint so constraint errors belong to this unit
+        session.flush()
+        return result
+
+    def _commit_group(self, group: List[WriteUnit]) -> None:
+        active = [unit for unit in group if unit.future.set_running_or_notify_cancel()]
+        if not active:
+            return
+
+        outcomes = []
+        try:
+            with self._sessions() as session:
+                for unit in active:
+                    savepoint = session.begin_nested()
+                    try:
+                        result = unit.context.run(self._apply, unit.fn, session)
+                        savepoint.commit()
+                        outcomes.append((True, result))
+                    except Exception as error:
+                        savepoint.rollback()
+                        outcomes.append((False, error))
+                session.commit()
+        except Exception as error:
+            self.failed_commits += 1
+            logger.error(f"Group commit of {len(active)} write units failed: {error}")
+            for unit in active:
+                unit.future.set_exception(error)
+            return
+
+        self.groups += 1
+        self.units += len(active)
+        self.largest_group = max(self.largest_group, len(active))
+        for unit, (succeeded, value) in zip(active, outcomes):
+            if succeeded:
+                unit.future.set_result(value)
+            else:
+                self.failed_units += 1
+                unit.future.set_exception(value)
+
+
+_writers: Dict[Engine, GroupCommitWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def writer_for(bind: Engine) -> GroupCommitWriter:
+    """The writer serving a database, created on first use"""
+    with _writers_lock:
+        writer = _writers.get(bind)
+        if writer is None:
+            writer = _writers[bind] = GroupCommitWriter(bind)
+        return writer
+
+
+def close_writer(bind: Engine) -> None:
+    with _writers_lock:
+        writer = _writers.pop(bind, None)
+    if writer is not None:
+        writer.stop()
+
+
+def close_all_writers() -> None:
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.stop()
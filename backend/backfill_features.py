@@ -0,0 +1,47 @@
+"""
+Backfill the resolver feature store for existing identities.
+Run after upgrading, or after changing the content keyword rules.
+"""
+import argparse
+
+from sqlalchemy import or_
+
+from app.main import SessionLocal, Identity
+from app.resolver import apply_identity_features, content_matcher
+
+def backfill_identity_features(db, batch_size: int = 500, force: bool = False) -> int:
+    """Recompute packed features for stale rows in id order, committing per batch"""
+    compiled = content_matcher.compiled
+    query = db.query(Identity)
+    if not force:
+        query = query.filter(or_(
+            Identity.feature_version.is_(None),
+            Identity.feature_version != compiled.signature
+        ))
+    
+    updated = 0
+    last_id = 0
+    while True:
+        batch = query.filter(Identity.id > last_id).order_by(Identity.id).limit(batch_size).all()
+        if not batch:
+            break
+        for identity in batch:
+            apply_identity_features(identity, compiled)
+        db.commit()
+        updated += len(batch)
+        last_id = batch[-1].id
+        db.expunge_all()
+    return updated
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--force", action="store_true", help="Recompute every row, not just stale ones")
+    args = parser.parse_args()
+    
+    session = SessionLocal()
+    try:
+        count = backfill_identity_features(session, batch_size=args.batch_size, force=args.force)
+    finally:
+        session.close()
+    print(f"Backfilled resolver features for {count} identities.")
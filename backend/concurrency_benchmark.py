@@ -0,0 +1,136 @@
+"""
+PersonifID Concurrency Benchmark: /users/me latency under a heavy load
+Starts the API with uvicorn on a scratch database, seeds one account with
+many identities, then measures /users/me latency alone and again while
+several clients hammer GET /identities?limit=500 (--load list) or
+POST /auth/token (--load login). If database calls or password hashing
+block the event loop, the cheap request queues behind the heavy ones and its
+p99 grows with the load.
+
+Usage: python concurrency_benchmark.py [--load list|login] [--identities 2000] [--heavy-clients 4] [--probes 300]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+import httpx
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int):
+    import uvicorn
+    from app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+USER = {"username": "latency", "email": "latency@example.com", "password": "latency-password"}
+
+
+def seed(base_url: str, identities: int) -> dict:
+    user = USER
+    with httpx.Client(base_url=base_url, timeout=60) as client:
+        client.post("/auth/register", json=user)
+        token = client.post("/auth/token", data={"username": user["username"], "password": user["password"]}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        body = "\n".join(
+            json.dumps({"display_name": f"Load {index}", "title": "Engineer", "bio": "Benchmark identity " * 20})
+            for index in range(identities)
+        )
+        client.post("/identities/import", params={"batch_size": 500}, content=body.encode(), headers=headers)
+    return headers
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def probe(base_url: str, headers: dict, probes: int) -> dict:
+    latencies = []
+    with httpx.Client(base_url=base_url, timeout=60) as client:
+        for _ in range(probes):
+            started = time.perf_counter()
+            client.get("/users/me", headers=headers).raise_for_status()
+            latencies.append((time.perf_counter() - started) * 1000)
+    return {
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "max_ms": round(max(latencies), 2),
+    }
+
+
+def heavy_request(client: httpx.Client, load: str, headers: dict) -> None:
+    if load == "login":
+        client.post("/auth/token", data={"username": USER["username"], "password": USER["password"]})
+    else:
+        client.get("/identities", params={"limit": 500}, headers=headers)
+
+
+def run(load: str, identities: int, heavy_clients: int, probes: int) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server, thread = start_server(port)
+    try:
+        headers = seed(base_url, identities)
+        idle = probe(base_url, headers, probes)
+
+        stop = threading.Event()
+        heavy_requests = [0]
+
+        def heavy_load():
+            with httpx.Client(base_url=base_url, timeout=60) as client:
+                while not stop.is_set():
+                    heavy_request(client, load, headers)
+                    heavy_requests[0] += 1
+
+        workers = [threading.Thread(target=heavy_load) for _ in range(heavy_clients)]
+        for worker in workers:
+            worker.start()
+        time.sleep(0.5)
+        started = time.perf_counter()
+        loaded = probe(base_url, headers, probes)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        for worker in workers:
+            worker.join()
+        loaded["heavy_requests_per_second"] = round(heavy_requests[0] / elapsed, 1)
+        return {"idle": idle, "under_load": loaded}
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--load", choices=("list", "login"), default="list")
+    parser.add_argument("--identities", type=int, default=2000)
+    parser.add_argument("--heavy-clients", type=int, default=4)
+    parser.add_argument("--probes", type=int, default=300)
+    args = parser.parse_args()
+
+    # Point the app at a throwaway database before it is imported
+    scratch = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(scratch, 'concurrency.db')}"
+
+    results = run(args.load, args.identities, args.heavy_clients, args.probes)
+    print(f"{'/users/me':<14}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for label, stats in results.items():
+        print(f"{label:<14}" + "".join(f"{stats[key]:>8.1f}ms" for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms")))
+    print(f"heavy {args.load} throughput: {results['under_load']['heavy_requests_per_second']} req/s")
@@ -0,0 +1,179 @@
+"""
+PersonifID Database Engine Benchmark: default SQLite engine vs the tuned profile
+Runs the same read, write and mixed workloads against a scratch database with
+the previous engine setup (rollback journal, driver defaults) and with
+app.database.create_database_engine (WAL, synchronous=NORMAL, cache, mmap,
+busy_timeout, pooled connections), then prints throughput for each.
+
+Usage: python db_benchmark.py [--threads 8] [--writes 2000] [--reads 20000] [--json results.json]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.database import create_database_engine
+
+USERS = 200
+SEED_ROWS = 20000
+BIO = "Experienced software developer specializing in web applications. " * 4
+
+SCHEMA = [
+    """CREATE TABLE identities (
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        display_name VARCHAR NOT NULL,
+        bio TEXT,
+        usage_count INTEGER DEFAULT 0,
+        created_at DATETIME
+    )""",
+    "CREATE INDEX ix_identities_user_created ON identities (user_id, created_at)",
+]
+
+INSERT = text("INSERT INTO identities (user_id, display_name, bio, created_at) VALUES (:user_id, :name, :bio, :created_at)")
+SELECT = text("SELECT id, display_name, bio FROM identities WHERE user_id = :user_id ORDER BY created_at LIMIT 50")
+
+
+def baseline_engine(url):
+    """The engine main.py used to build: only check_same_thread disabled"""
+    return create_engine(url, connect_args={"check_same_thread": False})
+
+
+def tuned_engine(url):
+    return create_database_engine(url=url)
+
+
+def seed(engine):
+    with engine.begin() as conn:
+        for statement in SCHEMA:
+            conn.execute(text(statement))
+        conn.execute(INSERT, [
+            {"user_id": index % USERS, "name": f"Seed {index}", "bio": BIO, "created_at": datetime.utcnow()}
+            for index in range(SEED_ROWS)
+        ])
+
+
+def run_threads(threads, operations, operation):
+    """Run operation(index) operations times across threads; returns (seconds, errors)"""
+    errors = []
+
+    def guarded(index):
+        try:
+            operation(index)
+        except OperationalError as error:
+            errors.append(str(error.orig))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(guarded, range(operations)))
+    return time.perf_counter() - started, len(errors)
+
+
+def write_workload(engine, threads, writes):
+    """One committed transaction per insert, as each write request used to do"""
+    def write(index):
+        with engine.begin() as conn:
+            conn.execute(INSERT, {"user_id": index % USERS, "name": f"Write {index}", "bio": BIO,
+                                  "created_at": datetime.utcnow()})
+    return run_threads(threads, writes, write)
+
+
+def read_workload(engine, threads, reads):
+    def read(index):
+        with engine.connect() as conn:
+            conn.execute(SELECT, {"user_id": random.randrange(USERS)}).fetchall()
+    return run_threads(threads, reads, read)
+
+
+def mixed_workload(engine, threads, reads, writes):
+    """Readers measured while one background thread keeps committing writes"""
+    stop = threading.Event()
+    write_errors = []
+
+    def writer():
+        index = 0
+        while not stop.is_set():
+            try:
+                with engine.begin() as conn:
+                    conn.execute(INSERT, {"user_id": index % USERS, "name": f"Mixed {index}", "bio": BIO,
+                                          "created_at": datetime.utcnow()})
+            except OperationalError as error:
+                write_errors.append(str(error.orig))
+            index += 1
+            if index >= writes:
+                break
+
+    background = threading.Thread(target=writer)
+    background.start()
+    try:
+        seconds, read_errors = read_workload(engine, threads, reads)
+    finally:
+        stop.set()
+        background.join()
+    return seconds, read_errors + len(write_errors)
+
+
+def benchmark_profile(name, make_engine, threads, writes, reads):
+    with tempfile.TemporaryDirectory() as scratch:
+        url = f"sqlite:///{os.path.join(scratch, 'bench.db')}"
+        engine = make_engine(url)
+        try:
+            seed(engine)
+            with engine.connect() as conn:
+                journal = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+            results = {"profile": name, "journal_mode": journal}
+            for workload, run, count in (
+                ("write", lambda: write_workload(engine, threads, writes), writes),
+                ("read", lambda: read_workload(engine, threads, reads), reads),
+                ("mixed_read", lambda: mixed_workload(engine, threads, reads, writes), reads),
+            ):
+                seconds, errors = run()
+                results[workload] = {
+                    "operations": count,
+                    "seconds": round(seconds, 3),
+                    "ops_per_second": round(count / seconds, 1),
+                    "errors": errors,
+                }
+            return results
+        finally:
+            engine.dispose()
+
+
+def print_report(results):
+    print(f"{'workload':<12}" + "".join(f"{result['profile'] + ' (' + result['journal_mode'] + ')':>26}" for result in results))
+    for workload in ("write", "read", "mixed_read"):
+        cells = "".join(
+            f"{result[workload]['ops_per_second']:>16.1f} ops/s {result[workload]['errors']:>3} err"
+            for result in results
+        )
+        print(f"{workload:<12}{cells}")
+    baseline, tuned = results
+    for workload in ("write", "read", "mixed_read"):
+        ratio = tuned[workload]["ops_per_second"] / baseline[workload]["ops_per_second"]
+        print(f"  {workload} speedup: {ratio:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--reads", type=int, default=20000)
+    parser.add_argument("--json", help="Also write raw results to this file")
+    args = parser.parse_args()
+
+    results = [
+        benchmark_profile(name, factory, args.threads, args.writes, args.reads)
+        for name, factory in (("baseline", baseline_engine), ("tuned", tuned_engine))
+    ]
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(results, handle, indent=2)
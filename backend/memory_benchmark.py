@@ -0,0 +1,136 @@
+"""
+PersonifID Memory Benchmark: list endpoint row hydration at 10k rows
+Measures tracemalloc peak memory and wall time for fetching and shaping the
+identity and context lists, comparing the previous ORM path (full entities in
+the identity map, one response model per row, standard JSON encoding) with
+the current Core select of only the response columns (Row named tuples,
+orjson-encoded). Both include the encoded response body.
+
+Usage: python memory_benchmark.py [--rows 10000] [--repeat 3]
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+# Point the app at a throwaway database before it is imported
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'memory.db')}")
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.main import (
+    CONTEXT_FIELDS, IDENTITY_FIELDS, Context, ContextResponse, Identity, IdentityResponse, User, context_identity_count,
+    context_rows_select, engine, identity_context_count, identity_rows_select, json_rows_response,
+)
+
+BIO = "Experienced developer specializing in web applications, APIs and distributed systems. " * 6
+
+
+def seed(rows: int) -> int:
+    with Session(engine) as session:
+        user = User(username="memory", email="memory@example.com", hashed_password="x")
+        session.add(user)
+        session.flush()
+        session.execute(insert(Identity), [
+            {"user_id": user.id, "display_name": f"Identity {index}", "title": "Senior Engineer", "bio": BIO,
+             "privacy_level": "standard", "social_links": {"github": f"https://github.com/u{index}"},
+             "use_case": "Professional networking"}
+            for index in range(rows)
+        ])
+        session.execute(insert(Context), [
+            {"user_id": user.id, "name": f"Context {index}", "description": "Work and conferences", "icon": "briefcase"}
+            for index in range(rows)
+        ])
+        session.commit()
+        return user.id
+
+
+def orm_response(entity, count_column, response_model, count_field):
+    """Previous path: entities plus a count, one response model per row, FastAPI's JSON encoding"""
+    adapter = TypeAdapter(List[response_model])
+
+    def run(session: Session, user_id: int):
+        rows = session.query(entity, count_column()).filter(entity.user_id == user_id).all()
+        models = [
+            response_model.model_validate(row).model_copy(update={count_field: count})
+            for row, count in rows
+        ]
+        return JSONResponse(adapter.dump_python(models, mode="json"))
+    return run
+
+
+def core_rows_response(statement, fields):
+    def run(session: Session, user_id: int):
+        rows = session.execute(statement(user_id)).all()
+        response = Response()
+        del response.headers["content-length"]
+        return json_rows_response(rows, response, fields)
+    return run
+
+
+PATHS = {
+    "identities": (
+        orm_response(Identity, identity_context_count, IdentityResponse, "context_count"),
+        core_rows_response(lambda user_id: identity_rows_select().where(Identity.user_id == user_id), IDENTITY_FIELDS),
+    ),
+    "contexts": (
+        orm_response(Context, context_identity_count, ContextResponse, "identity_count"),
+        core_rows_response(lambda user_id: context_rows_select().where(Context.user_id == user_id), CONTEXT_FIELDS),
+    ),
+}
+
+
+def measure(fn, user_id: int, repeat: int) -> dict:
+    """Best-of-repeat wall time and the tracemalloc peak of one run, each on a fresh session"""
+    timings = []
+    for _ in range(repeat):
+        with Session(engine) as session:
+            started = time.perf_counter()
+            fn(session, user_id)
+            timings.append(time.perf_counter() - started)
+
+    gc.collect()
+    with Session(engine) as session:
+        # Open the connection outside the traced region
+        session.connection()
+        tracemalloc.start()
+        result = fn(session, user_id)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+    return {"ms": round(min(timings) * 1000, 1), "peak_bytes": peak}
+
+
+def run(rows: int, repeat: int) -> dict:
+    user_id = seed(rows)
+    return {
+        endpoint: {
+            "orm": measure(orm_path, user_id, repeat),
+            "core": measure(core_path, user_id, repeat),
+        }
+        for endpoint, (orm_path, core_path) in PATHS.items()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+    print(f"{'list':<12}{'path':<6}{'time':>10}{'peak':>12}{'per row':>12}")
+    for endpoint, paths in results.items():
+        for path, stats in paths.items():
+            print(f"{endpoint:<12}{path:<6}{stats['ms']:>8.1f}ms{stats['peak_bytes'] / 2**20:>10.1f}MB"
+                  f"{stats['peak_bytes'] / args.rows:>10.0f} B")
+        orm, core = paths["orm"], paths["core"]
+        print(f"  {endpoint}: {orm['peak_bytes'] / core['peak_bytes']:.1f}x less memory, "
+              f"{orm['ms'] / core['ms']:.1f}x faster")
@@ -5,6 +5,7 @@ import time
 import requests
 import statistics
 import json
+import uuid
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
@@ -12,6 +13,8 @@ class PersonifIDPerformanceBenchmark:
     def __init__(self, base_url="http://localhost:8000"):
         self.base_url = base_url
         self.results = {}
+        # Concurrent workflow users must be new on every run, or registration fails
+        self.run_id = uuid.uuid4().hex[:8]
         
     def authenticate(self):
         """Get authentication token for testing"""
@@ -97,8 +100,8 @@ class PersonifIDPerformanceBenchmark:
             try:
                 # Register unique user
                 user_data = {
-                    "username": f"concurrent{user_id}",
-                    "email": f"concurrent{user_id}@example.com",
+                    "username": f"concurrent{user_id}_{self.run_id}",
+                    "email": f"concurrent{user_id}_{self.run_id}@example.com",
                     "password": "testpass123"
                 }
                 
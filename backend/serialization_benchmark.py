@@ -0,0 +1,144 @@
+"""
+PersonifID Serialization Benchmark: identity list encoding per 1,000 rows
+Compares the previous list path (ORM entities, one IdentityResponse per row,
+FastAPI's response_model validation and the standard JSON encoder) with the
+current one (identity_rows_select Core rows encoded by json_rows_response).
+Query time is measured separately from serialization on a scratch database.
+
+Usage: python serialization_benchmark.py [--identities 1000] [--repeat 20]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from typing import List
+
+# Point the app at a throwaway database before it is imported
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'serialization.db')}")
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.main import (
+    IDENTITY_FIELDS, Identity, IdentityResponse, User, engine, identity_context_count, identity_rows_select,
+    json_rows_response,
+)
+
+RESPONSE_ADAPTER = TypeAdapter(List[IdentityResponse])
+
+
+def seed(session: Session, identities: int) -> int:
+    user = User(username="serializer", email="serializer@example.com", hashed_password="x")
+    session.add(user)
+    session.flush()
+    session.add_all(
+        Identity(
+            user_id=user.id,
+            display_name=f"Identity {index}",
+            email=f"identity{index}@example.com",
+            title="Senior Software Engineer",
+            bio="Experienced developer specializing in web applications and APIs. " * 3,
+            privacy_level="standard",
+            social_links={"github": f"https://github.com/u{index}", "linkedin": f"https://linkedin.com/in/u{index}"},
+            use_case="Professional networking",
+        )
+        for index in range(identities)
+    )
+    session.commit()
+    return user.id
+
+
+def build_identity_response(identity: Identity, context_count: int) -> IdentityResponse:
+    """The per-row model construction the list endpoints used to do"""
+    return IdentityResponse(
+        id=identity.id,
+        user_id=identity.user_id,
+        display_name=identity.display_name,
+        email=identity.email,
+        phone=identity.phone,
+        title=identity.title,
+        bio=identity.bio,
+        avatar_url=identity.avatar_url,
+        is_default=identity.is_default,
+        is_public=identity.is_public,
+        privacy_level=identity.privacy_level,
+        social_links=identity.social_links,
+        usage_count=identity.usage_count,
+        use_case=identity.use_case,
+        created_at=identity.created_at,
+        context_count=context_count or 0
+    )
+
+
+def before_fetch(session: Session, user_id: int):
+    return session.query(Identity, identity_context_count()).filter(Identity.user_id == user_id).all()
+
+
+def before_serialize(rows) -> bytes:
+    """Models per row, then FastAPI's response_model validation and JSONResponse encoding"""
+    models = [build_identity_response(identity, context_count) for identity, context_count in rows]
+    validated = RESPONSE_ADAPTER.validate_python(models, from_attributes=True)
+    return JSONResponse(RESPONSE_ADAPTER.dump_python(validated, mode="json")).body
+
+
+def after_fetch(session: Session, user_id: int):
+    return session.execute(identity_rows_select().where(Identity.user_id == user_id)).all()
+
+
+def after_serialize(rows) -> bytes:
+    # Stand-in for the injected response, which FastAPI creates without a content-length
+    response = Response()
+    del response.headers["content-length"]
+    return json_rows_response(rows, response, IDENTITY_FIELDS).body
+
+
+def measure(fn, repeat: int) -> float:
+    """Median milliseconds over repeat runs"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def run(identities: int, repeat: int) -> dict:
+    results = {}
+    with Session(engine) as session:
+        user_id = seed(session, identities)
+        for name, fetch, serialize in (
+            ("before", before_fetch, before_serialize),
+            ("after", after_fetch, after_serialize),
+        ):
+            # Fresh identity map each time so ORM rows are really rebuilt
+            def fetch_rows():
+                session.expunge_all()
+                return fetch(session, user_id)
+
+            rows = fetch_rows()
+            body = serialize(rows)
+            results[name] = {
+                "query_ms": round(measure(fetch_rows, repeat), 2),
+                "serialize_ms": round(measure(lambda: serialize(rows), repeat), 2),
+                "bytes": len(body),
+            }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--identities", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    results = run(args.identities, args.repeat)
+    scale = 1000 / args.identities
+    print(f"{'path':<8}{'query':>12}{'serialize':>14}{'total':>12}   (ms per 1,000 identities)")
+    for name, stats in results.items():
+        total = stats["query_ms"] + stats["serialize_ms"]
+        print(f"{name:<8}{stats['query_ms'] * scale:>12.2f}{stats['serialize_ms'] * scale:>14.2f}{total * scale:>12.2f}")
+    before, after = results["before"], results["after"]
+    print(f"serialization speedup: {before['serialize_ms'] / after['serialize_ms']:.1f}x")
@@ -3,15 +3,29 @@ PersonifID test infrastructure for backend API testing
 """
 import pytest
 import asyncio
+import atexit
+import shutil
 import sys
 import os
+import tempfile
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 # Add the parent directory to Python path to import from app
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Cheap KDF parameters keep the many test registrations fast
+os.environ.setdefault("ARGON2_TIME_COST", "1")
+os.environ.setdefault("ARGON2_MEMORY_COST_KIB", "1024")
+# Repeated statement shapes within a request (N+1) fail the test
+os.environ.setdefault("SQL_REPEAT_RAISE", "1")
+# Importing app.main creates tables and runs migrations on the default database;
+# point it at a scratch file so the tracked personifid.db is never touched
+_app_database_dir = tempfile.mkdtemp(prefix="personifid-tests-")
+atexit.register(shutil.rmtree, _app_database_dir, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_app_database_dir, 'app.db')}"
+
 # Try different import paths to find your main app
 try:
     from app.main import app, get_db, Base
@@ -27,6 +41,9 @@ except ImportError:
             print("App directory contents:", os.listdir('app'))
         raise ImportError("Could not find FastAPI app. Please check import path.")
 
+from app.main import resolution_cache, user_cache
+from app.writer import close_writer
+
 # Test database configuration for isolation
 TEST_DATABASE_URL = "sqlite:///./test_personifid.db"
 
@@ -39,9 +56,12 @@ def test_engine():
     engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
     Base.metadata.create_all(bind=engine)
     yield engine
-    # Cleanup: Remove test database after all tests
-    if os.path.exists("./test_personifid.db"):
-        os.remove("./test_personifid.db")
+    # Cleanup: Stop the write pipeline, then remove the database and its WAL files
+    close_writer(engine)
+    engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(f"./test_personifid.db{suffix}"):
+            os.remove(f"./test_personifid.db{suffix}")
 
 @pytest.fixture(scope="function")
 def test_db(test_engine):
@@ -75,6 +95,9 @@ def client(test_db):
             test_db.close()
     
     app.dependency_overrides[get_db] = override_get_db
+    # Tables are recreated per test, so user ids repeat; cached snapshots must not
+    resolution_cache.clear()
+    user_cache.clear()
     client = TestClient(app)
     yield client
     app.dependency_overrides.clear()
@@ -108,4 +131,19 @@ def authenticated_headers(client, sample_user_data):
     })
     token = login_response.json()["access_token"]
     
-    return {"Authorization": f"Bearer {token}"}
\ No newline at end of file
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture
+def sql_statements(test_engine):
+    """
+    Records every SQL statement executed on the test engine
+    Used to assert constant query counts (N+1 detection)
+    """
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(test_engine, "before_cursor_execute", record)
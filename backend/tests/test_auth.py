@@ -68,7 +68,7 @@ class TestAuthentication:
         assert "access_token" in token_data
         assert "token_type" in token_data
         assert token_data["token_type"] == "bearer"
-        assert token_data["access_token"].startswith("fake-token-for-")
+        assert token_data["access_token"].count(".") == 2  # Signed JWT: header.claims.signature
     
     def test_login_invalid_credentials(self, client, sample_user_data):
         """
@@ -112,4 +112,34 @@ class TestAuthentication:
         assert response.status_code == 200
         user_data = response.json()
         assert "username" in user_data
-        assert "email" in user_data
\ No newline at end of file
+        assert "email" in user_data
+    
+    def test_profile_snapshot_cache(self, client, authenticated_headers, sample_user_data, sql_statements):
+        """
+        Tests that /users/me is served from the user cache
+        Validates: Cache hits skip the users table, writes invalidate the snapshot
+        """
+        from app.main import user_cache
+        
+        assert client.get("/users/me", headers=authenticated_headers).json()["identity_count"] == 0
+        hits = user_cache.hits
+        sql_statements.clear()
+        assert client.get("/users/me", headers=authenticated_headers).status_code == 200
+        assert user_cache.hits == hits + 1
+        assert not [statement for statement in sql_statements if "FROM users" in statement]
+        
+        # Identity count changes are visible on the next request
+        client.post("/identities", json={"display_name": "Work"}, headers=authenticated_headers)
+        assert client.get("/users/me", headers=authenticated_headers).json()["identity_count"] == 1
+        assert user_cache.hits == hits + 1
+        
+        # Login rewrites last_login and drops the snapshot too
+        client.post("/auth/token", data={
+            "username": sample_user_data["username"],
+            "password": sample_user_data["password"]
+        })
+        client.get("/users/me", headers=authenticated_headers)
+        assert user_cache.hits == hits + 1
+        
+        stats = client.get("/debug/cache").json()["users"]
+        assert stats["hits"] == user_cache.hits and "hit_rate" in stats
@@ -113,4 +113,146 @@ class TestContextManagement:
         
         # Verify graceful handling (not an error)
         assert duplicate_response.status_code == 200
-        assert "already assigned" in duplicate_response.json()["message"]
\ No newline at end of file
+        assert "already assigned" in duplicate_response.json()["message"]
+    
+    def test_identity_contexts_reverse_lookup(self, client, authenticated_headers, sample_context_data, test_db):
+        """
+        Tests listing an identity's contexts in one request
+        Validates: Assignment filtering, counts, ownership, index usage
+        """
+        from sqlalchemy import text
+        
+        identity_id = client.post("/identities", json={"display_name": "Reverse"}, headers=authenticated_headers).json()["id"]
+        context_ids = [
+            client.post("/contexts", json={**sample_context_data, "name": f"Context {i}"}, headers=authenticated_headers).json()["id"]
+            for i in range(3)
+        ]
+        for context_id in context_ids[:2]:
+            client.post(f"/contexts/{context_id}/identities/{identity_id}", headers=authenticated_headers)
+        
+        response = client.get(f"/identities/{identity_id}/contexts", headers=authenticated_headers)
+        assert response.status_code == 200
+        contexts = response.json()
+        assert sorted(context["id"] for context in contexts) == context_ids[:2]
+        assert all(context["identity_count"] == 1 for context in contexts)
+        
+        # Unknown identity is rejected
+        assert client.get("/identities/9999/contexts", headers=authenticated_headers).status_code == 404
+        
+        # The association lookup uses the composite primary key rather than a table scan
+        plan = test_db.execute(text(
+            "EXPLAIN QUERY PLAN SELECT context_id FROM identity_context WHERE identity_id = 1"
+        )).fetchall()
+        assert any("USING" in row[-1] and "INDEX" in row[-1] for row in plan)
+    
+    def test_context_member_lists_paginate(self, client, authenticated_headers, sample_context_data):
+        """
+        Tests cursor pagination of assigned and unassigned identities
+        Validates: Membership filtering in SQL, full pages, disjoint results
+        """
+        context_id = client.post("/contexts", json=sample_context_data, headers=authenticated_headers).json()["id"]
+        identity_ids = [
+            client.post("/identities", json={"display_name": f"Member {i}"}, headers=authenticated_headers).json()["id"]
+            for i in range(6)
+        ]
+        for identity_id in identity_ids[::2]:
+            client.post(f"/contexts/{context_id}/identities/{identity_id}", headers=authenticated_headers)
+        
+        def collect(path):
+            ids, cursor = [], None
+            while True:
+                params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+                response = client.get(path, params=params, headers=authenticated_headers)
+                assert response.status_code == 200
+                page = response.json()
+                cursor = response.headers.get("X-Next-Cursor")
+                if cursor:
+                    assert len(page) == 2
+                ids.extend(identity["id"] for identity in page)
+                if not cursor:
+                    return ids
+        
+        assert collect(f"/contexts/{context_id}/identities") == identity_ids[::2]
+        assert collect(f"/contexts/{context_id}/unassigned-identities") == identity_ids[1::2]
+    
+    def test_bulk_assign_and_unassign(self, client, authenticated_headers, sample_context_data, test_engine):
+        """
+        Tests bulk association endpoints with mixed valid and invalid pairs
+        Validates: Per-pair statuses, idempotency, ownership, single write unit
+        """
+        from app.writer import writer_for
+        
+        context_ids = [
+            client.post("/contexts", json={**sample_context_data, "name": f"Bulk {i}"}, headers=authenticated_headers).json()["id"]
+            for i in range(2)
+        ]
+        identity_ids = [
+            client.post("/identities", json={"display_name": f"Bulk {i}"}, headers=authenticated_headers).json()["id"]
+            for i in range(3)
+        ]
+        client.post(f"/contexts/{context_ids[0]}/identities/{identity_ids[0]}", headers=authenticated_headers)
+        
+        pairs = [{"context_id": c, "identity_id": i} for c in context_ids for i in identity_ids]
+        pairs += [{"context_id": 9999, "identity_id": identity_ids[0]}, {"context_id": context_ids[0], "identity_id": 9999}]
+        
+        units_before = writer_for(test_engine).units
+        response = client.post("/associations/assign", json={"pairs": pairs}, headers=authenticated_headers)
+        assert response.status_code == 200
+        body = response.json()
+        assert [result["status"] for result in body["results"]][:2] == ["already_assigned", "assigned"]
+        assert body["counts"] == {"already_assigned": 1, "assigned": 5, "context_not_found": 1, "identity_not_found": 1}
+        assert writer_for(test_engine).units == units_before + 1
+        
+        members = client.get(f"/contexts/{context_ids[1]}/identities", headers=authenticated_headers).json()
+        assert [identity["id"] for identity in members] == identity_ids
+        
+        # Unassigning reports which pairs were actually removed
+        removal = [{"context_id": context_ids[1], "identity_id": i} for i in identity_ids]
+        response = client.post("/associations/unassign", json={"pairs": removal}, headers=authenticated_headers)
+        assert response.json()["counts"] == {"removed": 3}
+        response = client.post("/associations/unassign", json={"pairs": removal}, headers=authenticated_headers)
+        assert response.json()["counts"] == {"not_assigned": 3}
+        assert client.get(f"/contexts/{context_ids[1]}/identities", headers=authenticated_headers).json() == []
+        
+        # Empty requests are rejected by validation
+        assert client.post("/associations/assign", json={"pairs": []}, headers=authenticated_headers).status_code == 422
+    
+    def test_single_association_writes_are_set_based(self, client, authenticated_headers, sample_context_data):
+        """
+        Tests single assign, unassign and context update against the association table
+        Validates: rowcount outcomes, counts, member lists never loaded
+        """
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+        
+        context_id = client.post("/contexts", json=sample_context_data, headers=authenticated_headers).json()["id"]
+        identity_ids = [
+            client.post("/identities", json={"display_name": f"Member {i}"}, headers=authenticated_headers).json()["id"]
+            for i in range(3)
+        ]
+        for identity_id in identity_ids:
+            assert client.post(f"/contexts/{context_id}/identities/{identity_id}", headers=authenticated_headers).status_code == 201
+        
+        # Writes run on the writer's own engine, so record statements on every engine
+        sql_statements = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            sql_statements.append(statement)
+        
+        event.listen(Engine, "before_cursor_execute", record)
+        try:
+            assert client.post(f"/contexts/{context_id}/identities/{identity_ids[0]}", headers=authenticated_headers).status_code == 200
+            updated = client.put(f"/contexts/{context_id}", json={"name": "Renamed"}, headers=authenticated_headers).json()
+            assert updated["identity_count"] == 3
+            
+            removed = client.delete(f"/contexts/{context_id}/identities/{identity_ids[0]}", headers=authenticated_headers)
+            assert removed.json()["message"] == "Identity successfully removed from context"
+            again = client.delete(f"/contexts/{context_id}/identities/{identity_ids[0]}", headers=authenticated_headers)
+            assert again.json()["message"] == "Identity not assigned to context"
+            assert client.delete(f"/contexts/{context_id}/identities/9999", headers=authenticated_headers).status_code == 404
+        finally:
+            event.remove(Engine, "before_cursor_execute", record)
+        
+        # Members are never loaded through the association table
+        assert [statement for statement in sql_statements if "identity_context" in statement]
+        assert not [statement for statement in sql_statements if "FROM identities, identity_context" in statement]
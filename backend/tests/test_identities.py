@@ -4,6 +4,7 @@ Validates CRUD operations and business logic for digital identities
 """
 import pytest
 import json
+import base64
 
 class TestIdentityManagement:
     """
@@ -193,3 +194,219 @@ class TestIdentityManagement:
             headers=authenticated_headers
         )
         assert get_response.status_code == 404
+    
+    def test_identity_list_cursor_pagination(self, client, authenticated_headers):
+        """
+        Tests walking the identity list with keyset cursors
+        Validates: Creation order, no gaps or repeats, last page, cursor validation
+        """
+        created_ids = [
+            client.post("/identities", json={"display_name": f"Paged {i}"}, headers=authenticated_headers).json()["id"]
+            for i in range(5)
+        ]
+        
+        seen, cursor, pages = [], None, 0
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/identities", params=params, headers=authenticated_headers)
+            assert response.status_code == 200
+            seen.extend(identity["id"] for identity in response.json())
+            pages += 1
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        
+        assert seen == created_ids
+        assert pages == 3
+        
+        # Malformed cursors and oversized pages are rejected
+        assert client.get("/identities", params={"cursor": "not-a-cursor"}, headers=authenticated_headers).status_code == 400
+        for payload in (["2020-01-01T00:00:00", 10**30], ["2020-01-01T00:00:00", -1], ["2020-01-01T00:00:00", True], ["99999-01-01", 1]):
+            tampered = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+            response = client.get("/identities", params={"cursor": tampered}, headers=authenticated_headers)
+            assert response.status_code == 400
+            assert response.json()["detail"] == "Invalid cursor"
+        assert client.get("/identities", params={"limit": 10_000}, headers=authenticated_headers).status_code == 422
+    
+    def test_dashboard_stats_counts(self, client, authenticated_headers):
+        """
+        Tests the dashboard totals are counts, not the length of one list page
+        Validates: Totals past the default page size, visibility and privacy breakdowns, recent list
+        """
+        from app.main import DEFAULT_PAGE_SIZE
+        
+        total = DEFAULT_PAGE_SIZE + 5
+        lines = "\n".join(
+            json.dumps({"display_name": f"Stat {i}", "is_public": i % 5 == 0, "privacy_level": "high" if i % 2 else "standard"})
+            for i in range(total)
+        )
+        imported = client.post("/identities/import", content=lines, headers=authenticated_headers)
+        assert imported.status_code == 200
+        client.post("/contexts", json={"name": "Work"}, headers=authenticated_headers)
+        
+        assert len(client.get("/identities", headers=authenticated_headers).json()) == DEFAULT_PAGE_SIZE
+        stats = client.get("/dashboard/stats", headers=authenticated_headers).json()
+        assert stats["total_identities"] == total
+        assert stats["public_identities"] == len(range(0, total, 5))
+        assert stats["identities_by_privacy_level"] == {"high": total // 2, "standard": total - total // 2, "minimal": 0}
+        assert stats["total_contexts"] == 1
+        assert [identity["display_name"] for identity in stats["recent_identities"]][0] == f"Stat {total - 1}"
+    
+    def test_identity_sparse_fieldsets(self, client, authenticated_headers, sample_identity_data, sql_statements):
+        """
+        Tests ?fields= on identity and context lists and gets
+        Validates: Payload and SELECT list restricted, id kept, cursors intact, unknown fields rejected
+        """
+        first = client.post("/identities", json=sample_identity_data, headers=authenticated_headers).json()["id"]
+        client.post("/identities", json={"display_name": "Second"}, headers=authenticated_headers)
+        client.post("/contexts", json={"name": "Work", "description": "Office"}, headers=authenticated_headers)
+        
+        sql_statements.clear()
+        response = client.get("/identities", params={"fields": "display_name,privacy_level", "limit": 1}, headers=authenticated_headers)
+        assert response.status_code == 200
+        assert response.json() == [{"id": first, "display_name": sample_identity_data["display_name"], "privacy_level": "standard"}]
+        listing = [statement for statement in sql_statements if "FROM identities" in statement][-1]
+        assert "identities.bio" not in listing and "identities.social_links" not in listing
+        
+        cursor = response.headers["X-Next-Cursor"]
+        next_page = client.get("/identities", params={"fields": "display_name", "cursor": cursor}, headers=authenticated_headers)
+        assert [identity["display_name"] for identity in next_page.json()] == ["Second"]
+        
+        single = client.get(f"/identities/{first}", params={"fields": "title, context_count"}, headers=authenticated_headers)
+        assert single.json() == {"id": first, "title": sample_identity_data["title"], "context_count": 0}
+        contexts = client.get("/contexts", params={"fields": "name"}, headers=authenticated_headers)
+        assert [set(context) for context in contexts.json()] == [{"id", "name"}]
+        
+        # Without fields the full response model is returned
+        assert set(client.get("/identities", headers=authenticated_headers).json()[0]) >= {"bio", "social_links", "context_count"}
+        unknown = client.get("/identities", params={"fields": "display_name,hashed_password"}, headers=authenticated_headers)
+        assert unknown.status_code == 400
+        assert "hashed_password" in unknown.json()["detail"]
+    
+    def test_identity_ndjson_import(self, client, authenticated_headers):
+        """
+        Tests streaming NDJSON import with batched inserts
+        Validates: Per-line errors, batching, default handling, identity_count, features
+        """
+        rows = [
+            {"display_name": "Imported 0", "title": "Software Engineer"},
+            {"display_name": "Imported 1", "is_default": True},
+            "not json",
+            {"title": "Missing display name"},
+            {"display_name": "Imported 2", "is_default": True, "social_links": {"github": "https://github.com/x"}},
+            {"display_name": "Imported 3"},
+        ]
+        body = "\n".join(row if isinstance(row, str) else json.dumps(row) for row in rows) + "\n\n"
+        
+        def chunked():
+            # Split mid-line to exercise incremental framing
+            for start in range(0, len(body), 7):
+                yield body[start:start + 7].encode()
+        
+        response = client.post("/identities/import", params={"batch_size": 2}, content=chunked(), headers=authenticated_headers)
+        
+        assert response.status_code == 200
+        summary = response.json()
+        assert summary["imported"] == 4
+        assert summary["failed"] == 2
+        assert summary["batches"] == 2
+        assert [error["line"] for error in summary["errors"]] == [3, 4]
+        assert "display_name" in summary["errors"][1]["error"]
+        assert summary["errors_truncated"] is False
+        
+        identities = client.get("/identities", headers=authenticated_headers).json()
+        assert [identity["display_name"] for identity in identities] == [f"Imported {i}" for i in range(4)]
+        assert [identity["display_name"] for identity in identities if identity["is_default"]] == ["Imported 2"]
+        assert identities[2]["social_links"] == {"github": "https://github.com/x"}
+        assert client.get("/users/me", headers=authenticated_headers).json()["identity_count"] == 4
+    
+    def test_identity_import_deeply_nested_line(self, client, authenticated_headers):
+        """
+        Tests a short but deeply nested line in an NDJSON import
+        Validates: Reported as a per-line error, surrounding lines still imported
+        """
+        depth = 20_000
+        nested = '{"a":' + "[" * depth + "]" * depth + "}"
+        body = "\n".join([json.dumps({"display_name": "Before"}), nested, json.dumps({"display_name": "After"})])
+        
+        response = client.post("/identities/import", content=body, headers=authenticated_headers)
+        
+        assert response.status_code == 200
+        summary = response.json()
+        assert summary["imported"] == 2
+        assert summary["errors"] == [{"line": 2, "error": "Invalid JSON: nested too deeply"}]
+        identities = client.get("/identities", headers=authenticated_headers).json()
+        assert [identity["display_name"] for identity in identities] == ["Before", "After"]
+    
+    def test_identity_import_failure_keeps_counts(self, client, authenticated_headers, monkeypatch):
+        """
+        Tests a batch failing after earlier batches of an import committed
+        Validates: identity_count recounted and cached profile invalidated for the committed rows
+        """
+        from app import main
+        
+        assert client.get("/users/me", headers=authenticated_headers).json()["identity_count"] == 0
+        insert_batch, calls = main.insert_identity_batch, []
+        
+        def failing_second_batch(session, user_id, rows):
+            calls.append(len(rows))
+            if len(calls) == 2:
+                raise RuntimeError("batch failed")
+            insert_batch(session, user_id, rows)
+        
+        monkeypatch.setattr(main, "insert_identity_batch", failing_second_batch)
+        body = "\n".join(json.dumps({"display_name": f"Partial {i}"}) for i in range(4))
+        with pytest.raises(RuntimeError):
+            client.post("/identities/import", params={"batch_size": 2}, content=body, headers=authenticated_headers)
+        
+        assert calls == [2, 2]
+        assert client.get("/users/me", headers=authenticated_headers).json()["identity_count"] == 2
+    
+    def test_social_links_json_column_migration(self, tmp_path):
+        """
+        Tests converting legacy social_links text into JSON objects
+        Validates: Malformed, NULL and non-object values reset, valid links kept and decoded
+        """
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.orm import Session
+        from app.main import Base, Identity, migrate_database
+        
+        legacy_engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        Base.metadata.create_all(bind=legacy_engine)
+        with legacy_engine.begin() as conn:
+            for index, raw in enumerate(['{"github": "gh"}', '{not json', None, '["a"]', '']):
+                conn.execute(
+                    text("INSERT INTO identities (id, user_id, display_name, social_links) VALUES (:id, 1, 'x', :raw)"),
+                    {"id": index + 1, "raw": raw}
+                )
+        
+        migrate_database(legacy_engine)
+        
+        with legacy_engine.connect() as conn:
+            stored = conn.execute(text("SELECT social_links FROM identities ORDER BY id")).scalars().all()
+        assert stored == ['{"github": "gh"}', "{}", "{}", "{}", "{}"]
+        with Session(legacy_engine) as session:
+            assert session.get(Identity, 1).social_links == {"github": "gh"}
+        
+        # Recorded as applied: later startups skip the full-table UPDATE
+        with legacy_engine.begin() as conn:
+            conn.execute(text("UPDATE identities SET social_links = '[]' WHERE id = 2"))
+        migrate_database(legacy_engine)
+        with legacy_engine.connect() as conn:
+            assert conn.execute(text("SELECT social_links FROM identities WHERE id = 2")).scalar() == "[]"
+        legacy_engine.dispose()
+    
+    def test_social_links_migration_skips_other_dialects(self):
+        """
+        Tests that the JSONB conversion is only attempted on PostgreSQL
+        Validates: No statements issued for other backends
+        """
+        from types import SimpleNamespace
+        from sqlalchemy import Text
+        from app.main import migrate_social_links
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("no SQL expected")
+        
+        mysql = SimpleNamespace(dialect=SimpleNamespace(name="mysql"), execute=fail, exec_driver_sql=fail, commit=fail)
+        migrate_social_links(mysql, Text())
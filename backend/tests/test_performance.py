@@ -159,4 +159,308 @@ class TestPerformanceMetrics:
             # Find identity that should have contexts
             identity_with_contexts = next((id for id in test_identities if id["context_count"] > 0), None)
             if identity_with_contexts:
-                assert identity_with_contexts["context_count"] == 2, f"Expected context count 2, got {identity_with_contexts['context_count']}"
\ No newline at end of file
+                assert identity_with_contexts["context_count"] == 2, f"Expected context count 2, got {identity_with_contexts['context_count']}"
+    
+    def test_list_endpoints_constant_query_count(self, client, authenticated_headers, sql_statements):
+        """
+        Tests that list endpoints issue the same number of SQL statements
+        regardless of how many rows (and associations) they return
+        """
+        context_id = client.post("/contexts", json={"name": "Counted"}, headers=authenticated_headers).json()["id"]
+        endpoints = ["/identities", "/contexts", f"/contexts/{context_id}/identities",
+                     f"/contexts/{context_id}/unassigned-identities"]
+
+        def statement_counts():
+            counts = {}
+            for endpoint in endpoints:
+                sql_statements.clear()
+                assert client.get(endpoint, headers=authenticated_headers).status_code == 200
+                counts[endpoint] = len(sql_statements)
+            return counts
+
+        def add_identities(count):
+            for index in range(count):
+                identity_id = client.post("/identities", json={"display_name": f"Counted {index}"},
+                                          headers=authenticated_headers).json()["id"]
+                if index % 2:
+                    client.post(f"/contexts/{context_id}/identities/{identity_id}", headers=authenticated_headers)
+                client.post("/contexts", json={"name": f"Extra {index}"}, headers=authenticated_headers)
+
+        add_identities(2)
+        small = statement_counts()
+        add_identities(8)
+        large = statement_counts()
+
+        assert large == small, f"Statement count grew with row count: {small} -> {large}"
+    
+    def test_unassigned_identities_single_anti_join(self, client, authenticated_headers, sql_statements):
+        """
+        Tests that unassigned identities come from one NOT EXISTS query
+        Validates: No separate load of the context's assignments, correct filtering
+        """
+        context_id = client.post("/contexts", json={"name": "Anti-join"}, headers=authenticated_headers).json()["id"]
+        identity_ids = [
+            client.post("/identities", json={"display_name": f"Candidate {i}"}, headers=authenticated_headers).json()["id"]
+            for i in range(4)
+        ]
+        client.post(f"/contexts/{context_id}/identities/{identity_ids[1]}", headers=authenticated_headers)
+        
+        sql_statements.clear()
+        response = client.get(f"/contexts/{context_id}/unassigned-identities", headers=authenticated_headers)
+        
+        assert response.status_code == 200
+        assert [identity["id"] for identity in response.json()] == [identity_ids[0]] + identity_ids[2:]
+        listing = [statement for statement in sql_statements if "FROM identities" in statement]
+        assert len(listing) == 1
+        assert "NOT (EXISTS" in listing[0]
+        assert not [statement for statement in sql_statements if statement.lstrip().startswith("SELECT identity_context.")]
+    
+    def test_identity_lists_skip_model_construction(self, client, authenticated_headers, monkeypatch):
+        """
+        Tests the orjson list path against the documented response model
+        Validates: Same fields and values as IdentityResponse, no per-row model construction
+        """
+        from app.main import IdentityResponse
+        
+        identity_id = client.post("/identities", json={
+            "display_name": "Fast", "title": "Engineer", "social_links": {"github": "gh"}
+        }, headers=authenticated_headers).json()["id"]
+        context_id = client.post("/contexts", json={"name": "Work"}, headers=authenticated_headers).json()["id"]
+        client.post(f"/contexts/{context_id}/identities/{identity_id}", headers=authenticated_headers)
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("IdentityResponse built for a list row")
+        monkeypatch.setattr(IdentityResponse, "__init__", fail)
+        response = client.get("/identities", headers=authenticated_headers)
+        monkeypatch.undo()
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        [item] = response.json()
+        assert item == IdentityResponse.model_validate(item).model_dump(mode="json")
+        assert item["social_links"] == {"github": "gh"} and item["context_count"] == 1
+        
+        schema = client.get("/openapi.json").json()["paths"]["/identities"]["get"]["responses"]["200"]
+        assert schema["content"]["application/json"]["schema"]["items"]["$ref"].endswith("/IdentityResponse")
+    
+    def test_read_only_lists_hydrate_no_entities(self, client, authenticated_headers, test_db, sql_statements):
+        """
+        Tests that list and dashboard endpoints read Core rows, not ORM instances
+        Validates: Nothing enters the identity map, the dashboard never selects bio
+        """
+        from sqlalchemy import event
+        
+        identity_id = client.post("/identities", json={"display_name": "Row", "bio": "Long bio"}, headers=authenticated_headers).json()["id"]
+        context_id = client.post("/contexts", json={"name": "Work"}, headers=authenticated_headers).json()["id"]
+        client.post(f"/contexts/{context_id}/identities/{identity_id}", headers=authenticated_headers)
+        
+        loaded = []
+        listener = lambda session, instance: loaded.append(type(instance).__name__)
+        event.listen(test_db, "loaded_as_persistent", listener)
+        sql_statements.clear()
+        try:
+            for path in ("/identities", "/contexts", f"/identities/{identity_id}/contexts", "/dashboard/stats"):
+                assert client.get(path, headers=authenticated_headers).status_code == 200
+        finally:
+            event.remove(test_db, "loaded_as_persistent", listener)
+        
+        assert loaded == []
+        assert client.get("/contexts", headers=authenticated_headers).json()[0]["identity_count"] == 1
+        dashboard = [statement for statement in sql_statements if "LIMIT" in statement and "FROM identities" in statement][-1]
+        assert "identities.bio" not in dashboard
+    
+    def test_request_sql_metrics_headers(self, client, authenticated_headers):
+        """
+        Tests per-request query counts and DB time in response headers
+        Validates: Worker-thread reads and group-commit writes are attributed to the request
+        """
+        created = client.post("/identities", json={"display_name": "Metered"}, headers=authenticated_headers)
+        assert int(created.headers["X-DB-Queries"]) >= 2
+        
+        listing = client.get("/identities", headers=authenticated_headers)
+        assert listing.headers["X-DB-Queries"] == "1"
+        assert listing.headers["Server-Timing"].startswith('db;dur=')
+        assert 'desc="1 queries"' in listing.headers["Server-Timing"]
+        
+        assert client.get("/").headers["X-DB-Queries"] == "0"
+    
+    def test_repeated_statement_detector(self, client, authenticated_headers, test_db):
+        """
+        Tests the N+1 detector on a lazy-loading loop
+        Validates: Same SELECT shape beyond the threshold raises, IN lists of any length share a shape
+        """
+        from app.main import Identity
+        from app.sql_metrics import QueryStats, RepeatedQueryError, statement_shape, track_queries
+        
+        for i in range(4):
+            client.post("/identities", json={"display_name": f"Lazy {i}"}, headers=authenticated_headers)
+        identities = test_db.query(Identity).all()
+        
+        with pytest.raises(RepeatedQueryError):
+            with track_queries(QueryStats(repeat_threshold=3, raise_on_repeat=True)) as stats:
+                for identity in identities:
+                    identity.contexts
+        assert stats.count == 4 and len(stats.repeated) == 1
+        
+        assert statement_shape("SELECT x FROM t WHERE id IN (?, ?)") == statement_shape("SELECT x FROM t\n WHERE id IN (?)")
+        writes = QueryStats(repeat_threshold=1, raise_on_repeat=True)
+        for _ in range(3):
+            writes.record("INSERT INTO t VALUES (?)", 0.001)
+        assert writes.count == 3 and not writes.repeated
+    
+    def test_index_audit_finds_no_full_scans(self):
+        """
+        Tests that every hot read query is served by an index
+        Runs the EXPLAIN QUERY PLAN audit used by `python -m app.index_audit`
+        """
+        from app.index_audit import run_audit
+        
+        report = run_audit()
+        
+        assert report, "Audit captured no queries"
+        flagged = [(result["endpoints"], result["problems"]) for result in report if result["problems"]]
+        assert not flagged, f"Queries without index support: {flagged}"
+    
+    def test_legacy_association_table_migration(self, tmp_path):
+        """
+        Tests rebuilding a key-less identity_context with the composite primary key
+        Validates: Duplicate removal, primary key, reverse index
+        """
+        from sqlalchemy import create_engine, inspect, text
+        from app.main import Base, migrate_database
+        
+        legacy_engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        with legacy_engine.begin() as conn:
+            conn.execute(text("CREATE TABLE identity_context (identity_id INTEGER, context_id INTEGER)"))
+            conn.execute(text("INSERT INTO identity_context VALUES (1, 1), (1, 1), (2, 1), (NULL, 3)"))
+        
+        # Startup order: create_all leaves the existing legacy table untouched
+        Base.metadata.create_all(bind=legacy_engine)
+        migrate_database(legacy_engine)
+        
+        inspector = inspect(legacy_engine)
+        assert inspector.get_pk_constraint("identity_context")["constrained_columns"] == ["identity_id", "context_id"]
+        assert "ix_identity_context_context_identity" in {index["name"] for index in inspector.get_indexes("identity_context")}
+        with legacy_engine.connect() as conn:
+            rows = conn.execute(text("SELECT identity_id, context_id FROM identity_context ORDER BY identity_id")).fetchall()
+        assert [tuple(row) for row in rows] == [(1, 1), (2, 1)]
+        legacy_engine.dispose()
+    
+    def test_user_graph_export_streams_ndjson(self, client, authenticated_headers):
+        """
+        Tests the streamed identity graph export, plain and gzipped
+        Validates: Record order and types, assignments, gzip framing
+        """
+        import gzip
+        import json
+        
+        identity_ids = [
+            client.post("/identities", json={"display_name": f"Export {i}", "social_links": {"github": "gh"}},
+                        headers=authenticated_headers).json()["id"]
+            for i in range(3)
+        ]
+        context_id = client.post("/contexts", json={"name": "Exported"}, headers=authenticated_headers).json()["id"]
+        client.post(f"/contexts/{context_id}/identities/{identity_ids[1]}", headers=authenticated_headers)
+        
+        response = client.get("/users/me/export", headers=authenticated_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        records = [json.loads(line) for line in response.text.splitlines()]
+        
+        assert [record["type"] for record in records] == ["user", "identity", "identity", "identity", "context", "assignment"]
+        assert [record["id"] for record in records if record["type"] == "identity"] == identity_ids
+        assert records[1]["social_links"] == {"github": "gh"}
+        assert "bio_keyword_bits" not in records[1]
+        assert records[-1] == {"type": "assignment", "identity_id": identity_ids[1], "context_id": context_id}
+        
+        compressed = client.get("/users/me/export", params={"gzip": True}, headers=authenticated_headers)
+        assert compressed.headers["content-type"] == "application/gzip"
+        assert 'filename="personifid-export-' in compressed.headers["content-disposition"]
+        unpacked = [json.loads(line) for line in gzip.decompress(compressed.content).splitlines()]
+        assert unpacked[1:] == records[1:]
+    
+    def test_group_commit_writer_isolates_failures(self, tmp_path):
+        """
+        Tests grouping of concurrent write units and per-unit rollback
+        Validates: Shared commits, failing units rolled back alone, results via futures
+        """
+        from sqlalchemy import create_engine, text
+        from app.writer import GroupCommitWriter
+        
+        engine = create_engine(f"sqlite:///{tmp_path / 'writer.db'}")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, value TEXT UNIQUE)"))
+        writer = GroupCommitWriter(engine, max_group=16, max_wait=0.01)
+        
+        def unit(index):
+            def write(session):
+                # Every value is submitted twice; the second insert violates UNIQUE
+                session.execute(text("INSERT INTO items (value) VALUES (:value)"), {"value": str(index % 40)})
+                return index
+            return write
+        
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                futures = list(pool.map(lambda index: writer.submit(unit(index)), range(80)))
+            outcomes = [future.exception(timeout=10) for future in futures]
+        finally:
+            writer.stop()
+        
+        assert sum(outcome is None for outcome in outcomes) == 40
+        assert writer.units == 80 and writer.failed_units == 40
+        assert writer.groups < writer.units
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT COUNT(DISTINCT value) FROM items")).scalar() == 40
+        engine.dispose()
+    
+    def test_concurrent_identity_creation(self, client, authenticated_headers, test_engine):
+        """
+        Tests concurrent write requests against the same user
+        Validates: No lock errors, every write committed, consistent identity_count
+        """
+        from sqlalchemy.orm import sessionmaker
+        from app.main import app, get_db
+        
+        # One session per request, as in production; the shared test session is not thread-safe
+        RequestSession = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+        
+        def session_per_request():
+            db = RequestSession()
+            try:
+                yield db
+            finally:
+                db.close()
+        
+        app.dependency_overrides[get_db] = session_per_request
+        
+        def create(index):
+            return client.post("/identities", json={"display_name": f"Concurrent {index}"}, headers=authenticated_headers).status_code
+        
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            statuses = list(pool.map(create, range(20)))
+        
+        assert statuses == [201] * 20
+        assert len(client.get("/identities", headers=authenticated_headers).json()) == 20
+        assert client.get("/users/me", headers=authenticated_headers).json()["identity_count"] == 20
+    
+    def test_database_endpoints_run_off_the_event_loop(self):
+        """
+        Tests that endpoints querying the request Session are plain functions
+        FastAPI runs those on the bounded worker pool instead of the event loop
+        """
+        import inspect
+        from fastapi.routing import APIRoute
+        from app.main import app, get_db
+        
+        blocking = [
+            route.path
+            for route in app.routes
+            if isinstance(route, APIRoute)
+            and inspect.iscoroutinefunction(route.endpoint)
+            and any(
+                getattr(parameter.default, "dependency", None) is get_db
+                for parameter in inspect.signature(route.endpoint).parameters.values()
+            )
+        ]
+        
+        assert blocking == []
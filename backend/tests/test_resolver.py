@@ -0,0 +1,363 @@
+"""
+Context Resolution Testing Suite
+Validates server-side identity scoring and ranking for contexts
+"""
+import json
+import pytest
+
+@pytest.fixture
+def scoring_identities():
+    """
+    Synthetic identities covering every scoring branch
+    """
+    from types import SimpleNamespace
+    links = [
+        {}, {"linkedin": "x"}, {"github": "x", "company": "x"}, {"twitch": "x", "discord": "x"},
+        {"researchgate": "x"}, {"instagram": "x"}, {"behance": "x", "linkedin": ""},
+    ]
+    bios = [
+        None, "Senior engineer and manager", "Coffee lover, travel fan",
+        "Artist and designer building a portfolio", "PhD professor", "photography and music",
+    ]
+    return [
+        SimpleNamespace(
+            id=index,
+            display_name=f"Identity {index}",
+            title=["Developer", None, "Creative Director", "CEO"][index % 4],
+            bio=bios[index % len(bios)],
+            privacy_level=["minimal", "standard", "high", "custom"][index % 4],
+            is_public=index % 3 != 0,
+            is_default=index == 5,
+            usage_count=index % 13,
+            social_links=json.dumps(links[index % len(links)]),
+        )
+        for index in range(60)
+    ]
+
+
+class TestContextResolution:
+    """
+    Server-side resolution engine testing
+    Covers scoring weights, ranking and ownership checks
+    """
+
+    @pytest.fixture
+    def professional_context(self, client, authenticated_headers):
+        """
+        Professional context used as the resolution target
+        """
+        response = client.post("/contexts", json={"name": "Professional Network"}, headers=authenticated_headers)
+        return response.json()
+
+    def test_resolution_ranks_best_identity_first(self, client, authenticated_headers, professional_context):
+        """
+        Tests ranking of identities for a professional context
+        Validates: Content keywords, social links, breakdown structure
+        """
+        client.post("/identities", json={
+            "display_name": "Weekend Me",
+            "bio": "Coffee lover and casual gamer",
+            "privacy_level": "minimal"
+        }, headers=authenticated_headers)
+        client.post("/identities", json={
+            "display_name": "Work Me",
+            "title": "Senior Engineer",
+            "bio": "Engineering manager",
+            "social_links": {"linkedin": "https://linkedin.com/in/me", "github": "https://github.com/me"}
+        }, headers=authenticated_headers)
+
+        response = client.get(f"/contexts/{professional_context['id']}/resolve", headers=authenticated_headers)
+
+        assert response.status_code == 200
+        resolution = response.json()
+        assert resolution["resolved_identity"]["display_name"] == "Work Me"
+        assert "bio" not in resolution["resolved_identity"]
+
+        best, other = resolution["candidates"]
+        # Three keyword hits (senior, engineer, manager) -> min(95, 50 + 3 * 15)
+        assert best["breakdown"]["content_match"] == 95
+        # LinkedIn + GitHub bonuses plus 5 per link -> min(95, 50 + 30 + 20 + 10)
+        assert best["breakdown"]["social_links_match"] == 95
+        assert best["score"] == 88
+        assert best["score"] > other["score"]
+        assert any("Professional credentials found" in reason for reason in best["reasoning"])
+
+    def test_resolution_without_identities(self, client, authenticated_headers, professional_context):
+        """
+        Tests resolution for a user with no identities
+        """
+        response = client.get(f"/contexts/{professional_context['id']}/resolve", headers=authenticated_headers)
+
+        assert response.status_code == 200
+        assert response.json()["resolved_identity"] is None
+        assert response.json()["candidates"] == []
+
+    def test_resolution_unknown_context(self, client, authenticated_headers):
+        """
+        Tests ownership enforcement on the resolve endpoint
+        """
+        response = client.get("/contexts/9999/resolve", headers=authenticated_headers)
+        assert response.status_code == 404
+
+
+class TestBatchResolution:
+    """
+    Vectorized batch resolver testing
+    Ensures the matrix scores agree with the per-context engine
+    """
+
+    def test_batch_matches_single_resolution(self, scoring_identities):
+        """
+        Tests that batch scores equal per-context scores for every context branch
+        """
+        from types import SimpleNamespace
+        from app.resolver import resolve_batch, resolve_identities
+
+        names = ["Professional Network", "Family", "Social Club", "Creative Studio",
+                 "Gaming Squad", "Academic Research", "Private Notes", "Misc"]
+        contexts = [SimpleNamespace(id=index, name=name) for index, name in enumerate(names)]
+
+        results = resolve_batch(scoring_identities, contexts, top_k=len(scoring_identities))
+
+        for context, result in zip(contexts, results):
+            expected = resolve_identities(scoring_identities, context.name)
+            assert [c["identity"].id for c in result["candidates"]] == [c["identity"].id for c in expected]
+            assert [c["score"] for c in result["candidates"]] == [c["score"] for c in expected]
+            assert [c["breakdown"] for c in result["candidates"]] == [c["breakdown"] for c in expected]
+            assert [c["confidence"] for c in result["candidates"]] == [c["confidence"] for c in expected]
+
+    def test_batch_endpoint_returns_top_k(self, client, authenticated_headers, sql_statements):
+        """
+        Tests the batch endpoint for top-k limits, tie order, loaded columns and unknown contexts
+        """
+        context_ids = [
+            client.post("/contexts", json={"name": name}, headers=authenticated_headers).json()["id"]
+            for name in ("Work", "Family")
+        ]
+        identity_ids = [
+            client.post("/identities", json={"display_name": name}, headers=authenticated_headers).json()["id"]
+            for name in ("One", "Two", "Three")
+        ]
+
+        sql_statements.clear()
+        response = client.post("/resolve/batch", json={"top_k": 2}, headers=authenticated_headers)
+        assert response.status_code == 200
+        batch = response.json()
+        assert batch["identity_count"] == 3
+        assert [result["context_id"] for result in batch["results"]] == context_ids
+        assert all(len(result["candidates"]) == 2 for result in batch["results"])
+        # Equal scores keep creation order, as in the single resolver
+        assert [candidate["identity_id"] for candidate in batch["results"][0]["candidates"]] == identity_ids[:2]
+        listing = [statement for statement in sql_statements if "FROM identities" in statement][-1]
+        assert "ORDER BY identities.created_at, identities.id" in listing
+        assert not {"identities.bio", "identities.use_case", "identities.social_links"} & set(listing.replace(",", " ").split())
+
+        missing = client.post("/resolve/batch", json={"context_ids": [9999]}, headers=authenticated_headers)
+        assert missing.status_code == 404
+
+        from app.main import MAX_BATCH_CONTEXTS
+        oversized = {"context_ids": list(range(1, MAX_BATCH_CONTEXTS + 2))}
+        assert client.post("/resolve/batch", json=oversized, headers=authenticated_headers).status_code == 422
+
+
+class TestKeywordAutomaton:
+    """
+    Aho-Corasick keyword matching testing
+    Verifies equivalence with plain substring checks
+    """
+
+    def test_automaton_matches_substring_semantics(self):
+        """
+        Tests overlapping and nested keywords against naive substring search
+        """
+        import random
+        from app.automaton import KeywordAutomaton
+
+        keywords = ["art", "artist", "design", "designer", "fan", "fanatic", "he", "she", "hers", "his"]
+        automaton = KeywordAutomaton(keywords)
+        rng = random.Random(7)
+        alphabet = "artisdgnefhcs "
+
+        for _ in range(300):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+            found = {automaton.keywords[index] for index in automaton.find(text)}
+            assert found == {keyword for keyword in keywords if keyword in text}
+
+        # No match may span two fields
+        assert automaton.find_in_fields(["ar", "t"]) == [set(), set()]
+
+    def test_content_rule_update_rebuilds_automaton(self, client, authenticated_headers):
+        """
+        Tests that replacing the rule set takes effect on the next resolution
+        """
+        from app.resolver import CONTENT_RULES, content_matcher
+
+        context_id = client.post("/contexts", json={"name": "Work"}, headers=authenticated_headers).json()["id"]
+        client.post("/identities", json={"display_name": "Astronaut"}, headers=authenticated_headers)
+
+        before = client.get(f"/contexts/{context_id}/resolve", headers=authenticated_headers).json()
+        assert before["candidates"][0]["breakdown"]["content_match"] == 50
+
+        version = content_matcher.compiled.version
+        rules = dict(CONTENT_RULES)
+        rules["professional"] = rules["professional"]._replace(keywords=("astronaut",))
+        content_matcher.update(rules)
+        try:
+            assert content_matcher.compiled.version == version + 1
+            after = client.get(f"/contexts/{context_id}/resolve", headers=authenticated_headers).json()
+            assert after["candidates"][0]["breakdown"]["content_match"] == 65
+        finally:
+            content_matcher.update(CONTENT_RULES)
+
+
+class TestFeatureStore:
+    """
+    Packed identity feature testing
+    Covers write-time maintenance and the backfill command
+    """
+
+    def test_features_maintained_on_write(self, client, authenticated_headers, test_db):
+        """
+        Tests that create and update keep the packed columns current
+        """
+        from app.main import Identity
+        from app.resolver import PLATFORM_BITS, content_matcher
+
+        identity_id = client.post("/identities", json={
+            "display_name": "Dev",
+            "bio": "Senior engineer",
+            "social_links": {"github": "https://github.com/me"}
+        }, headers=authenticated_headers).json()["id"]
+
+        identity = test_db.get(Identity, identity_id)
+        assert identity.feature_version == content_matcher.compiled.signature
+        assert identity.bio_keyword_bits != 0
+        assert identity.social_link_bits == PLATFORM_BITS["github"]
+        assert identity.social_link_count == 1
+
+        client.put(f"/identities/{identity_id}", json={"bio": "", "social_links": {}}, headers=authenticated_headers)
+        test_db.expire_all()
+        identity = test_db.get(Identity, identity_id)
+        assert identity.bio_keyword_bits == 0
+        assert identity.social_link_bits == 0
+
+    def test_backfill_restores_stale_rows(self, client, authenticated_headers, test_db):
+        """
+        Tests that backfill recomputes rows written before the feature store
+        """
+        from sqlalchemy import text
+        from app.main import Identity
+        from app.resolver import content_matcher
+        from backfill_features import backfill_identity_features
+
+        context_id = client.post("/contexts", json={"name": "Work"}, headers=authenticated_headers).json()["id"]
+        client.post("/identities", json={"display_name": "Engineer", "social_links": {"linkedin": "x"}},
+                    headers=authenticated_headers)
+        expected = client.get(f"/contexts/{context_id}/resolve", headers=authenticated_headers).json()["candidates"]
+
+        test_db.execute(text("UPDATE identities SET feature_version = NULL, name_keyword_bits = 0, social_link_bits = 0"))
+        test_db.commit()
+
+        # Stale rows are rescanned on read, so results do not change before the backfill
+        stale = client.get(f"/contexts/{context_id}/resolve", headers=authenticated_headers).json()["candidates"]
+        assert stale == expected
+
+        assert backfill_identity_features(test_db, batch_size=1) == 1
+        assert backfill_identity_features(test_db) == 0
+        identity = test_db.query(Identity).one()
+        assert identity.feature_version == content_matcher.compiled.signature
+        assert client.get(f"/contexts/{context_id}/resolve", headers=authenticated_headers).json()["candidates"] == expected
+
+
+class TestTopKResolution:
+    """
+    Branch-and-bound top-k resolution testing
+    Pruned results must equal the exhaustive ranking
+    """
+
+    def test_top_k_matches_exhaustive_ranking(self, scoring_identities):
+        """
+        Tests every k against the exhaustive resolver for each context branch
+        """
+        from app.resolver import resolve_identities, resolve_top_k
+
+        by_id = {identity.id: identity for identity in scoring_identities}
+        for name in ("Professional Network", "Family", "Social Club", "Creative Studio", "Misc"):
+            expected = resolve_identities(scoring_identities, name)
+            for k in (1, 3, 10, len(scoring_identities)):
+                ranked, stats = resolve_top_k(
+                    scoring_identities, name, k, lambda ids: [by_id[i] for i in ids], chunk_size=4
+                )
+                assert [c["identity"].id for c in ranked] == [c["identity"].id for c in expected[:k]]
+                assert [c["score"] for c in ranked] == [c["score"] for c in expected[:k]]
+                assert stats["scored"] + stats["pruned"] == len(scoring_identities)
+
+    def test_bound_mode_prunes_candidates(self, client, authenticated_headers):
+        """
+        Tests pruning metadata on the resolve endpoint
+        """
+        context_id = client.post("/contexts", json={"name": "Family"}, headers=authenticated_headers).json()["id"]
+        client.post("/identities", json={"display_name": "Private", "privacy_level": "high", "is_public": False},
+                    headers=authenticated_headers)
+        for index in range(5):
+            client.post("/identities", json={"display_name": f"Open {index}", "privacy_level": "minimal"},
+                        headers=authenticated_headers)
+
+        response = client.get(f"/contexts/{context_id}/resolve?mode=bound&k=1", headers=authenticated_headers)
+        assert response.status_code == 200
+        resolution = response.json()
+        assert resolution["resolved_identity"]["display_name"] == "Private"
+        assert len(resolution["candidates"]) == 1
+        assert resolution["metadata"] == {"mode": "bound", "k": 1, "candidates": 6, "scored": 1, "pruned": 5}
+
+
+class TestResolutionCache:
+    """
+    Resolution result caching testing
+    Covers hits on repeat calls and invalidation on writes
+    """
+
+    def test_repeat_resolution_served_from_cache(self, client, authenticated_headers):
+        """
+        Tests cache hits and write-driven invalidation
+        """
+        from app.main import resolution_cache
+
+        context_id = client.post("/contexts", json={"name": "Work"}, headers=authenticated_headers).json()["id"]
+        identity_id = client.post("/identities", json={"display_name": "Engineer"}, headers=authenticated_headers).json()["id"]
+
+        first = client.get(f"/contexts/{context_id}/resolve", headers=authenticated_headers).json()
+        hits = resolution_cache.hits
+        second = client.get(f"/contexts/{context_id}/resolve", headers=authenticated_headers).json()
+        assert resolution_cache.hits == hits + 1
+        assert second == first
+
+        # Any write to the user's data orphans the cached entry
+        client.put(f"/identities/{identity_id}", json={"title": "Senior Manager"}, headers=authenticated_headers)
+        third = client.get(f"/contexts/{context_id}/resolve", headers=authenticated_headers).json()
+        assert resolution_cache.hits == hits + 1
+        assert third["candidates"][0]["breakdown"]["content_match"] > first["candidates"][0]["breakdown"]["content_match"]
+
+        stats = client.get("/debug/cache").json()["resolution"]
+        assert {"hits", "misses", "evictions", "hit_rate"} <= set(stats)
+
+    def test_ttl_cache_eviction_and_expiry(self, monkeypatch):
+        """
+        Tests LRU eviction order and TTL expiry counters
+        """
+        from app import cache
+        from app.cache import TTLCache
+
+        now = [1000.0]
+        monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+        lru = TTLCache(max_size=2, ttl=10)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        assert lru.get("a") == 1
+        lru.set("c", 3)  # evicts "b", the least recently used
+        assert lru.get("b") is None
+        assert lru.evictions == 1
+
+        now[0] += 11
+        assert lru.get("a") is None
+        assert lru.expirations == 1
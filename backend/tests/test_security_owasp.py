@@ -108,4 +108,117 @@ class TestOWASPSecurity:
         assert user_response.status_code == 200
         
         # Verify token is user-specific and contains user ID
-        assert token.startswith("fake-token-for-")
\ No newline at end of file
+        from jose import jwt
+        claims = jwt.get_unverified_claims(token)
+        assert claims["sub"] == str(user_response.json()["id"])
+        assert claims["exp"] - claims["iat"] == 1800
+    
+    def test_signed_token_tampering_expiry_and_revocation(self, client, authenticated_headers, sample_user_data, sql_statements):
+        """
+        OWASP A07: Identification and Authentication Failures
+        Tests that tokens are verified cryptographically and can be revoked
+        """
+        from jose import jwt
+        from app.tokens import ALGORITHM, create_access_token
+        
+        token = authenticated_headers["Authorization"].split(" ")[1]
+        claims = jwt.get_unverified_claims(token)
+        
+        # Forged claims signed with another key are rejected
+        forged = jwt.encode({**claims, "sub": "999"}, "not-the-server-key", algorithm=ALGORITHM)
+        assert client.get("/identities", headers={"Authorization": f"Bearer {forged}"}).status_code == 401
+        
+        # Expired tokens are rejected
+        expired = create_access_token(int(claims["sub"]), claims["username"], now=claims["iat"] - 3600)
+        assert client.get("/identities", headers={"Authorization": f"Bearer {expired}"}).status_code == 401
+        
+        # Authentication itself never queries the users table
+        sql_statements.clear()
+        assert client.get("/identities", headers=authenticated_headers).status_code == 200
+        assert client.get("/identities", headers={"Authorization": "Bearer invalid-token"}).status_code == 401
+        assert not [statement for statement in sql_statements if "FROM users" in statement]
+        
+        # Logout revokes only the presented token
+        second_token = client.post("/auth/token", data={
+            "username": sample_user_data["username"],
+            "password": sample_user_data["password"]
+        }).json()["access_token"]
+        assert client.post("/auth/logout", headers=authenticated_headers).status_code == 200
+        assert client.get("/identities", headers=authenticated_headers).status_code == 401
+        assert client.get("/identities", headers={"Authorization": f"Bearer {second_token}"}).status_code == 200
+    
+    def test_argon2_hashing_and_legacy_rehash(self, client, test_db, sample_user_data):
+        """
+        OWASP A02: Cryptographic Failures
+        Tests salted argon2 hashes and transparent upgrade of legacy SHA-256 hashes
+        """
+        import hashlib
+        from app.main import User
+        
+        client.post("/auth/register", json=sample_user_data)
+        user = test_db.query(User).filter(User.username == sample_user_data["username"]).first()
+        assert user.hashed_password.startswith("$argon2id$")
+        
+        # Simulate an account created before the KDF change
+        legacy = hashlib.sha256(sample_user_data["password"].encode()).hexdigest()
+        test_db.query(User).filter(User.id == user.id).update({"hashed_password": legacy})
+        test_db.commit()
+        
+        login = {"username": sample_user_data["username"], "password": sample_user_data["password"]}
+        assert client.post("/auth/token", data={**login, "password": "wrong"}).status_code == 401
+        test_db.expire_all()
+        assert test_db.get(User, user.id).hashed_password == legacy
+        
+        assert client.post("/auth/token", data=login).status_code == 200
+        test_db.expire_all()
+        assert test_db.get(User, user.id).hashed_password.startswith("$argon2id$")
+        assert client.post("/auth/token", data=login).status_code == 200
+    
+    def test_unknown_username_costs_a_password_verification(self, client, sample_user_data, monkeypatch):
+        """
+        OWASP A07: Identification and Authentication Failures
+        Tests that unknown usernames run the same argon2 verification as wrong passwords
+        """
+        from app import passwords
+        from app.passwords import password_pool
+        
+        verified = []
+        original = passwords.verify_password
+        monkeypatch.setattr(passwords, "verify_password", lambda stored, password: verified.append(stored) or original(stored, password))
+        client.post("/auth/register", json=sample_user_data)
+        
+        completed = password_pool.stats()["completed"]
+        unknown = client.post("/auth/token", data={"username": "nobody", "password": "whatever"})
+        wrong = client.post("/auth/token", data={"username": sample_user_data["username"], "password": "whatever"})
+        
+        assert unknown.status_code == wrong.status_code == 401
+        assert unknown.json() == wrong.json()
+        assert password_pool.stats()["completed"] == completed + 2
+        assert [stored.split("$")[1] for stored in verified] == ["argon2id", "argon2id"]
+        assert verified[0] == passwords.dummy_hash()
+    
+    def test_password_pool_rejects_beyond_queue_limit(self, client, sample_user_data):
+        """
+        Tests that a saturated hashing pool sheds load with 503 instead of queueing forever
+        """
+        import threading
+        from app import main
+        from app.passwords import PasswordPool, PasswordPoolBusy
+        
+        pool = PasswordPool(workers=1, queue_limit=1)
+        release = threading.Event()
+        blocked = pool.submit(release.wait)
+        with pytest.raises(PasswordPoolBusy):
+            pool.submit(release.wait)
+        
+        original, main.password_pool = main.password_pool, pool
+        try:
+            response = client.post("/auth/register", json=sample_user_data)
+            assert response.status_code == 503
+            assert response.headers["Retry-After"] == "1"
+        finally:
+            main.password_pool = original
+            release.set()
+        blocked.result(timeout=5)
+        assert pool.stats()["rejected"] == 2
+        assert pool.submit(str, "ok").result(timeout=5) == "ok"
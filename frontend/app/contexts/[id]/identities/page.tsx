@@ -10,6 +10,7 @@ import { Badge } from '@/components/ui/badge'
 import { Modal, ModalContent, ModalHeader, ModalTitle } from '@/components/ui/modal'
 import { ArrowLeft, Users, Plus, Check } from 'lucide-react'
 import { Identity, Context } from '@/types'
+import { contextApi } from '@/lib/api'
 
 export default function ContextIdentitiesPage() {
   const { isAuthenticated, isLoading: authLoading, token } = useAuth()
@@ -20,6 +21,7 @@ export default function ContextIdentitiesPage() {
   const contextId = parseInt(params.id as string)
   const [contextIdentities, setContextIdentities] = React.useState<Identity[]>([])
   const [unassignedIdentities, setUnassignedIdentities] = React.useState<Identity[]>([])
+  const [unassignedCursor, setUnassignedCursor] = React.useState<string | null>(null)
   const [isLoading, setIsLoading] = React.useState(true)
   const [context, setContext] = React.useState<Context | null>(null)
   const [isAssignModalOpen, setIsAssignModalOpen] = React.useState(false)
@@ -54,18 +56,8 @@ export default function ContextIdentitiesPage() {
     
     setIsLoading(true)
     try {
-      // Parallel context checking for performance optimization
-      const response = await fetch(`${API_BASE}/contexts/${contextId}/identities`, {
-        headers: {
-          'Authorization': `Bearer ${token}`,
-        },
-      })
-      
-      if (!response.ok) {
-        throw new Error('Failed to fetch context identities')
-      }
-      
-      const identities = await response.json()
+      // Members list is keyset-paginated; follow the cursor to load every member
+      const identities = await contextApi.identities(token, contextId)
       setContextIdentities(identities)
     } catch (err) {
       console.error('Error fetching context identities:', err)
@@ -75,11 +67,13 @@ export default function ContextIdentitiesPage() {
     }
   }
 
-  const fetchUnassignedIdentities = async () => {
+  // Keyset-paginated: pass the previous page's cursor to append the next page
+  const fetchUnassignedIdentities = async (cursor?: string) => {
     if (!token) return
     
     try {
-      const response = await fetch(`${API_BASE}/contexts/${contextId}/unassigned-identities`, {
+      const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : ''
+      const response = await fetch(`${API_BASE}/contexts/${contextId}/unassigned-identities${query}`, {
         headers: {
           'Authorization': `Bearer ${token}`,
         },
@@ -89,11 +83,13 @@ export default function ContextIdentitiesPage() {
         throw new Error('Failed to fetch unassigned identities')
       }
       
-      const identities = await response.json()
-      setUnassignedIdentities(identities)
+      const identities: Identity[] = await response.json()
+      setUnassignedIdentities(previous => cursor ? [...previous, ...identities] : identities)
+      setUnassignedCursor(response.headers.get('X-Next-Cursor'))
     } catch (err) {
       console.error('Error fetching unassigned identities:', err)
-      setUnassignedIdentities([])
+      if (!cursor) setUnassignedIdentities([])
+      setUnassignedCursor(null)
     }
   }
 
@@ -107,9 +103,9 @@ export default function ContextIdentitiesPage() {
     try {
       const result = await addIdentityToContext(contextId, identityId)
       if (result.success) {
-        // Refresh both lists
+        // Refresh the members; drop the identity locally so loaded pages are kept
         await fetchContextIdentities(contextId)
-        await fetchUnassignedIdentities()
+        setUnassignedIdentities(previous => previous.filter(identity => identity.id !== identityId))
       } else {
         alert(result.error || 'Failed to assign identity')
       }
@@ -352,6 +348,13 @@ export default function ContextIdentitiesPage() {
                     </div>
                   ))}
                 </div>
+                {unassignedCursor && (
+                  <div className="flex justify-center">
+                    <Button variant="outline" size="sm" onClick={() => fetchUnassignedIdentities(unassignedCursor)}>
+                      Load more
+                    </Button>
+                  </div>
+                )}
               </div>
             ) : (
               <div className="text-center py-6">
@@ -3,7 +3,7 @@
 import * as React from 'react'
 import { useRouter } from 'next/navigation'
 import { useAuth } from '@/hooks/useAuth'
-import { useContexts } from '@/hooks/useContexts'
+import { dashboardApi } from '@/lib/api'
 import { Button } from '@/components/ui/button'
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card'
 import { Badge } from '@/components/ui/badge'
@@ -24,7 +24,6 @@ import { BookOpen } from 'lucide-react'
 
 export default function DashboardPage() {
   const { user, isAuthenticated, isLoading, logout, token } = useAuth()
-  const { contexts, isLoading: contextsLoading } = useContexts()
   const router = useRouter()
 
   // States for data fetching
@@ -32,14 +31,13 @@ export default function DashboardPage() {
   const [isLoadingStats, setIsLoadingStats] = React.useState(true)
   const [stats, setStats] = React.useState({
     totalIdentities: 0,
+    totalContexts: 0,
     publicIdentities: 0,
     privateIdentities: 0,
     highPrivacy: 0,
     standardPrivacy: 0,
     minimalPrivacy: 0
   })
-  
-  const API_BASE = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
 
   // Redirect to login if not authenticated
   React.useEffect(() => {
@@ -48,7 +46,7 @@ export default function DashboardPage() {
     }
   }, [isAuthenticated, isLoading, router])
 
-  // Fetch identities and calculate stats
+  // Fetch count(*) stats and the most recent identities
   const fetchIdentitiesStats = React.useCallback(async () => {
     const authToken = token || user?.token
     
@@ -60,41 +58,29 @@ export default function DashboardPage() {
     try {
       setIsLoadingStats(true)
       
-      const response = await fetch(`${API_BASE}/identities`, {
-        headers: { 
-          'Authorization': `Bearer ${authToken}`,
-          'Content-Type': 'application/json'
-        },
-      })
+      // Counts come from the server; list lengths stop at one page
+      const data = await dashboardApi.stats(authToken)
+      setIdentities(data.recent_identities)
+      
+      const totalIdentities = data.total_identities
+      const publicIdentities = data.public_identities
+      const privacyLevels = data.identities_by_privacy_level
       
-      if (response.ok) {
-        const identitiesData = await response.json()
-        setIdentities(identitiesData)
-        
-        // Calculate stats
-        const totalIdentities = identitiesData.length
-        const publicIdentities = identitiesData.filter((id: any) => id.is_public).length
-        const privateIdentities = totalIdentities - publicIdentities
-        
-        const highPrivacy = identitiesData.filter((id: any) => id.privacy_level === 'high').length
-        const standardPrivacy = identitiesData.filter((id: any) => id.privacy_level === 'standard').length
-        const minimalPrivacy = identitiesData.filter((id: any) => id.privacy_level === 'minimal').length
-        
-        setStats({
-          totalIdentities,
-          publicIdentities,
-          privateIdentities,
-          highPrivacy,
-          standardPrivacy,
-          minimalPrivacy
-        })
-      }
+      setStats({
+        totalIdentities,
+        totalContexts: data.total_contexts,
+        publicIdentities,
+        privateIdentities: totalIdentities - publicIdentities,
+        highPrivacy: privacyLevels.high,
+        standardPrivacy: privacyLevels.standard,
+        minimalPrivacy: privacyLevels.minimal
+      })
     } catch (err) {
       console.error('Fetch error:', err)
     } finally {
       setIsLoadingStats(false)
     }
-  }, [token, user?.token, API_BASE])
+  }, [token, user?.token])
 
   // Fetch data when component mounts
   React.useEffect(() => {
@@ -153,7 +139,7 @@ export default function DashboardPage() {
       bgColor: 'from-purple-100 to-purple-200',
       textColor: 'text-purple-600',
       hoverColor: 'hover:from-purple-200 hover:to-purple-300',
-      stat: `${contexts.length} contexts`,
+      stat: `${stats.totalContexts} contexts`,
       statColor: 'text-purple-600'
     },
     {
@@ -170,10 +156,8 @@ export default function DashboardPage() {
     }
   ]
 
-  // Recent identities (last 3)
-  const recentIdentities = identities
-    .sort((a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime())
-    .slice(0, 3)
+  // Recent identities (last 3), already newest first
+  const recentIdentities = identities.slice(0, 3)
 
   return (
     <div className="min-h-screen bg-gradient-to-br from-gray-50 to-gray-100">
@@ -252,7 +236,7 @@ export default function DashboardPage() {
               <div className="bg-gray-50 rounded-xl p-4">
                 <p className="text-sm text-gray-600">Active Contexts</p>
                 <p className="text-lg font-semibold text-purple-600">
-                  {contextsLoading ? "Loading..." : contexts.length}
+                  {isLoadingStats ? "Loading..." : stats.totalContexts}
                 </p>
               </div>
             </div>
@@ -279,9 +263,7 @@ export default function DashboardPage() {
                 </p>
                 <div className="flex items-center justify-between">
                   <p className={`text-sm font-medium ${action.statColor}`}>
-                    {isLoadingStats && action.title === 'My Identities' ? "Loading..." : 
-                     contextsLoading && action.title === 'Contexts' ? "Loading..." : 
-                     action.stat}
+                    {isLoadingStats ? "Loading..." : action.stat}
                   </p>
                   <div className={`${action.textColor} group-hover:translate-x-1 transition-transform`}>
                     <ArrowRight className="h-4 w-4" />
@@ -465,7 +447,7 @@ export default function DashboardPage() {
               </div>
               <div className="text-center">
                 <div className="text-2xl font-bold text-purple-600">
-                  {contextsLoading ? "..." : contexts.length}
+                  {isLoadingStats ? "..." : stats.totalContexts}
                 </div>
                 <div className="text-sm text-gray-600">Active Contexts</div>
               </div>
@@ -37,8 +37,6 @@ export default function IdentityContextsPage() {
   const [isActionLoading, setIsActionLoading] = React.useState(false)
   const [error, setError] = React.useState<string>()
 
-  const API_BASE = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
-
   // Redirect if not authenticated
   React.useEffect(() => {
     if (!authLoading && !isAuthenticated) {
@@ -46,44 +44,17 @@ export default function IdentityContextsPage() {
     }
   }, [isAuthenticated, authLoading, router])
 
-  // Advanced Identity Resolution with Multi-Factor Analysis and matching algorithm
+  // Single indexed lookup of the contexts this identity is assigned to
   const fetchAssignedContexts = React.useCallback(async () => {
     if (!token || !identityId || contexts.length === 0) return []
 
-    const assigned: Context[] = []
-    
     try {
-      // Optimized parallel context checking to see if this identity is assigned to it
-      for (const context of contexts) {
-        try {
-          const response = await fetch(`${API_BASE}/contexts/${context.id}/identities`, {
-            headers: { 
-              'Authorization': `Bearer ${token}`,
-              'Content-Type': 'application/json'
-            },
-          })
-          
-          if (response.ok) {
-            const contextIdentities = await response.json()
-            // Identity matching algorithm: check if our identity is in this context
-            const isAssigned = contextIdentities.some((contextIdentity: any) => 
-              contextIdentity.id === identityId
-            )
-            
-            if (isAssigned) {
-              assigned.push(context)
-            }
-          }
-        } catch (err) {
-          console.warn(`Failed to check context ${context.id}:`, err)
-        }
-      }
+      return await identityApi.contexts(token, identityId) as Context[]
     } catch (err) {
       console.error('Error fetching assigned contexts:', err)
+      return []
     }
-    
-    return assigned
-  }, [token, identityId, contexts, API_BASE])
+  }, [token, identityId, contexts])
 
   // Fetch identity and its contexts
   React.useEffect(() => {
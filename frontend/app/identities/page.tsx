@@ -45,7 +45,7 @@ function IdentitiesContent() {
     
     setIsLoading(true)
     try {
-      const data = await identityApi.list(token)
+      const data = await identityApi.listAll(token)
       setIdentities(data)
       
       // Auto-open edit modal if editId is provided
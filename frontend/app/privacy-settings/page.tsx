@@ -34,7 +34,7 @@ export default function PrivacySettingsPage() {
       
       setIsLoading(true)
       try {
-        const data = await identityApi.list(token)
+        const data = await identityApi.listAll(token)
         setIdentities(data)
       } catch (err) {
         console.error('Error fetching identities:', err)
@@ -116,7 +116,7 @@ export default function PrivacySettingsPage() {
       }
       
       // Refresh identities
-      const updatedIdentities = await identityApi.list(token)
+      const updatedIdentities = await identityApi.listAll(token)
       setIdentities(updatedIdentities)
       setChanges({})
       
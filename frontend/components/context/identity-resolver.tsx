@@ -1,10 +1,11 @@
 import * as React from 'react'
-import { Context, Identity } from '@/types'
+import { Context, ContextResolutionResponse, ResolvedIdentitySummary } from '@/types'
 import { Button } from '@/components/ui/button'
 import { Badge } from '@/components/ui/badge'
 import { LoadingSpinner } from '@/components/ui/loading'
 import { User, Target, CheckCircle, Brain, TrendingUp } from 'lucide-react'
 import { useAuth } from '@/hooks/useAuth'
+import { contextApi } from '@/lib/api'
 
 interface IdentityResolverProps {
   context: Context
@@ -13,7 +14,7 @@ interface IdentityResolverProps {
 }
 
 interface ScoredIdentity {
-  identity: Identity
+  identity: ResolvedIdentitySummary
   score: number
   confidence: number
   reasoning: string[]
@@ -33,211 +34,32 @@ export function IdentityResolver({ context, onResolve, onUseIdentity }: Identity
   const [error, setError] = React.useState<string>()
   const [showAllOptions, setShowAllOptions] = React.useState(false)
 
-  const API_BASE = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
-
-  // Live identity scoring algorithm
-  const scoreIdentityForContext = (identity: Identity, context: Context): ScoredIdentity => {
-    const reasons: string[] = []
-    let totalScore = 0
-    
-    // 1. Privacy Level Match (25% weight)
-    let privacyScore = 0
-    const contextLower = context.name.toLowerCase()
-    
-    if (contextLower.includes('professional') || contextLower.includes('work')) {
-      // Professional contexts prefer standard to high privacy
-      privacyScore = identity.privacy_level === 'standard' ? 90 : 
-                    identity.privacy_level === 'high' ? 75 : 50
-      if (identity.privacy_level === 'standard') {
-        reasons.push('Standard privacy level is ideal for professional contexts')
-      }
-    } else if (contextLower.includes('family') || contextLower.includes('personal')) {
-      // Family contexts prefer high privacy
-      privacyScore = identity.privacy_level === 'high' ? 95 : 
-                    identity.privacy_level === 'standard' ? 70 : 40
-      if (identity.privacy_level === 'high') {
-        reasons.push('High privacy level protects family information')
-      }
-    } else if (contextLower.includes('social') || contextLower.includes('creative')) {
-      // Social contexts can handle minimal privacy
-      privacyScore = identity.privacy_level === 'minimal' ? 85 : 
-                    identity.privacy_level === 'standard' ? 75 : 60
-      if (identity.privacy_level === 'minimal') {
-        reasons.push('Open privacy level encourages social engagement')
-      }
-    } else {
-      // Default: standard privacy is usually good
-      privacyScore = identity.privacy_level === 'standard' ? 80 : 60
-    }
-
-    // 2. Content/Bio Match (30% weight)
-    let contentScore = 50 // Base score
-    const bio = (identity.bio || '').toLowerCase()
-    const title = (identity.title || '').toLowerCase()
-    const displayName = identity.display_name.toLowerCase()
-    
-    if (contextLower.includes('professional') || contextLower.includes('work')) {
-      const professionalKeywords = ['manager', 'director', 'engineer', 'developer', 'consultant', 'analyst', 'professor', 'doctor', 'phd', 'mba', 'ceo', 'senior']
-      const matches = professionalKeywords.filter(keyword => 
-        bio.includes(keyword) || title.includes(keyword) || displayName.includes(keyword)
-      )
-      contentScore = Math.min(95, 50 + (matches.length * 15))
-      if (matches.length > 0) {
-        reasons.push(`Professional credentials found: ${matches.join(', ')}`)
-      }
-    } else if (contextLower.includes('social')) {
-      const socialKeywords = ['casual', 'friendly', 'enthusiast', 'lover', 'fan', 'coffee', 'travel', 'photography', 'music']
-      const matches = socialKeywords.filter(keyword => bio.includes(keyword))
-      contentScore = Math.min(90, 40 + (matches.length * 12))
-      if (matches.length > 0) {
-        reasons.push(`Social interests mentioned: ${matches.join(', ')}`)
-      }
-    } else if (contextLower.includes('creative')) {
-      const creativeKeywords = ['artist', 'designer', 'creative', 'portfolio', 'art', 'design', 'photography', 'writer', 'musician']
-      const matches = creativeKeywords.filter(keyword => 
-        bio.includes(keyword) || title.includes(keyword)
-      )
-      contentScore = Math.min(95, 45 + (matches.length * 15))
-      if (matches.length > 0) {
-        reasons.push(`Creative background: ${matches.join(', ')}`)
-      }
-    }
-
-    // 3. Social Links Match (20% weight)
-    let socialLinksScore = 50
-    const socialLinks = identity.social_links || {}
-    const linkCount = Object.keys(socialLinks).length
-
-    if (contextLower.includes('professional') || contextLower.includes('work')) {
-      if (socialLinks.linkedin) {
-        socialLinksScore += 30
-        reasons.push('LinkedIn profile available for professional networking')
-      }
-      if (socialLinks.github) {
-        socialLinksScore += 20
-        reasons.push('GitHub profile shows technical expertise')
-      }
-      if (socialLinks.company) {
-        socialLinksScore += 25
-        reasons.push('Company profile available for professional networking')
-      }
-    } else if (contextLower.includes('gaming') || contextLower.includes('esports')) {
-      if (socialLinks.twitch) {
-        socialLinksScore += 35
-        reasons.push('Twitch streaming profile available')
-      }
-      if (socialLinks.steam || socialLinks.discord) {
-        socialLinksScore += 25
-        reasons.push('Gaming platform profiles available')
-      }
-    } else if (contextLower.includes('academic') || contextLower.includes('research')) {
-      if (socialLinks.researchgate) {
-        socialLinksScore += 35
-        reasons.push('ResearchGate profile shows academic credentials')
-      }
-      if (socialLinks.linkedin) {
-        socialLinksScore += 20
-        reasons.push('LinkedIn shows professional academic networking')
-      }
-    } else if (contextLower.includes('social')) {
-      if (socialLinks.instagram || socialLinks.twitter || socialLinks.facebook) {
-        socialLinksScore += 25
-        reasons.push('Social media profiles available')
-      }
-    } else if (contextLower.includes('creative')) {
-      if (socialLinks.behance || socialLinks.dribbble || socialLinks.portfolio) {
-        socialLinksScore += 35
-        reasons.push('Creative portfolio links available')
-      }
-    }
-
-    socialLinksScore = Math.min(95, socialLinksScore + (linkCount * 5))
-
-
-    // 4. Usage Pattern (15% weight)
-    let usageScore = 60 // Base score since we don't have historical data yet
-    if (identity.is_default) {
-      usageScore += 20
-      reasons.push('This is your default identity')
-    }
-    if (identity.usage_count > 0) {
-      usageScore += Math.min(20, identity.usage_count * 2)
-      reasons.push(`Previously used ${identity.usage_count} times`)
-    }
-
-    // 5. Visibility Match (10% weight)
-    let visibilityScore = 70
-    if (contextLower.includes('private') || contextLower.includes('family')) {
-      visibilityScore = identity.is_public ? 40 : 90
-      if (!identity.is_public) {
-        reasons.push('Private visibility protects personal information')
-      }
-    } else {
-      visibilityScore = identity.is_public ? 85 : 60
-      if (identity.is_public) {
-        reasons.push('Public visibility enables discovery and networking')
-      }
-    }
-
-    // Calculate weighted total score
-    totalScore = (
-      privacyScore * 0.25 +
-      contentScore * 0.30 +
-      socialLinksScore * 0.20 +
-      usageScore * 0.15 +
-      visibilityScore * 0.10
-    )
-
-    // Calculate confidence (how sure we are about this recommendation)
-    const confidence = Math.min(95, Math.max(45, totalScore - 10))
-
-    if (reasons.length === 0) {
-      reasons.push('General match based on privacy and visibility settings')
-    }
-
-    return {
-      identity,
-      score: Math.round(totalScore),
-      confidence: Math.round(confidence),
-      reasoning: reasons,
-      breakdown: {
-        privacyMatch: Math.round(privacyScore),
-        contentMatch: Math.round(contentScore),
-        socialLinksMatch: Math.round(socialLinksScore),
-        usagePattern: Math.round(usageScore)
-      }
-    }
-  }
-
   const handleResolve = async () => {
+    if (!token) return
     setIsResolving(true)
     setError(undefined)
     
     try {
-      // Fetch all user identities
-      const response = await fetch(`${API_BASE}/identities`, {
-        headers: { 
-          'Authorization': `Bearer ${token}`,
-          'Content-Type': 'application/json'
-        },
-      })
-      
-      if (!response.ok) {
-        throw new Error('Failed to fetch identities')
-      }
-      
-      const identities: Identity[] = await response.json()
+      // Scoring runs server-side; only identity summaries come back
+      const resolutionResult: ContextResolutionResponse = await contextApi.resolve(token, context.id)
       
-      if (identities.length === 0) {
+      if (resolutionResult.candidates.length === 0) {
         setError('No identities found. Create some identities first.')
         return
       }
 
-      // Score all identities for this context
-      const scored = identities.map(identity => scoreIdentityForContext(identity, context))
-      
-      // Sort by score (highest first)
-      scored.sort((a, b) => b.score - a.score)
+      const scored: ScoredIdentity[] = resolutionResult.candidates.map(candidate => ({
+        identity: candidate.identity,
+        score: candidate.score,
+        confidence: candidate.confidence,
+        reasoning: candidate.reasoning,
+        breakdown: {
+          privacyMatch: candidate.breakdown.privacy_match,
+          contentMatch: candidate.breakdown.content_match,
+          socialLinksMatch: candidate.breakdown.social_links_match,
+          usagePattern: candidate.breakdown.usage_pattern
+        }
+      }))
       
       setAllScores(scored)
       setResolution(scored[0]) // Best match
@@ -147,6 +147,9 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
   }
 
   const logout = () => {
+    if (token) {
+      authApi.logout(token).catch(() => {})  // Best effort: local sign-out proceeds regardless
+    }
     setUser(null)
     setToken(null)
     localStorage.removeItem(TOKEN_KEY)
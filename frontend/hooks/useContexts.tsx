@@ -1,6 +1,7 @@
 import { useState, useEffect, useCallback } from 'react'
 import { Context, ContextCreate, ContextUpdate } from '@/types'
 import { useAuth } from './useAuth'
+import { contextApi } from '@/lib/api'
 
 interface UseContextsReturn {
   contexts: Context[]
@@ -54,7 +55,7 @@ export function useContexts(): UseContextsReturn {
     try {
       setIsLoading(true)
       setError(null)
-      const data = await makeRequest('/contexts')
+      const data = await contextApi.listAll(token)
       setContexts(data)
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to fetch contexts')
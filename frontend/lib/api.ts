@@ -29,6 +29,37 @@ export async function apiRequest<T = any>(
   endpoint: string,
   options: RequestOptions = {}
 ): Promise<T> {
+  const { data } = await apiResponse<T>(endpoint, options)
+  return data
+}
+
+/**
+ * Fetch every page of a keyset-paginated list endpoint
+ * List endpoints return at most `limit` rows and put the cursor for the next
+ * page in the X-Next-Cursor header; follow it until it is absent.
+ */
+export async function apiRequestAllPages<T = any>(
+  endpoint: string,
+  options: RequestOptions = {}
+): Promise<T[]> {
+  const rows: T[] = []
+  let cursor: string | null = null
+  
+  do {
+    const separator = endpoint.includes('?') ? '&' : '?'
+    const page = cursor ? `${endpoint}${separator}cursor=${encodeURIComponent(cursor)}` : endpoint
+    const { data, headers } = await apiResponse<T[]>(page, options)
+    rows.push(...data)
+    cursor = headers.get('X-Next-Cursor')
+  } while (cursor)
+  
+  return rows
+}
+
+async function apiResponse<T>(
+  endpoint: string,
+  options: RequestOptions
+): Promise<{ data: T; headers: Headers }> {
   const { token, ...fetchOptions } = options
   
   const headers: HeadersInit = {
@@ -61,7 +92,7 @@ export async function apiRequest<T = any>(
       )
     }
     
-    return data
+    return { data, headers: response.headers }
   } catch (error) {
     // Re-throw ApiError as is
     if (error instanceof ApiError) {
@@ -117,6 +148,14 @@ export const authApi = {
     })
   },
   
+  // Revokes the token server-side; it would otherwise stay valid until expiry
+  logout: async (token: string) => {
+    return apiRequest('/auth/logout', {
+      method: 'POST',
+      token,
+    })
+  },
+  
   // Alternative JSON login endpoint
   loginJson: async (credentials: {
     username: string
@@ -159,13 +198,22 @@ export const userApi = {
  * Identity API endpoints
  */
 export const identityApi = {
-  list: async (token: string, params?: { skip?: number; limit?: number }) => {
+  // fields: comma-separated sparse fieldset, e.g. 'display_name,privacy_level'
+  list: async (token: string, params?: { cursor?: string; limit?: number; fields?: string }) => {
     const queryString = params ? `?${new URLSearchParams(params as any)}` : ''
     return apiRequest(`/identities${queryString}`, {
       token,
     })
   },
   
+  // Every identity, following the cursor across pages
+  listAll: async (token: string, params?: { limit?: number; fields?: string }) => {
+    const queryString = params ? `?${new URLSearchParams(params as any)}` : ''
+    return apiRequestAllPages(`/identities${queryString}`, {
+      token,
+    })
+  },
+  
   create: async (token: string, data: any) => {
     return apiRequest('/identities', {
       method: 'POST',
@@ -194,6 +242,12 @@ export const identityApi = {
       token,
     })
   },
+  
+  contexts: async (token: string, id: number) => {
+    return apiRequestAllPages(`/identities/${id}/contexts`, {
+      token,
+    })
+  },
 }
 
 /**
@@ -201,8 +255,9 @@ export const identityApi = {
  */
 export const contextApi = {
   list: async (token: string, params?: { 
-    skip?: number
+    cursor?: string
     limit?: number
+    fields?: string
     include_public?: boolean 
   }) => {
     const queryString = params ? `?${new URLSearchParams(params as any)}` : ''
@@ -211,6 +266,20 @@ export const contextApi = {
     })
   },
   
+  // Every context, following the cursor across pages
+  listAll: async (token: string, params?: { limit?: number; fields?: string }) => {
+    const queryString = params ? `?${new URLSearchParams(params as any)}` : ''
+    return apiRequestAllPages(`/contexts${queryString}`, {
+      token,
+    })
+  },
+  
+  identities: async (token: string, id: number) => {
+    return apiRequestAllPages(`/contexts/${id}/identities`, {
+      token,
+    })
+  },
+  
   create: async (token: string, data: any) => {
     return apiRequest('/contexts', {
       method: 'POST',
@@ -245,4 +314,41 @@ export const contextApi = {
       token,
     })
   },
-}
\ No newline at end of file
+}
+/**
+ * Dashboard endpoints
+ */
+export const dashboardApi = {
+  // Totals and privacy breakdowns are count(*) aggregates, not list lengths
+  stats: async (token: string) => {
+    return apiRequest('/dashboard/stats', {
+      token,
+    })
+  },
+}
+
+/**
+ * Bulk identity/context association endpoints
+ */
+export interface AssociationPair {
+  context_id: number
+  identity_id: number
+}
+
+export const associationApi = {
+  assign: async (token: string, pairs: AssociationPair[]) => {
+    return apiRequest('/associations/assign', {
+      method: 'POST',
+      token,
+      body: JSON.stringify({ pairs }),
+    })
+  },
+  
+  unassign: async (token: string, pairs: AssociationPair[]) => {
+    return apiRequest('/associations/unassign', {
+      method: 'POST',
+      token,
+      body: JSON.stringify({ pairs }),
+    })
+  },
+}
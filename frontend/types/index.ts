@@ -146,12 +146,45 @@ export interface IdentityContextMapping {
 }
 
 // Resolution types
+export interface ResolvedIdentitySummary {
+  id: number
+  display_name: string
+  email?: string
+  title?: string
+  avatar_url?: string
+  is_default: boolean
+  is_public: boolean
+  privacy_level: PrivacyLevel
+}
+
+export interface ScoredIdentityCandidate {
+  identity: ResolvedIdentitySummary
+  score: number
+  confidence: number
+  reasoning: string[]
+  breakdown: {
+    privacy_match: number
+    content_match: number
+    social_links_match: number
+    usage_pattern: number
+    visibility_match: number
+  }
+}
+
 export interface ContextResolutionResponse {
   context_id: number
   context_name: string
-  resolved_identity: IdentityPublic
-  resolution_method: 'explicit_mapping' | 'default_fallback' | 'ai_suggested'
+  resolved_identity: ResolvedIdentitySummary | null
+  resolution_method: 'scored' | 'no_identities'
   timestamp: string
+  candidates: ScoredIdentityCandidate[]
+  metadata: {
+    mode: 'exhaustive' | 'bound'
+    k: number | null
+    candidates: number
+    scored: number
+    pruned: number
+  }
 }
 
 // Auth types